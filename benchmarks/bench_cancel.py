@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cancellation benchmark
+Starts a burst of slow tool calls, cancels them the way an MCP cancellation
+notification does, then times a batch of fresh calls through the same small
+connection pool. Aborted upstream requests free their connections at once, so
+the fresh batch should take about as long as it would on an idle server.
+
+Exits with status 1 when the fresh batch is slower than an idle server allows
+or the cancelled calls were charged credits.
+
+Usage: python -m benchmarks.bench_cancel [--cancelled 32] [--fresh 8] [--connections 4]
+           [--latency 1.0] [--cancel-after 0.2] [--tolerance 0.5]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from stdio_server import KwrdsApiMCPServer
+
+
+def _arguments(index: int) -> dict:
+    # Distinct queries so neither the cache nor request coalescing can help
+    return {"search_question": f"running shoes {index}", "search_country": "en-US", "prompt": "Get_SEO_Outline"}
+
+
+async def run_benchmark(base_url: str, args) -> dict:
+    os.environ["KWRDS_API_BASE_URL"] = base_url
+    os.environ["KWRDS_PAA_BASE_URL"] = base_url
+    os.environ["KWRDS_CACHE_MAX_MB"] = "0"
+    os.environ["KWRDS_RATE_LIMIT"] = "0"
+    os.environ["KWRDS_HTTP_MAX_CONNECTIONS"] = str(args.connections)
+    # Lift the ai lane cap so every cancelled call really holds an upstream connection
+    os.environ["KWRDS_LANE_LIMITS"] = "ai=0"
+    server = KwrdsApiMCPServer()
+    try:
+        # Fetch the credit balance first so quota refreshes stay out of the timings
+        await server._route_tool_call("ai_content", _arguments(-1), "bench-key")
+        spent_before = server.quota.stats()["keys"] if server.quota is not None else {}
+
+        doomed = [asyncio.create_task(server._route_tool_call("ai_content", _arguments(index), "bench-key"))
+                  for index in range(args.cancelled)]
+        await asyncio.sleep(args.cancel_after)
+        for task in doomed:
+            task.cancel()
+        await asyncio.gather(*doomed, return_exceptions=True)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(server._route_tool_call("ai_content", _arguments(args.cancelled + index), "bench-key")
+                               for index in range(args.fresh)))
+        fresh_seconds = time.perf_counter() - start
+
+        statuses = server.metrics.snapshot()["endpoints"]["/ai/content"]["statuses"]
+        spent = 0.0
+        if server.quota is not None:
+            for partition, usage in server.quota.stats()["keys"].items():
+                spent += usage["spent_since_refresh"] - spent_before.get(partition, {}).get("spent_since_refresh", 0.0)
+        return {
+            "fresh_seconds": fresh_seconds,
+            "statuses": statuses,
+            "aborted": server.http_client.stats()["cancelled"],
+            "credits_charged": spent,
+        }
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cancelled", type=int, default=32, help="Slow calls started and then cancelled")
+    parser.add_argument("--fresh", type=int, default=8, help="Calls timed after the cancellations")
+    parser.add_argument("--connections", type=int, default=4, help="KWRDS_HTTP_MAX_CONNECTIONS for the server")
+    parser.add_argument("--latency", type=float, default=1.0, help="Mock API latency per request in seconds")
+    parser.add_argument("--cancel-after", type=float, default=0.2, help="Seconds before the slow calls are cancelled")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown of the fresh batch against an idle server (default: 0.5)")
+    args = parser.parse_args()
+
+    with MockApiThread(latency=args.latency) as api:
+        results = asyncio.run(run_benchmark(api.base_url, args))
+    idle_seconds = math.ceil(args.fresh / args.connections) * args.latency
+    print(f"cancelled {args.cancelled} calls after {args.cancel_after}s; upstream requests aborted: {results['aborted']}")
+    print(f"upstream attempts by status: {results['statuses']}")
+    print(f"credits charged after warm-up: {results['credits_charged']:.0f} (fresh calls: {args.fresh})")
+    print(f"{args.fresh} fresh calls over {args.connections} connections: {results['fresh_seconds']:.2f}s "
+          f"(idle server: ~{idle_seconds:.2f}s)")
+
+    problems = []
+    if results["fresh_seconds"] > idle_seconds * (1 + args.tolerance):
+        problems.append(f"fresh calls took {results['fresh_seconds']:.2f}s, more than {1 + args.tolerance:.1f}x "
+                        f"the {idle_seconds:.2f}s of an idle server")
+    if round(results["credits_charged"]) != args.fresh:
+        problems.append(f"{results['credits_charged']:.0f} credits charged for {args.fresh} fresh calls")
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
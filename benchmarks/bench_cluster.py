@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Keyword clustering benchmark
+Clusters synthetic keyword lists of growing size, built from head terms and
+long-tail words with the near-duplicate variants keyword tools return (plurals,
+extra modifiers, spacing and punctuation), and reports time, cluster count and how
+many keywords follow-up calls could skip. A small --vocabulary shows the worst case.
+
+Usage: python -m benchmarks.bench_cluster [--sizes 5000 20000 50000 100000] [--threshold 0.6]
+           [--vocabulary 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.clustering import cluster_keywords
+
+HEAD_TERMS = ("running shoes", "coffee grinder", "standing desk", "gaming laptop", "hiking boots",
+              "wireless headphones", "office chair", "electric kettle", "baby stroller", "road bike")
+MODIFIERS = ("for men", "for women", "for kids", "review", "reviews", "near me", "sale", "best", "cheap", "uk")
+SYLLABLES = ("ka", "lo", "mi", "ter", "ax", "or", "pen", "ti", "zu", "bra", "nd", "el", "qu", "ro", "sa", "vi")
+
+
+def synthetic_keywords(count: int, vocabulary: int = 5000, seed: int = 3) -> Tuple[List[str], List[Optional[int]]]:
+    """Distinct keywords with volumes: head terms plus long-tail words drawn Zipf-style, with near-duplicate variants"""
+    rng = random.Random(seed)
+    words = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(vocabulary * 2)})
+    words = rng.sample(words, min(vocabulary, len(words)))
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(words))]
+    keywords, volumes, seen = [], [], set()
+    while len(keywords) < count:
+        keyword = f"{rng.choice(HEAD_TERMS)} {' '.join(rng.choices(words, weights, k=rng.randint(1, 3)))}"
+        variant = rng.random()
+        if variant < 0.2:
+            keyword += "s"
+        elif variant < 0.4:
+            keyword = f"{keyword} {rng.choice(MODIFIERS)}"
+        elif variant < 0.5:
+            keyword = keyword.replace(" ", "-", 1)
+        if keyword.casefold() not in seen:
+            seen.add(keyword.casefold())
+            keywords.append(keyword)
+            volumes.append(rng.choice((None, rng.randint(10, 50_000))))
+    return keywords, volumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000, 100000], help="Keyword list sizes")
+    parser.add_argument("--threshold", type=float, default=0.6, help="Jaccard threshold passed to cluster_keywords")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct long-tail words keywords are drawn from")
+    args = parser.parse_args()
+
+    print(f"{'keywords':>9} {'seconds':>8} {'us/kw':>6} {'clusters':>9} {'largest':>8} {'skippable':>10}")
+    for size in args.sizes:
+        keywords, volumes = synthetic_keywords(size, args.vocabulary)
+        start = time.perf_counter()
+        clusters = cluster_keywords(keywords, volumes, args.threshold)
+        seconds = time.perf_counter() - start
+        print(f"{size:>9} {seconds:>8.2f} {seconds / size * 1e6:>6.1f} {len(clusters):>9} "
+              f"{max(map(len, clusters)):>8} {1 - len(clusters) / size:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
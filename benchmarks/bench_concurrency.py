@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark
+Fires tool calls at a local mock API serially and concurrently and reports throughput
+
+Usage: python -m benchmarks.bench_concurrency [--calls 50] [--latency 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from stdio_server import KwrdsApiMCPServer
+
+def _arguments(index: int) -> dict:
+    # Distinct queries so neither the cache nor request coalescing can help
+    return {"search_question": f"running shoes {index}", "search_country": "en-US"}
+
+
+async def _serial(server: KwrdsApiMCPServer, calls: int) -> float:
+    start = time.perf_counter()
+    for index in range(calls):
+        await server._route_tool_call("serp", _arguments(index), "bench-key")
+    return time.perf_counter() - start
+
+
+async def _concurrent(server: KwrdsApiMCPServer, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(server._route_tool_call("serp", _arguments(calls + index), "bench-key") for index in range(calls)))
+    return time.perf_counter() - start
+
+
+async def run_benchmark(base_url: str, calls: int):
+    os.environ["KWRDS_API_BASE_URL"] = base_url
+    os.environ["KWRDS_PAA_BASE_URL"] = base_url
+    os.environ["KWRDS_CACHE_MAX_MB"] = "0"
+    # Measure concurrency, not the client-side rate limiter and credit governor
+    os.environ["KWRDS_RATE_LIMIT"] = "0"
+    os.environ["KWRDS_QUOTA_RESERVE"] = "0"
+    server = KwrdsApiMCPServer()
+    try:
+        for label, runner in (("serial", _serial), ("concurrent", _concurrent)):
+            elapsed = await runner(server, calls)
+            print(f"{label:>10}: {calls} calls in {elapsed:.3f}s ({calls / elapsed:.1f} calls/s)")
+        latency = server.metrics.snapshot()["tools"]["serp"]["latency"]
+        print(f"  tool p50: {latency['p50'] * 1000:.1f}ms  p99: {latency['p99'] * 1000:.1f}ms")
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API latency per request in seconds")
+    args = parser.parse_args()
+    with MockApiThread(latency=args.latency) as api:
+        asyncio.run(run_benchmark(api.base_url, args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+JSON backend microbenchmark
+Compares every installed backend (stdlib json, orjson, msgspec) on API payloads:
+decoding the upstream body, encoding the compact tool result, and the whole tool
+path of decode, shape and render
+
+Usage: python -m benchmarks.bench_json [--payload-scale 20] [--repeat 50]
+           [--cache-dir DIR] [--files a.json b.json]
+
+Payloads are the mock API's responses by default; --cache-dir replays bodies recorded
+in a persistent KWRDS_CACHE_DIR cache and --files reads JSON files.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import build_response
+from utils.response_utils import shape_response
+from utils.serialization import JsonCodec, available_codecs
+
+MOCK_ENDPOINTS = ("/keywords-with-volumes", "/serp", "/serp-detailed", "/url-rankings", "/people-also-ask", "/ai/content")
+
+
+def mock_payloads(scale: float) -> List[Tuple[str, bytes]]:
+    return [
+        (endpoint, json.dumps(build_response(endpoint, {"search_question": "running shoes"}, scale)).encode("utf-8"))
+        for endpoint in MOCK_ENDPOINTS
+    ]
+
+
+def recorded_payloads(cache_dir: str, limit: int = 200) -> List[Tuple[str, bytes]]:
+    """Raw upstream bodies from a persistent response cache, largest per endpoint first"""
+    conn = sqlite3.connect(os.path.join(cache_dir, "responses.sqlite3"))
+    try:
+        rows = conn.execute("SELECT endpoint, body FROM responses ORDER BY size DESC LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [(endpoint, zlib.decompress(body)) for endpoint, body in rows]
+
+
+def file_payloads(paths: List[str]) -> List[Tuple[str, bytes]]:
+    payloads = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "rb") as payload:
+                payloads.append((os.path.basename(path), payload.read()))
+    return payloads
+
+
+def _time_per_call(function: Callable[[], object], repeat: int) -> float:
+    """Best-of-three mean seconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def measure(codec: JsonCodec, body: bytes, repeat: int) -> Dict[str, float]:
+    decoded = codec.loads(body)
+    shaped = shape_response(decoded, max_items=10)
+    return {
+        "decode": _time_per_call(lambda: codec.loads(body), repeat),
+        "encode": _time_per_call(lambda: codec.dumps(decoded), repeat),
+        "tool_path": _time_per_call(lambda: codec.dumps(shape_response(codec.loads(body), max_items=10)), repeat),
+        "output_bytes": len(codec.dumps_bytes(shaped)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload-scale", type=float, default=20.0, help="Multiplier for mock response sizes")
+    parser.add_argument("--repeat", type=int, default=50, help="Calls per timing round")
+    parser.add_argument("--cache-dir", help="Replay bodies recorded in this persistent response cache")
+    parser.add_argument("--files", nargs="+", help="JSON files (or globs) to use as payloads")
+    args = parser.parse_args()
+
+    if args.cache_dir:
+        payloads = recorded_payloads(args.cache_dir)
+    elif args.files:
+        payloads = file_payloads(args.files)
+    else:
+        payloads = mock_payloads(args.payload_scale)
+    if not payloads:
+        parser.error("no payloads found")
+
+    codecs = available_codecs()
+    print(f"backends: {', '.join(codecs)}; payloads: {len(payloads)}, {sum(len(body) for _, body in payloads) // 1024} KiB")
+    print(f"{'payload':>24} {'KiB':>7} {'backend':>8} {'decode us':>10} {'encode us':>10} {'tool us':>9} {'MB/s in':>8} {'speedup':>8}")
+    totals: Dict[str, float] = {name: 0.0 for name in codecs}
+    for name, body in payloads:
+        results = {backend: measure(codec, body, args.repeat) for backend, codec in codecs.items()}
+        baseline = results["json"]["tool_path"]
+        for backend, result in results.items():
+            totals[backend] += result["tool_path"]
+            print(f"{name[-24:]:>24} {len(body) / 1024:>7.1f} {backend:>8} {result['decode'] * 1e6:>10.1f} "
+                  f"{result['encode'] * 1e6:>10.1f} {result['tool_path'] * 1e6:>9.1f} "
+                  f"{len(body) / result['decode'] / 1e6:>8.1f} {baseline / result['tool_path']:>7.2f}x")
+    print("tool path total: " + ", ".join(
+        f"{backend} {seconds * 1e3:.2f}ms ({totals['json'] / seconds:.2f}x)" for backend, seconds in totals.items()
+    ))
+
+
+if __name__ == "__main__":
+    main()
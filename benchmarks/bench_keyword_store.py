@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Local keyword store benchmark
+Fills a KeywordStore with synthetic keyword responses and times the lookups
+local_keyword_search serves: exact keyword volumes, word and prefix queries, and
+terms related to a seed. No network is involved.
+
+Usage: python -m benchmarks.bench_keyword_store [--rows 200000] [--queries 2000] [--persist DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_store import KeywordDatabase, KeywordStore
+
+WORDS = ("best running trail shoes men women cheap waterproof hiking boots size wide review sale near me "
+         "laptop gaming budget stand desk standing ergonomic chair office home coffee grinder burr espresso "
+         "machine bean how to what is vs for with under 100 2024 guide kids winter summer black white").split()
+
+RESPONSE_SIZE = 50
+
+
+def synthetic_responses(rows: int, seed: int = 7):
+    """(seed term, keyword response) pairs covering about `rows` distinct keywords"""
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < rows:
+        seed_term = " ".join(rng.sample(WORDS, 2))
+        records = []
+        for _ in range(RESPONSE_SIZE):
+            keyword = f"{seed_term} {' '.join(rng.sample(WORDS, rng.randint(1, 3)))} {rng.randint(0, 999)}"
+            seen.add(keyword)
+            records.append({"keyword": keyword, "volume": rng.randint(0, 100_000), "cpc": rng.random() * 5,
+                            "competition": rng.random()})
+        yield seed_term, {"keywords": records}
+
+
+def _per_call(function: Callable[[int], object], count: int) -> float:
+    start = time.perf_counter()
+    for index in range(count):
+        function(index)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Distinct keywords to store")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups timed per query type")
+    parser.add_argument("--persist", help="Also write through to a KeywordDatabase in this directory and reload it")
+    args = parser.parse_args()
+
+    responses = list(synthetic_responses(args.rows))
+    seeds: List[str] = [seed_term for seed_term, _ in responses]
+    # Only the store is traced; keyword strings are shared with the responses, so this is columns and indexes
+    tracemalloc.start()
+    store = KeywordStore(max_rows=args.rows * 2, backend=KeywordDatabase(args.persist) if args.persist else None)
+    start = time.perf_counter()
+    for seed_term, response in responses:
+        store.record("bench-key", "/keywords-with-volumes", {"search_question": seed_term, "search_country": "en-US"}, response)
+    load_seconds = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rows = store.stats()["rows"]
+    print(f"stored {rows} rows from {len(seeds)} responses in {load_seconds:.2f}s "
+          f"({load_seconds / len(seeds) * 1e6:.0f}us per response), {memory / rows:.0f} bytes per row")
+
+    rng = random.Random(11)
+    table = store._table(store._partition("bench-key"), "en-us")
+    exact = [rng.sample(table.keywords, 10) for _ in range(args.queries)]
+    words = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    prefixes = [" ".join(word[:3] for word in rng.sample(WORDS, 2)) for _ in range(args.queries)]
+    related = [rng.choice(seeds) for _ in range(args.queries)]
+
+    timings = {
+        "10 exact keywords": lambda index: store.search("bench-key", "en-US", keywords=exact[index]),
+        "two-word query": lambda index: store.search("bench-key", "en-US", query=words[index], prefix=False),
+        "two-prefix query": lambda index: store.search("bench-key", "en-US", query=prefixes[index]),
+        "related to a seed": lambda index: store.search("bench-key", "en-US", related_to=related[index]),
+    }
+    for label, function in timings.items():
+        print(f"{label:>18}: {_per_call(function, args.queries) * 1e6:8.1f}us per lookup")
+
+    if args.persist:
+        store.close()
+        start = time.perf_counter()
+        reloaded = KeywordStore(backend=KeywordDatabase(args.persist))
+        reloaded.search("bench-key", "en-US", query="best")
+        print(f"reloaded {reloaded.stats()['rows']} rows from {args.persist} in {time.perf_counter() - start:.2f}s")
+        reloaded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Scheduling lanes benchmark
+Mixed load: one API key floods slow AI calls while another sends quick SERP
+lookups, first with every tool sharing one concurrency cap, then with the lanes
+from tools/definitions.py. A second scenario floods lookups from one key and
+times a handful from another to show fair queuing between keys.
+
+Usage: python -m benchmarks.bench_lanes [--ai-calls 48] [--lookups 32] [--ai-latency 2.0]
+           [--latency 0.05] [--shared-limit 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from stdio_server import KwrdsApiMCPServer
+from utils.scheduler import LaneScheduler
+
+AI_PATHS = ("/ai", "/ai/content", "/paa-ai")
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _summary(latencies: List[float]) -> str:
+    ordered = sorted(latencies)
+    return (f"p50 {_percentile(ordered, 0.5) * 1000:.0f}ms  p99 {_percentile(ordered, 0.99) * 1000:.0f}ms  "
+            f"max {ordered[-1] * 1000:.0f}ms")
+
+
+async def _timed(server: KwrdsApiMCPServer, tool: str, arguments: Dict, api_key: str) -> float:
+    start = time.perf_counter()
+    await server._route_tool_call(tool, arguments, api_key)
+    return time.perf_counter() - start
+
+
+def _serp(index: int) -> Dict:
+    return {"search_question": f"running shoes {index}", "search_country": "en-US"}
+
+
+async def mixed_load(server: KwrdsApiMCPServer, args) -> List[float]:
+    """Lookup latencies from one key while another key's AI calls are queued"""
+    ai_calls = [
+        asyncio.create_task(_timed(server, "ai_content", {"search_question": f"laptops {index}", "search_country": "en-US",
+                                                          "prompt": "Get_SEO_Outline"}, "ai-key"))
+        for index in range(args.ai_calls)
+    ]
+    await asyncio.sleep(0.05)
+    lookups = []
+    for index in range(args.lookups):
+        lookups.append(asyncio.create_task(_timed(server, "serp", _serp(index), "lookup-key")))
+        await asyncio.sleep(args.latency / 2)
+    latencies = await asyncio.gather(*lookups)
+    await asyncio.gather(*ai_calls)
+    return latencies
+
+
+async def fairness(server: KwrdsApiMCPServer, args) -> Dict[str, List[float]]:
+    """Latencies of a bulk key's lookup burst and of a few lookups sent right after it by another key"""
+    burst = [asyncio.create_task(_timed(server, "serp", _serp(10_000 + index), "bulk-key"))
+             for index in range(args.shared_limit * 10)]
+    await asyncio.sleep(0)
+    interactive = [asyncio.create_task(_timed(server, "serp", _serp(20_000 + index), "interactive-key"))
+                   for index in range(8)]
+    return {"bulk": list(await asyncio.gather(*burst)), "interactive": list(await asyncio.gather(*interactive))}
+
+
+async def run_benchmark(base_url: str, args):
+    os.environ["KWRDS_API_BASE_URL"] = base_url
+    os.environ["KWRDS_PAA_BASE_URL"] = base_url
+    os.environ["KWRDS_CACHE_MAX_MB"] = "0"
+    os.environ["KWRDS_RATE_LIMIT"] = "0"
+    os.environ["KWRDS_HTTP_MAX_CONNECTIONS"] = str(args.shared_limit * 4)
+    server = KwrdsApiMCPServer()
+    try:
+        # Fetch each key's credit balance first so quota refreshes stay out of the timings
+        for api_key in ("ai-key", "lookup-key", "bulk-key", "interactive-key"):
+            await server._route_tool_call("serp", _serp(-1), api_key)
+
+        lanes = server.registry.scheduler
+        # Baseline: every tool in one lane with a single shared cap
+        server.registry.scheduler = LaneScheduler({name: args.shared_limit for name in lanes.stats()})
+        for name in ("ai", "ai_content", "paa_ai", "keyword_report"):
+            server.registry.get(name).lane = "lookup"
+        print(f"shared cap of {args.shared_limit}: lookups {_summary(await mixed_load(server, args))}")
+
+        server.registry.scheduler = lanes
+        for name in ("ai", "ai_content", "paa_ai"):
+            server.registry.get(name).lane = "ai"
+        server.registry.get("keyword_report").lane = "report"
+        limits = ", ".join(f"{name}={lane['limit']}" for name, lane in lanes.stats().items())
+        print(f"lanes ({limits}): lookups {_summary(await mixed_load(server, args))}")
+
+        results = await fairness(server, args)
+        print(f"fair queuing: {len(results['bulk'])}-call burst from one key {_summary(results['bulk'])}")
+        print(f"              8 calls from another key right after it {_summary(results['interactive'])}")
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ai-calls", type=int, default=48, help="Slow AI calls in the flood")
+    parser.add_argument("--lookups", type=int, default=32, help="Quick lookups timed during the flood")
+    parser.add_argument("--ai-latency", type=float, default=2.0, help="Mock latency of AI endpoints in seconds")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock latency of every other endpoint in seconds")
+    parser.add_argument("--shared-limit", type=int, default=16, help="Concurrency cap of the single-lane baseline")
+    args = parser.parse_args()
+    with MockApiThread(latency=args.latency, latency_by_path={path: args.ai_latency for path in AI_PATHS}) as api:
+        asyncio.run(run_benchmark(api.base_url, args))
+
+
+if __name__ == "__main__":
+    main()
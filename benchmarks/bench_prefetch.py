@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prefetch benchmark
+Replays a typical agent session against the mock API: keywords, then search_volume
+and serp on the top results, then paa and paa_ai on its first question, with think
+time between steps. Runs once without and once with the prefetcher and reports
+follow-up latency, prefetch hit rate and credits spent.
+
+Usage: python -m benchmarks.bench_prefetch [--sessions 8] [--latency 0.3] [--think 0.5] [--budget 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from stdio_server import KwrdsApiMCPServer
+from utils.prefetch import PAA_FOLLOW_UPS, SERP_FOLLOW_UPS
+from utils.response_utils import extract_records
+
+SESSION_KEY = "bench-key"
+
+
+async def _timed(server: KwrdsApiMCPServer, tool: str, arguments: Dict[str, Any], latencies: List[float]) -> Any:
+    start = time.perf_counter()
+    result = await server._route_tool_call(tool, arguments, SESSION_KEY)
+    latencies.append(time.perf_counter() - start)
+    return result
+
+
+async def session(server: KwrdsApiMCPServer, index: int, think: float, latencies: List[float]):
+    """One agent session; only follow-up calls are timed"""
+    seed = f"standing desk {index}"
+    keywords = await server._route_tool_call("keywords", {"search_question": seed, "search_country": "en-US"}, SESSION_KEY)
+    shown = [record["keyword"] for record in extract_records(keywords)]
+    await asyncio.sleep(think)
+    await _timed(server, "search_volume", {"keywords": shown, "search_country": "en-US"}, latencies)
+    for keyword in shown[:SERP_FOLLOW_UPS]:
+        await _timed(server, "serp", {"search_question": keyword, "search_country": "en-US"}, latencies)
+
+    paa = await server._route_tool_call("paa", {"keyword": seed, "search_country": "US", "search_language": "en"}, SESSION_KEY)
+    await asyncio.sleep(think)
+    for question in paa["questions"][:PAA_FOLLOW_UPS]:
+        await _timed(server, "paa_ai", {"search_question": seed, "search_country": "en-US", "question": question,
+                                        "prompt": "detailed"}, latencies)
+
+
+async def run_pass(base_url: str, args, budget: float) -> Dict[str, Any]:
+    os.environ.update({
+        "KWRDS_API_BASE_URL": base_url,
+        "KWRDS_PAA_BASE_URL": base_url,
+        "KWRDS_RATE_LIMIT": "0",
+        "KWRDS_CACHE_OPT_IN": "paa_ai",
+        "KWRDS_PREFETCH_BUDGET": str(budget),
+    })
+    server = KwrdsApiMCPServer()
+    try:
+        latencies: List[float] = []
+        await asyncio.gather(*(session(server, index, args.think, latencies) for index in range(args.sessions)))
+        ordered = sorted(latencies)
+        endpoints = server.metrics.snapshot()["endpoints"]
+        return {
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "max_ms": ordered[-1] * 1000,
+            "credits": sum(count for metrics in endpoints.values() for status, count in metrics["statuses"].items()
+                           if status == "200"),
+            "cache": server.cache.stats(),
+            "prefetch": server.prefetcher.stats() if server.prefetcher is not None else None,
+        }
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent agent sessions")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock API latency per request in seconds")
+    parser.add_argument("--think", type=float, default=0.5, help="Agent think time before follow-ups in seconds")
+    parser.add_argument("--budget", type=float, default=100, help="KWRDS_PREFETCH_BUDGET for the prefetch pass")
+    args = parser.parse_args()
+
+    with MockApiThread(latency=args.latency) as api:
+        for label, budget in (("no prefetch", 0), (f"prefetch (budget {args.budget:g}/h)", args.budget)):
+            result = asyncio.run(run_pass(api.base_url, args, budget))
+            cache = result["cache"]
+            print(f"{label:>26}: follow-up p50 {result['p50_ms']:.0f}ms  max {result['max_ms']:.0f}ms  "
+                  f"credits {result['credits']}  prefetched {cache['prefetched']}  "
+                  f"hits {cache['prefetch_hits']} ({cache['prefetch_hit_ratio']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Response shaping microbenchmark
+Compares the two-pass limit/truncate + indented JSON path with the single-pass
+shaper + compact JSON on large AI-style payloads, reporting time and peak memory
+
+Usage: python -m benchmarks.bench_shaping [--size-kb 500] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_utils import shape_response
+
+
+def build_payload(size_kb: int) -> dict:
+    """Build a nested AI-style response of roughly size_kb kilobytes"""
+    paragraph = "Keyword research helps content teams prioritise topics by demand and intent. " * 20
+    keyword_row_bytes = 1700
+    per_section = max(1, size_kb * 1024 // (8 * keyword_row_bytes))
+    sections = [
+        {
+            "heading": f"Section {index}",
+            "body": paragraph,
+            # Lists inside list items are not capped, only their strings are
+            "keywords": [{"keyword": f"topic {index} {i}", "volume": i * 10, "note": paragraph} for i in range(per_section)],
+            "meta": {"score": index / 3, "summary": paragraph[:1500]},
+        }
+        for index in range(8)
+    ]
+    return {"result": {"outline": sections, "title": "Best laptops"}, "questions": [paragraph] * 30}
+
+
+def _two_pass_limit(response, max_items):
+    # The pre-shaper limit_response_size: always rebuilds every dict
+    limited = {}
+    for key, value in response.items():
+        if isinstance(value, list) and len(value) > max_items:
+            limited[key] = value[:max_items]
+            limited[f"{key}_truncated"] = True
+            limited[f"{key}_total_count"] = len(value)
+            limited[f"{key}_showing"] = max_items
+        elif isinstance(value, dict):
+            limited[key] = _two_pass_limit(value, max_items)
+        else:
+            limited[key] = value
+    return limited
+
+
+def _two_pass_truncate(response, max_length):
+    # The pre-shaper truncate_string_fields: always rebuilds every dict and list
+    truncated = {}
+    for key, value in response.items():
+        if isinstance(value, str) and len(value) > max_length:
+            truncated[key] = value[:max_length] + "... [truncated]"
+        elif isinstance(value, dict):
+            truncated[key] = _two_pass_truncate(value, max_length)
+        elif isinstance(value, list):
+            truncated[key] = [
+                _two_pass_truncate(item, max_length) if isinstance(item, dict)
+                else (item[:max_length] + "... [truncated]" if isinstance(item, str) and len(item) > max_length else item)
+                for item in value
+            ]
+        else:
+            truncated[key] = value
+    return truncated
+
+
+def two_pass(payload: dict) -> str:
+    shaped = _two_pass_truncate(_two_pass_limit(payload, 10), 1000)
+    return json.dumps(shaped, indent=2, ensure_ascii=False)
+
+
+def single_pass(payload: dict) -> str:
+    shaped = shape_response(payload, max_items=10, max_length=1000)
+    return json.dumps(shaped, ensure_ascii=False, separators=(",", ":"))
+
+
+def measure(label: str, func, payload: dict, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = func(payload)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>12}: {elapsed * 1000:8.2f} ms/call  peak {peak / 1024:8.1f} KiB  output {len(text) / 1024:7.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-kb", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for size_kb in args.size_kb:
+        payload = build_payload(size_kb)
+        print(f"payload ~{len(json.dumps(payload)) / 1024:.0f} KiB")
+        measure("two-pass", two_pass, payload, args.repeat)
+        measure("single-pass", single_pass, payload, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the stdio server
+Spawns the server repeatedly and measures the time until it answers initialize and
+the first list_tools, then breaks import time down per package with python -X importtime
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--budget-ms 400] [--top 10]
+           [--save out.json] [--compare baseline.json --tolerance 0.2]
+
+The exit status is 1 when the median time to initialize exceeds the budget or, with
+--compare, grows by more than the tolerance against the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run under -X importtime: load the server module, build the server and report construction time
+PROFILE_SNIPPET = """
+import json, time
+import stdio_server
+start = time.perf_counter()
+stdio_server.KwrdsApiMCPServer().setup_server()
+print(json.dumps({"construct_ms": round((time.perf_counter() - start) * 1000, 2)}))
+"""
+
+
+def _server_env(metrics_file: str = "") -> Dict[str, str]:
+    env = dict(os.environ, KWRDS_API_KEY="bench-key")
+    if metrics_file:
+        env["KWRDS_METRICS_FILE"] = metrics_file
+    return env
+
+
+def import_profile(top: int) -> Dict[str, Any]:
+    """Import and construction cost of the server, with the slowest packages and modules"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_SNIPPET],
+        cwd=ROOT, env=_server_env(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in modules:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    slowest_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    slowest_modules = sorted(modules, key=lambda module: module[1], reverse=True)[:top]
+    return {
+        "import_ms": round(sum(self_us for _, self_us, _ in modules) / 1000, 1),
+        "construct_ms": json.loads(completed.stdout.strip().splitlines()[-1])["construct_ms"],
+        "packages": [{"package": package, "ms": round(us / 1000, 1)} for package, us in slowest_packages],
+        "modules": [{"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+                    for name, self_us, cumulative_us in slowest_modules],
+    }
+
+
+async def cold_start() -> Dict[str, Any]:
+    """Spawn the server once; time initialize and list_tools and read its own startup metric"""
+    with tempfile.TemporaryDirectory() as directory:
+        metrics_file = os.path.join(directory, "metrics.json")
+        params = StdioServerParameters(command=sys.executable, args=[os.path.join(ROOT, "stdio_server.py")],
+                                       env=_server_env(metrics_file))
+        start = time.perf_counter()
+        async with stdio_client(params) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                initialize_ms = (time.perf_counter() - start) * 1000
+                tools = await session.list_tools()
+                list_tools_ms = (time.perf_counter() - start) * 1000
+        # The final metrics dump is written as the server shuts down
+        server_ready_ms = None
+        if os.path.exists(metrics_file):
+            with open(metrics_file, encoding="utf-8") as snapshot:
+                startup_seconds = json.load(snapshot).get("startup_seconds")
+            if startup_seconds is not None:
+                server_ready_ms = startup_seconds * 1000
+    return {"initialize_ms": initialize_ms, "list_tools_ms": list_tools_ms,
+            "server_ready_ms": server_ready_ms, "tools": len(tools.tools)}
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(samples), 1),
+        "min": round(min(samples), 1),
+        "max": round(max(samples), 1),
+    }
+
+
+async def run_benchmark(runs: int) -> Dict[str, Any]:
+    samples = [await cold_start() for _ in range(runs)]
+    results: Dict[str, Any] = {"runs": runs, "tools": samples[-1]["tools"]}
+    for metric in ("initialize_ms", "list_tools_ms", "server_ready_ms"):
+        values = [sample[metric] for sample in samples if sample[metric] is not None]
+        results[metric] = _summary(values) if values else None
+    return results
+
+
+def _regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems = []
+    for metric in ("initialize_ms", "list_tools_ms"):
+        current, previous = results.get(metric), baseline.get(metric)
+        if current and previous and current["median"] > previous["median"] * (1 + tolerance):
+            problems.append(f"median {metric} {current['median']}ms vs baseline {previous['median']}ms")
+    return problems
+
+
+def _print_results(results: Dict[str, Any]):
+    profile = results["profile"]
+    print(f"imports: {profile['import_ms']}ms, server construction: {profile['construct_ms']}ms")
+    print(f"{'package':>28} {'ms':>8}")
+    for package in profile["packages"]:
+        print(f"{package['package']:>28} {package['ms']:>8}")
+    print(f"{'module':>44} {'self ms':>8} {'cum ms':>8}")
+    for module in profile["modules"]:
+        print(f"{module['module'][-44:]:>44} {module['self_ms']:>8} {module['cumulative_ms']:>8}")
+    print(f"cold starts: {results['runs']}, tools listed: {results['tools']}")
+    print(f"{'metric':>16} {'median':>8} {'min':>8} {'max':>8}")
+    for metric in ("server_ready_ms", "initialize_ms", "list_tools_ms"):
+        r = results[metric]
+        if r is not None:
+            print(f"{metric:>16} {r['median']:>8} {r['min']:>8} {r['max']:>8}")
+    print(f"budget: {results['budget_ms']}ms to initialize")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--budget-ms", type=float, default=400, help="Allowed median time to initialize (default: 400)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages and modules to list")
+    parser.add_argument("--save", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --save run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.runs))
+    results["profile"] = import_profile(args.top)
+    results["budget_ms"] = args.budget_ms
+    _print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    problems = []
+    if results["initialize_ms"]["median"] > args.budget_ms:
+        problems.append(f"median initialize {results['initialize_ms']['median']}ms exceeds the {args.budget_ms}ms budget")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            problems += _regressions(results, json.load(baseline_file), args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark over the stdio MCP transport
+Starts the server as a subprocess against a local mock API, drives it with a real
+MCP client and reports throughput, latency percentiles and server RSS for serial
+and concurrent workloads
+
+Usage: python -m benchmarks.bench_stdio [--calls 200] [--concurrency 16] [--latency 0.05]
+           [--payload-scale 1] [--error-rate 0] [--tools serp,keywords] [--save out.json]
+           [--compare baseline.json --tolerance 0.2]
+
+With --compare the exit status is 1 when throughput drops or p99 latency grows by
+more than the tolerance against the baseline, so the run can gate a release.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.mock_api import MockApiThread
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Arguments per tool for call number i; distinct per call so neither the cache nor coalescing helps
+WORKLOAD: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "keywords": lambda i: {"search_question": f"running shoes {i}", "search_country": "en-US"},
+    "keywords_with_volumes": lambda i: {"search_question": f"trail shoes {i}", "search_country": "en-US"},
+    "search_volume": lambda i: {"keywords": [f"shoe {i} {j}" for j in range(25)], "search_country": "en-US"},
+    "related_keywords": lambda i: {"search_question": f"hiking boots {i}", "search_country": "en-US"},
+    "lsi": lambda i: {"search_question": f"sneakers {i}", "search_country": "en-US"},
+    "serp": lambda i: {"search_question": f"best running shoes {i}", "search_country": "en-US"},
+    "serp_detailed": lambda i: {"url": f"https://example.com/shoes/{i}"},
+    "url_rankings": lambda i: {"url": f"example{i}.com", "search_country": "en-US"},
+    "paa": lambda i: {"keyword": f"running shoes {i}", "search_country": "US", "search_language": "en"},
+    "paa_ai": lambda i: {"search_question": f"running shoes {i}", "search_country": "en-US",
+                         "question": f"are running shoes {i} worth it?", "prompt": "detailed"},
+    "ai": lambda i: {"search_question": f"running shoes {i}", "search_country": "en-US", "prompt": "Get_Longtail_Keywords"},
+    "ai_content": lambda i: {"search_question": f"running shoes {i}", "search_country": "en-US", "prompt": "Get_SEO_Outline"},
+}
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def _child_pids() -> Set[int]:
+    """PIDs of this process's children (Linux only; empty elsewhere)"""
+    pids: Set[int] = set()
+    try:
+        for task in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{task}/children") as children:
+                pids.update(int(pid) for pid in children.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+def _memory_mb(pid: Optional[int]) -> Dict[str, Optional[float]]:
+    """Current and peak RSS of a process in MiB from /proc, None where unavailable"""
+    memory: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None}
+    if pid is None:
+        return memory
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    memory["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith("VmHWM:"):
+                    memory["peak_rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return memory
+
+
+def _is_error(text: str) -> bool:
+    try:
+        result = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(result, dict) and "error" in result
+
+
+async def _call(session: ClientSession, tools: List[str], index: int) -> Tuple[float, bool]:
+    name = tools[index % len(tools)]
+    start = time.perf_counter()
+    result = await session.call_tool(name, WORKLOAD[name](index))
+    elapsed = time.perf_counter() - start
+    return elapsed, result.isError or _is_error(result.content[0].text)
+
+
+async def _workload(session: ClientSession, tools: List[str], calls: int, concurrency: int, offset: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> Tuple[float, bool]:
+        async with semaphore:
+            return await _call(session, tools, offset + index)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(bounded(index) for index in range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput": round(calls / elapsed, 1),
+        "errors": sum(1 for _, failed in samples if failed),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p90_ms": round(_percentile(latencies, 0.90) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+async def run_benchmark(args, base_url: str) -> Dict[str, Any]:
+    env = dict(
+        os.environ,
+        KWRDS_API_BASE_URL=base_url,
+        KWRDS_PAA_BASE_URL=base_url,
+        KWRDS_API_KEY="bench-key",
+        KWRDS_RATE_LIMIT=str(args.rate_limit),
+        KWRDS_QUOTA_RESERVE="0",
+    )
+    if not args.cache:
+        env["KWRDS_CACHE_MAX_MB"] = "0"
+    tools = args.tools.split(",") if args.tools else list(WORKLOAD)
+    params = StdioServerParameters(command=sys.executable, args=[os.path.join(ROOT, "stdio_server.py")], env=env)
+
+    before = _child_pids()
+    startup = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            startup_ms = round((time.perf_counter() - startup) * 1000, 1)
+            server_pid = next(iter(_child_pids() - before), None)
+            results: Dict[str, Any] = {"startup_ms": startup_ms, "idle": _memory_mb(server_pid), "tools": tools}
+
+            await _workload(session, tools, min(args.calls, 2 * len(tools)), 1, offset=10_000_000)
+            results["serial"] = await _workload(session, tools, args.calls, 1, offset=0)
+            results["serial"].update(_memory_mb(server_pid))
+            results["concurrent"] = await _workload(session, tools, args.calls, args.concurrency, offset=args.calls)
+            results["concurrent"].update(_memory_mb(server_pid))
+    return results
+
+
+def _regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems = []
+    for workload in ("serial", "concurrent"):
+        current, previous = results[workload], baseline.get(workload)
+        if not previous:
+            continue
+        if current["throughput"] < previous["throughput"] * (1 - tolerance):
+            problems.append(f"{workload} throughput {current['throughput']}/s vs baseline {previous['throughput']}/s")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            problems.append(f"{workload} p99 {current['p99_ms']}ms vs baseline {previous['p99_ms']}ms")
+    return problems
+
+
+def _print_results(results: Dict[str, Any]):
+    print(f"tools: {', '.join(results['tools'])}")
+    print(f"startup: {results['startup_ms']}ms, idle RSS: {results['idle']['rss_mb']} MiB")
+    print(f"{'workload':>10} {'calls':>6} {'conc':>5} {'calls/s':>9} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'errors':>6} {'RSS MiB':>8} {'peak MiB':>9}")
+    for workload in ("serial", "concurrent"):
+        r = results[workload]
+        print(f"{workload:>10} {r['calls']:>6} {r['concurrency']:>5} {r['throughput']:>9} {r['p50_ms']:>8} "
+              f"{r['p90_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8} {r['errors']:>6} {str(r['rss_mb']):>8} "
+              f"{str(r['peak_rss_mb']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="Calls per workload")
+    parser.add_argument("--concurrency", type=int, default=16, help="Calls in flight in the concurrent workload")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock API latency per request in seconds")
+    parser.add_argument("--payload-scale", type=float, default=1.0, help="Multiplier for mock response sizes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock responses that fail (500/502/503/429)")
+    parser.add_argument("--tools", help=f"Comma-separated tools to cycle through (default: all of {', '.join(WORKLOAD)})")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--rate-limit", type=float, default=0, help="KWRDS_RATE_LIMIT for the server (default: off)")
+    parser.add_argument("--save", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --save run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    unknown = [name for name in (args.tools or "").split(",") if name and name not in WORKLOAD]
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)}")
+
+    with MockApiThread(latency=args.latency, error_rate=args.error_rate, payload_scale=args.payload_scale) as api:
+        results = asyncio.run(run_benchmark(args, api.base_url))
+    results["settings"] = {key: value for key, value in vars(args).items() if key not in ("save", "compare")}
+    _print_results(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            problems = _regressions(results, json.load(baseline_file), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Local stand-in for the kwrds.ai API
+Serves canned responses with configurable latency and injected faults so benchmarks never hit the paid API
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+def _keyword_rows(seed: str, count: int) -> Dict[str, Any]:
+    """Build a keyword list response for a seed term"""
+    return {
+        "keywords": [
+            {"keyword": f"{seed} {i}", "volume": 1000 - i, "cpc": 1.5, "competition": 0.4}
+            for i in range(count)
+        ]
+    }
+
+
+def build_response(path: str, payload: Dict[str, Any], scale: float = 1.0) -> Dict[str, Any]:
+    """Return a canned response for an endpoint path; scale multiplies list lengths and text size"""
+    seed = payload.get("search_question") or payload.get("keyword") or payload.get("url") or "seed"
+
+    def sized(count: int) -> int:
+        return max(1, round(count * scale))
+
+    if path in ("/keywords", "/keywords-with-volumes", "/related-keywords", "/lsi"):
+        return _keyword_rows(seed, sized(25))
+    if path == "/search-volume":
+        keywords = payload.get("keywords", "")
+        keywords = keywords.split(",") if isinstance(keywords, str) else keywords
+        return {"keywords": [{"keyword": k, "volume": 100, "cpc": 0.5, "competition": 0.1} for k in keywords]}
+    if path == "/serp":
+        return {"results": [{"position": i + 1, "url": f"https://example.com/{seed}/{i}", "title": f"{seed} result {i}"} for i in range(sized(20))]}
+    if path == "/serp-detailed":
+        return {
+            "url": seed,
+            "title": f"{seed} title",
+            "meta_description": f"Meta description for {seed}. " * sized(5),
+            "headings": [f"{seed} heading {i}" for i in range(sized(20))],
+        }
+    if path == "/url-rankings":
+        return {"rankings": [
+            {"keyword": f"{seed} keyword {i}", "position": i % 100 + 1, "volume": 5000 - i, "traffic": 100 - i % 100}
+            for i in range(sized(50))
+        ]}
+    if path == "/people-also-ask":
+        return {"questions": [f"what is {seed} {i}?" for i in range(sized(15))]}
+    if path in ("/ai", "/ai/content", "/paa-ai"):
+        return {"result": f"Generated text about {seed}. " * sized(50)}
+    if path == "/usage_count":
+        return {"usage": 10, "limit": 1_000_000}
+    return {"ok": True, "path": path}
+
+
+class MockKwrdsApi:
+    """Minimal asyncio HTTP/1.1 server emulating the kwrds.ai endpoints
+
+    Faults: error_rate answers that fraction of requests with a random status from
+    error_statuses, fail_next() queues exact statuses for the next requests, and a
+    status of 0 in either place makes the server hang until the client gives up.
+    latency_by_path overrides the latency for individual endpoints, e.g. slow AI paths.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05,
+                 error_rate: float = 0.0, error_statuses: Iterable[int] = (500, 502, 503, 429),
+                 retry_after: Optional[float] = None, payload_scale: float = 1.0,
+                 latency_by_path: Optional[Dict[str, float]] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.retry_after = retry_after
+        self.payload_scale = payload_scale
+        self.latency_by_path = dict(latency_by_path or {})
+        self.requests_served = 0
+        self.faults_injected = 0
+        self._scripted_faults: deque = deque()
+        self._connections: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def fail_next(self, *statuses: int):
+        """Answer the next requests with these statuses (0 hangs the connection)"""
+        self._scripted_faults.extend(statuses)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        """Start listening; picks a free port when port is 0"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening, drop open connections and close the server"""
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self._connections):
+                connection.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = b""
+        length = int(headers.get("content-length", "0"))
+        if length:
+            body = await reader.readexactly(length)
+        return method, target, headers, body
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, response, extra_headers = await self.handle(method, target, headers, body)
+                encoded = json.dumps(response).encode("utf-8")
+                header_lines = "".join(f"{name}: {value}\r\n" for name, value in extra_headers.items())
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(encoded)}\r\n"
+                    f"{header_lines}"
+                    f"Connection: keep-alive\r\n\r\n".encode("latin-1") + encoded
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    def _next_fault(self) -> Optional[int]:
+        if self._scripted_faults:
+            return self._scripted_faults.popleft()
+        if self.error_rate and random.random() < self.error_rate:
+            return random.choice(self.error_statuses)
+        return None
+
+    async def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Produce the status code, JSON body and extra headers for one request"""
+        parts = urlsplit(target)
+        if method == "GET":
+            payload = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        else:
+            payload = json.loads(body or b"{}")
+        latency = self.latency_by_path.get(parts.path, self.latency)
+        if latency:
+            await asyncio.sleep(latency)
+        self.requests_served += 1
+        fault = self._next_fault()
+        if fault is not None:
+            self.faults_injected += 1
+            if fault == 0:
+                await asyncio.Event().wait()
+            extra_headers = {"Retry-After": str(self.retry_after)} if fault == 429 and self.retry_after is not None else {}
+            return fault, {"detail": f"Injected fault {fault}"}, extra_headers
+        return 200, build_response(parts.path, payload, self.payload_scale), {}
+
+
+class MockApiThread:
+    """Run a MockKwrdsApi on its own event loop in a background thread"""
+
+    def __init__(self, **kwargs):
+        self.api = MockKwrdsApi(**kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self) -> MockKwrdsApi:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.api.start(), self._loop).result()
+        return self.api
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.api.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+async def _serve_forever(args):
+    api = MockKwrdsApi(args.host, args.port, args.latency, args.error_rate,
+                       [int(status) for status in args.error_statuses.split(",")], args.retry_after, args.payload_scale)
+    await api.start()
+    print(f"Mock kwrds.ai API listening on {api.base_url}", flush=True)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the kwrds.ai API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds of latency added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-statuses", default="500,502,503,429", help="Statuses to pick injected errors from (0 hangs)")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--payload-scale", type=float, default=1.0, help="Multiplier for response list lengths and text size")
+    asyncio.run(_serve_forever(parser.parse_args()))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Command line tool for the persistent kwrds.ai response cache
+
+  python cache_cli.py stats               Entry counts and sizes per endpoint
+  python cache_cli.py inspect [--endpoint /serp] [--limit 20]
+  python cache_cli.py prune [--max-mb 500]
+  python cache_cli.py warm calls.jsonl    Run tool calls so their responses are cached
+
+The cache directory comes from --dir or the KWRDS_CACHE_DIR environment variable.
+Warm files hold one {"tool": ..., "arguments": {...}} object per line.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.disk_cache import DiskCache
+
+
+def _format_time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def cmd_stats(cache: DiskCache, args):
+    print(json.dumps(cache.stats(), indent=2))
+
+
+def cmd_inspect(cache: DiskCache, args):
+    now = time.time()
+    for entry in cache.entries(args.endpoint, args.limit):
+        state = "expired" if entry["expires_at"] <= now else f"expires {_format_time(entry['expires_at'])}"
+        print(f"{entry['endpoint']:<24} {entry['size']:>9}B -> {entry['stored_size']:>8}B  "
+              f"created {_format_time(entry['created_at'])}  {state}")
+        if args.keys:
+            print(f"    {entry['key']}")
+
+
+def cmd_prune(cache: DiskCache, args):
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+    removed = cache.prune(max_bytes)
+    print(f"Removed {removed} entries")
+
+
+async def _warm(path: str, concurrency: int):
+    from stdio_server import KwrdsApiMCPServer
+
+    server = KwrdsApiMCPServer()
+    # Lines are read as slots free up, so memory stays flat however long the file is
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    calls_run = 0
+    failures = 0
+
+    async def run_one(line_number: int, line: str):
+        nonlocal failures
+        call = {}
+        try:
+            call = json.loads(line)
+            arguments = call.get("arguments", {})
+            api_key = arguments.get("api_key", server.api_key)
+            await server._route_tool_call(call["tool"], arguments, api_key)
+        except Exception as e:
+            failures += 1
+            print(f"line {line_number}: {call.get('tool')} failed: {e}", file=sys.stderr)
+        finally:
+            slots.release()
+
+    try:
+        with open(path, encoding="utf-8") as calls:
+            for line_number, line in enumerate(calls, 1):
+                if not line.strip():
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(run_one(line_number, line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                calls_run += 1
+        await asyncio.gather(*tasks)
+        print(f"Warmed {calls_run - failures} of {calls_run} calls")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.aclose()
+
+
+def cmd_warm(cache: DiskCache, args):
+    cache.close()
+    os.environ["KWRDS_CACHE_DIR"] = args.dir
+    asyncio.run(_warm(args.file, args.concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=os.getenv("KWRDS_CACHE_DIR"), help="Cache directory (default: $KWRDS_CACHE_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="Show entry counts and sizes per endpoint").set_defaults(func=cmd_stats)
+
+    inspect = commands.add_parser("inspect", help="List cached entries, newest first")
+    inspect.add_argument("--endpoint", help="Only show one endpoint path, e.g. /serp")
+    inspect.add_argument("--limit", type=int, default=50)
+    inspect.add_argument("--keys", action="store_true", help="Print cache keys")
+    inspect.set_defaults(func=cmd_inspect)
+
+    prune = commands.add_parser("prune", help="Delete expired entries and optionally cap the size")
+    prune.add_argument("--max-mb", type=float, help="Delete oldest entries until the stored size fits")
+    prune.set_defaults(func=cmd_prune)
+
+    warm = commands.add_parser("warm", help="Run tool calls from a JSONL file to fill the cache")
+    warm.add_argument("file")
+    warm.add_argument("--concurrency", type=int, default=8)
+    warm.set_defaults(func=cmd_warm)
+
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("no cache directory; pass --dir or set KWRDS_CACHE_DIR")
+    cache = DiskCache(args.dir)
+    try:
+        args.func(cache, args)
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
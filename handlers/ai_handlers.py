@@ -3,16 +3,19 @@ AI Handlers
 Handles AI-powered keyword research and content generation MCP tool calls
 """
 
-from typing import Dict, Any
-from utils.http_client import make_api_request
-from utils.response_utils import limit_response_size, truncate_string_fields
+from typing import Dict, Any, Optional
+from utils.http_client import HttpClient
+from utils.result_store import ResultStore
+from utils.response_utils import shape_response
 
 
 class AIHandlers:
-    def __init__(self, api_base_url: str):
+    def __init__(self, api_base_url: str, http_client: HttpClient, result_store: Optional[ResultStore] = None):
         self.api_base_url = api_base_url
+        self.http_client = http_client
+        self.result_store = result_store
 
-    def handle_ai(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_ai(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle AI tool call"""
         url = f"{self.api_base_url}/ai"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
@@ -22,11 +25,10 @@ class AIHandlers:
             "prompt": args["prompt"],
             "email": api_key  # Using API key as email for compatibility
         }
-        response = make_api_request(url, headers, data)
-        limited_response = limit_response_size(response, max_items=10)
-        return truncate_string_fields(limited_response, max_length=1000)
+        response = await self.http_client.make_api_request(url, headers, data)
+        return shape_response(response, max_items=10, max_length=1000, result_store=self.result_store, api_key=api_key)
 
-    def handle_ai_content(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_ai_content(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle AI content generation tool call"""
         url = f"{self.api_base_url}/ai/content"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
@@ -40,6 +42,5 @@ class AIHandlers:
             data["title"] = args["title"]
         if "description" in args:
             data["description"] = args["description"]
-        response = make_api_request(url, headers, data)
-        limited_response = limit_response_size(response, max_items=10) 
-        return truncate_string_fields(limited_response, max_length=1000) 
\ No newline at end of file
+        response = await self.http_client.make_api_request(url, headers, data)
+        return shape_response(response, max_items=10, max_length=1000, result_store=self.result_store, api_key=api_key)
@@ -3,18 +3,26 @@ Analysis Handlers
 Handles SERP analysis, URL rankings, and PAA-related MCP tool calls
 """
 
-from typing import Dict, Any
-from utils.http_client import make_api_request
+from typing import Dict, Any, Optional
+from utils.http_client import HttpClient
+from utils.result_store import ResultStore
 from utils.response_utils import limit_response_size
 
 
 class AnalysisHandlers:
-    def __init__(self, api_base_url: str, paa_base_url: str):
+    def __init__(self, api_base_url: str, paa_base_url: str, http_client: HttpClient, result_store: Optional[ResultStore] = None):
         self.api_base_url = api_base_url
         self.paa_base_url = paa_base_url
+        self.http_client = http_client
+        self.result_store = result_store
 
-    def handle_serp(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_serp(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle SERP tool call"""
+        response = await self.fetch_serp(args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def fetch_serp(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Return the unshaped /serp response, for callers that shape a merged result"""
         url = f"{self.api_base_url}/serp"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         data = {
@@ -23,10 +31,9 @@ class AnalysisHandlers:
             "volume": args.get("volume", 0),
             "email": api_key  # Using API key as email for compatibility
         }
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10)
+        return await self.http_client.make_api_request(url, headers, data)
 
-    def handle_serp_detailed(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_serp_detailed(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle detailed SERP analysis tool call"""
         url = f"{self.api_base_url}/serp-detailed"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
@@ -34,9 +41,9 @@ class AnalysisHandlers:
             "url": args["url"],
             "email": api_key  # Using API key as email for compatibility
         }
-        return make_api_request(url, headers, data)
+        return await self.http_client.make_api_request(url, headers, data)
 
-    def handle_url_rankings(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_url_rankings(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle URL rankings tool call"""
         url = f"{self.api_base_url}/url-rankings"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
@@ -45,10 +52,15 @@ class AnalysisHandlers:
             "search_country": args["search_country"],
             "email": api_key  # Using API key as email for compatibility
         }
-        return make_api_request(url, headers, data)
+        return await self.http_client.make_api_request(url, headers, data)
 
-    def handle_paa(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_paa(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle PAA tool call"""
+        response = await self.fetch_paa(args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def fetch_paa(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Return the unshaped /people-also-ask response, for callers that shape a merged result"""
         url = f"{self.paa_base_url}/people-also-ask"
         headers = {"X-API-KEY": api_key}
         params = {
@@ -57,10 +69,9 @@ class AnalysisHandlers:
             "search_language": args["search_language"],
             "X-API-KEY": api_key
         }
-        response = make_api_request(url, headers, params=params, method="GET")
-        return limit_response_size(response, max_items=10)
+        return await self.http_client.make_api_request(url, headers, params=params, method="GET")
 
-    def handle_paa_ai(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_paa_ai(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle PAA AI tool call - AI-powered analysis of People Also Ask questions"""
         try:
             # Prepare the payload for the /paa-ai endpoint
@@ -75,7 +86,7 @@ class AnalysisHandlers:
             # Make request to the /paa-ai endpoint
             url = f"{self.api_base_url}/paa-ai"
             headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
-            response = make_api_request(url, headers, payload)
+            response = await self.http_client.make_api_request(url, headers, payload)
             return response
             
         except Exception as e:
@@ -85,7 +96,7 @@ class AnalysisHandlers:
                 "question": args.get("question", "")
             }
 
-    def handle_usage_count(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_usage_count(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle usage count requests"""
         try:
             url = f"{self.api_base_url}/usage_count"
@@ -93,7 +104,7 @@ class AnalysisHandlers:
                 "Accept": "application/json",
                 "X-API-KEY": api_key
             }
-            result = make_api_request(url, headers, method="GET")
+            result = await self.http_client.make_api_request(url, headers, method="GET")
             return result
             
         except Exception as e:
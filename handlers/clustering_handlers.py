@@ -0,0 +1,120 @@
+"""
+Clustering Handlers
+Groups keyword lists into clusters of near-duplicates with one representative each
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional, Set
+
+from handlers.analysis_handlers import AnalysisHandlers
+from utils.clustering import cluster_keywords
+from utils.keyword_store import KeywordStore
+from utils.response_utils import extract_records, limit_response_size
+from utils.result_store import ResultStore
+
+# Members listed per cluster; the rest are only counted
+MAX_CLUSTER_MEMBERS = 10
+# Clusters whose representatives get a SERP lookup when serp_overlap is set
+MAX_SERP_LOOKUPS = 50
+# Concurrent SERP requests for one clustering call
+SERP_CONCURRENCY = 5
+
+
+class ClusteringHandlers:
+    def __init__(self, analysis_handlers: AnalysisHandlers, keyword_store: Optional[KeywordStore] = None,
+                 result_store: Optional[ResultStore] = None):
+        self.analysis_handlers = analysis_handlers
+        self.keyword_store = keyword_store
+        self.result_store = result_store
+
+    async def handle_cluster_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Handle cluster keywords tool call - lexical clustering, then optional merging by SERP overlap"""
+        unique: List[str] = []
+        seen = set()
+        for keyword in args["keywords"]:
+            keyword = " ".join(str(keyword).split())
+            if keyword and keyword.casefold() not in seen:
+                seen.add(keyword.casefold())
+                unique.append(keyword)
+
+        search_country = args.get("search_country")
+        volumes: List[Optional[int]] = [None] * len(unique)
+        if unique and search_country and self.keyword_store is not None:
+            # Volumes already fetched by keyword and volume tools; unknown ones stay None
+            stored = self.keyword_store.search(api_key, search_country, keywords=unique, limit=len(unique))
+            found = {row[0].casefold(): row[1] for row in stored["rows"]}
+            volumes = [found.get(keyword.casefold()) for keyword in unique]
+
+        threshold = float(args.get("threshold", 0.6))
+        # Large lists take a second or so of CPU; keep it off the event loop
+        clusters = await asyncio.to_thread(cluster_keywords, unique, volumes, threshold)
+
+        serp_merges = 0
+        serp_lookups = 0
+        if args.get("serp_overlap"):
+            if not search_country:
+                raise ValueError("serp_overlap needs search_country")
+            clusters.sort(key=lambda members: -self._volume(members, volumes))
+            lookups = min(int(args.get("max_serp_lookups", 10)), MAX_SERP_LOOKUPS, len(clusters))
+            serp_lookups, serp_merges, clusters = await self._merge_by_serp(
+                clusters, unique, lookups, search_country, float(args.get("serp_threshold", 0.4)), api_key,
+            )
+
+        clusters.sort(key=lambda members: (-self._volume(members, volumes), -len(members)))
+        result = {
+            "clusters": [
+                {
+                    "representative": unique[members[0]],
+                    "size": len(members),
+                    "volume": self._volume(members, volumes) if any(volumes[index] is not None for index in members) else None,
+                    "keywords": [unique[index] for index in members[:MAX_CLUSTER_MEMBERS]],
+                }
+                for members in clusters
+            ],
+            "input_count": len(args["keywords"]),
+            "unique_count": len(unique),
+            "cluster_count": len(clusters),
+            "volumes_known": sum(volume is not None for volume in volumes),
+            "threshold": threshold,
+        }
+        if args.get("serp_overlap"):
+            result["serp_lookups"] = serp_lookups
+            result["serp_merges"] = serp_merges
+        return limit_response_size(result, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    @staticmethod
+    def _volume(members: List[int], volumes: List[Optional[int]]) -> int:
+        return sum(volumes[index] or 0 for index in members)
+
+    async def _merge_by_serp(self, clusters: List[List[int]], unique: List[str], lookups: int, search_country: str,
+                             serp_threshold: float, api_key: str):
+        """Merge the top clusters whose representatives share enough ranking URLs"""
+        semaphore = asyncio.Semaphore(SERP_CONCURRENCY)
+
+        async def ranking_urls(members: List[int]) -> Set[str]:
+            async with semaphore:
+                response = await self.analysis_handlers.fetch_serp(
+                    {"search_question": unique[members[0]], "search_country": search_country}, api_key,
+                )
+            return {record["url"] for record in extract_records(response) if isinstance(record.get("url"), str)}
+
+        responses = await asyncio.gather(*(ranking_urls(members) for members in clusters[:lookups]), return_exceptions=True)
+        url_sets = [urls if isinstance(urls, set) else set() for urls in responses]
+
+        # Clusters are ordered by volume, so each merges into the highest volume cluster it overlaps
+        parent = list(range(lookups))
+        for second in range(lookups):
+            for first in range(second):
+                shared = len(url_sets[first] & url_sets[second])
+                smaller = min(len(url_sets[first]), len(url_sets[second]))
+                if smaller and shared / smaller >= serp_threshold:
+                    parent[second] = parent[first]
+                    break
+        merged = [list(members) for members in clusters]
+        for second in range(lookups):
+            if parent[second] != second:
+                merged[parent[second]].extend(merged[second])
+                merged[second] = []
+        succeeded = sum(not isinstance(urls, BaseException) for urls in responses)
+        serp_merges = sum(parent[index] != index for index in range(lookups))
+        return succeeded, serp_merges, [members for members in merged if members]
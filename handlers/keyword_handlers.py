@@ -3,16 +3,27 @@ Keyword Research Handlers
 Handles all keyword-related MCP tool calls
 """
 
-from typing import Dict, Any
-from utils.http_client import make_api_request
-from utils.response_utils import limit_response_size
+import asyncio
+from typing import Dict, Any, List, Optional
+from utils.http_client import HttpClient
+from utils.result_store import ResultStore
+from utils.response_utils import extract_records, limit_response_size, pick_field
+
+# Keywords the /search-volume endpoint accepts per request
+SEARCH_VOLUME_CHUNK_SIZE = 10
+# Upper bound on concurrent chunk requests for one bulk search volume call
+MAX_SEARCH_VOLUME_CONCURRENCY = 10
+# Columns returned by bulk search volume lookups
+SEARCH_VOLUME_COLUMNS = ["keyword", "volume", "cpc", "competition"]
 
 
 class KeywordHandlers:
-    def __init__(self, api_base_url: str):
+    def __init__(self, api_base_url: str, http_client: HttpClient, result_store: Optional[ResultStore] = None):
         self.api_base_url = api_base_url
+        self.http_client = http_client
+        self.result_store = result_store
 
-    def handle_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle keywords tool call"""
         url = f"{self.api_base_url}/keywords"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
@@ -22,11 +33,16 @@ class KeywordHandlers:
             "version": args.get("version", "1"),
             "email": api_key  # Using API key as email for compatibility
         }
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10)
+        response = await self.http_client.make_api_request(url, headers, data)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
 
-    def handle_keywords_with_volumes(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_keywords_with_volumes(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle keywords with volumes tool call"""
+        response = await self.fetch_keywords_with_volumes(args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def fetch_keywords_with_volumes(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Return the unshaped /keywords-with-volumes response, for callers that shape a merged result"""
         url = f"{self.api_base_url}/keywords-with-volumes"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         data = {
@@ -34,28 +50,90 @@ class KeywordHandlers:
             "search_country": args["search_country"],
             "email": api_key  # Using API key as email for compatibility
         }
-        if "limit" in args:
-            data["limit"] = min(args["limit"], 10)  # Cap at 10 for MCP
-        else:
-            data["limit"] = 10  # Default limit for MCP
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10)
-
-    def handle_search_volume(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        # Results beyond the first page are served by next_page from the result store
+        data["limit"] = args.get("limit", 10)
+        return await self.http_client.make_api_request(url, headers, data)
+
+    async def handle_search_volume(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle search volume tool call"""
+        keywords = args["keywords"]
+        if isinstance(keywords, list) and len(keywords) > SEARCH_VOLUME_CHUNK_SIZE:
+            return await self._handle_bulk_search_volume(keywords, args, api_key)
+        response = await self._request_search_volume(keywords, args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def _request_search_volume(self, keywords: Any, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         url = f"{self.api_base_url}/search-volume"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         data = {
-            "keywords": args["keywords"][:10] if isinstance(args["keywords"], list) else args["keywords"],  # Limit input keywords
+            "keywords": keywords,
             "search_country": args["search_country"],
             "version": args.get("version", "1"),
             "email": api_key  # Using API key as email for compatibility
         }
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10)
+        return await self.http_client.make_api_request(url, headers, data)
+
+    async def _handle_bulk_search_volume(self, keywords: List[str], args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Fetch volumes for any number of keywords in concurrent chunks and return a columnar table"""
+        unique = []
+        seen = set()
+        for keyword in keywords:
+            keyword = str(keyword).strip()
+            if keyword and keyword.casefold() not in seen:
+                seen.add(keyword.casefold())
+                unique.append(keyword)
+        chunks = [unique[i:i + SEARCH_VOLUME_CHUNK_SIZE] for i in range(0, len(unique), SEARCH_VOLUME_CHUNK_SIZE)]
+        concurrency = max(1, min(int(args.get("max_concurrency", 5)), MAX_SEARCH_VOLUME_CONCURRENCY))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(chunk: List[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._request_search_volume(chunk, args, api_key)
+
+        responses = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+
+        found = {}
+        failed_chunks = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BaseException):
+                failed_chunks.append({"keywords": chunk, "error": str(response)})
+                continue
+            for record in extract_records(response):
+                keyword = pick_field(record, "keyword")
+                if isinstance(keyword, str):
+                    found.setdefault(keyword.strip().casefold(), [pick_field(record, column) for column in SEARCH_VOLUME_COLUMNS])
+
+        rows = []
+        missing = []
+        failed = {keyword.casefold() for chunk in failed_chunks for keyword in chunk["keywords"]}
+        for keyword in unique:
+            row = found.get(keyword.casefold())
+            if row is not None:
+                rows.append(row)
+            elif keyword.casefold() not in failed:
+                missing.append(keyword)
+
+        result = {
+            "columns": SEARCH_VOLUME_COLUMNS,
+            "rows": rows,
+            "requested_count": len(keywords),
+            "unique_count": len(unique),
+            "returned_count": len(rows),
+            "chunks": len(chunks),
+        }
+        if missing:
+            result["missing_keywords"] = missing
+        if failed_chunks:
+            result["failed_chunks"] = failed_chunks
+        return result
 
-    def handle_related_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def handle_related_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle related keywords tool call"""
+        response = await self.fetch_related_keywords(args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def fetch_related_keywords(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Return the unshaped /related-keywords response, for callers that shape a merged result"""
         url = f"{self.api_base_url}/related-keywords"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         data = {
@@ -63,15 +141,17 @@ class KeywordHandlers:
             "search_country": args["search_country"],
             "email": api_key  # Using API key as email for compatibility
         }
-        if "limit" in args:
-            data["limit"] = min(args["limit"], 10)  # Cap at 10 for MCP
-        else:
-            data["limit"] = 10  # Default limit for MCP
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10)
-
-    def handle_lsi(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        # Results beyond the first page are served by next_page from the result store
+        data["limit"] = args.get("limit", 10)
+        return await self.http_client.make_api_request(url, headers, data)
+
+    async def handle_lsi(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         """Handle LSI tool call"""
+        response = await self.fetch_lsi(args, api_key)
+        return limit_response_size(response, max_items=10, result_store=self.result_store, api_key=api_key)
+
+    async def fetch_lsi(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Return the unshaped /lsi response, for callers that shape a merged result"""
         url = f"{self.api_base_url}/lsi"
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         data = {
@@ -79,5 +159,4 @@ class KeywordHandlers:
             "search_country": args["search_country"],
             "email": api_key  # Using API key as email for compatibility
         }
-        response = make_api_request(url, headers, data)
-        return limit_response_size(response, max_items=10) 
\ No newline at end of file
+        return await self.http_client.make_api_request(url, headers, data)
@@ -0,0 +1,32 @@
+"""
+Local Handlers
+Answers keyword lookups from the local keyword store without calling the API
+"""
+
+from typing import Dict, Any, Optional
+from utils.keyword_store import KeywordStore
+
+# Largest number of rows local_keyword_search will return in one call
+MAX_LOCAL_RESULTS = 1000
+
+
+class LocalHandlers:
+    def __init__(self, keyword_store: Optional[KeywordStore]):
+        self.keyword_store = keyword_store
+
+    async def handle_local_keyword_search(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Handle local keyword search tool call from stored rows only"""
+        if self.keyword_store is None:
+            raise ValueError("The local keyword store is disabled (KWRDS_KEYWORD_STORE_MAX_ROWS=0)")
+        max_age_hours = args.get("max_age_hours")
+        return self.keyword_store.search(
+            api_key,
+            args["search_country"],
+            query=args.get("query"),
+            keywords=args.get("keywords"),
+            related_to=args.get("related_to"),
+            prefix=args.get("match", "prefix") == "prefix",
+            max_age=max_age_hours * 3600 if max_age_hours is not None else None,
+            min_volume=args.get("min_volume"),
+            limit=max(1, min(int(args.get("limit", 10)), MAX_LOCAL_RESULTS)),
+        )
@@ -0,0 +1,20 @@
+"""
+Pagination Handlers
+Serves further pages of truncated tool results from the result store
+"""
+
+from typing import Dict, Any
+from utils.result_store import ResultStore
+
+# Largest page next_page will return in one call
+MAX_PAGE_SIZE = 100
+
+
+class PaginationHandlers:
+    def __init__(self, result_store: ResultStore):
+        self.result_store = result_store
+
+    async def handle_next_page(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Handle next page tool call without re-calling the upstream API"""
+        page_size = max(1, min(int(args.get("page_size", 10)), MAX_PAGE_SIZE))
+        return self.result_store.page(args["cursor"], api_key, page_size)
@@ -0,0 +1,100 @@
+"""
+Report Handlers
+Composite tools that fan out to several endpoints concurrently and merge the results
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+
+from handlers.analysis_handlers import AnalysisHandlers
+from handlers.keyword_handlers import KeywordHandlers
+from utils.response_utils import extract_records, limit_response_size, pick_field
+from utils.result_store import ResultStore
+
+# Merged keyword rows shown before the rest is left to next_page
+REPORT_MAX_KEYWORDS = 30
+
+# Keyword sources merged into the report, in order of precedence for volume data
+KEYWORD_SOURCES = ("keywords_with_volumes", "related_keywords", "lsi")
+
+
+def split_locale(search_country: str) -> Tuple[str, str]:
+    """Split 'en-US' into ('en', 'US'); a bare country code gets English"""
+    if "-" in search_country:
+        language, country = search_country.split("-", 1)
+        return language.lower(), country.upper()
+    return "en", search_country.upper()
+
+
+class ReportHandlers:
+    def __init__(self, keyword_handlers: KeywordHandlers, analysis_handlers: AnalysisHandlers,
+                 result_store: Optional[ResultStore] = None):
+        self.keyword_handlers = keyword_handlers
+        self.analysis_handlers = analysis_handlers
+        self.result_store = result_store
+
+    async def handle_keyword_report(self, args: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Handle keyword report tool call - keywords, related terms, LSI, SERP and PAA in one parallel fan-out"""
+        seed = args["search_question"]
+        search_country = args["search_country"]
+        language, country = split_locale(search_country)
+        keyword_args = {"search_question": seed, "search_country": search_country}
+
+        # Unshaped responses: every source row reaches the merge, and only the report itself
+        # is cut to size, so no per-source lists are parked in the result store
+        calls = {
+            "keywords_with_volumes": self.keyword_handlers.fetch_keywords_with_volumes(keyword_args, api_key),
+            "related_keywords": self.keyword_handlers.fetch_related_keywords(keyword_args, api_key),
+            "lsi": self.keyword_handlers.fetch_lsi(keyword_args, api_key),
+            "serp": self.analysis_handlers.fetch_serp(keyword_args, api_key),
+            "paa": self.analysis_handlers.fetch_paa({
+                "keyword": seed,
+                "search_country": country,
+                "search_language": args.get("search_language", language),
+            }, api_key),
+        }
+        responses = await asyncio.gather(*calls.values(), return_exceptions=True)
+        results = dict(zip(calls.keys(), responses))
+
+        errors = {
+            section: str(response)
+            for section, response in results.items()
+            if isinstance(response, BaseException)
+        }
+        report = {
+            "search_question": seed,
+            "search_country": search_country,
+            "keywords": self._merge_keywords(results),
+            "serp": None if "serp" in errors else results["serp"],
+            "people_also_ask": None if "paa" in errors else results["paa"],
+            "sections_ok": [section for section in calls if section not in errors],
+        }
+        if errors:
+            report["errors"] = errors
+        return limit_response_size(report, max_items=REPORT_MAX_KEYWORDS, result_store=self.result_store, api_key=api_key)
+
+    @staticmethod
+    def _merge_keywords(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Merge keyword rows from every source, deduplicated case-insensitively, highest volume first"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for source in KEYWORD_SOURCES:
+            response = results.get(source)
+            if response is None or isinstance(response, BaseException):
+                continue
+            for record in extract_records(response):
+                keyword = pick_field(record, "keyword")
+                if not isinstance(keyword, str) or not keyword.strip():
+                    continue
+                row = merged.get(keyword.strip().casefold())
+                if row is None:
+                    row = {"keyword": keyword.strip(), "volume": None, "cpc": None, "competition": None, "sources": []}
+                    merged[keyword.strip().casefold()] = row
+                for field in ("volume", "cpc", "competition"):
+                    if row[field] is None:
+                        row[field] = pick_field(record, field)
+                row["sources"].append(source)
+        return sorted(
+            merged.values(),
+            key=lambda row: row["volume"] if isinstance(row["volume"], (int, float)) else -1,
+            reverse=True,
+        )
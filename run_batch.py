@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Batch runner for kwrds.ai tool calls
+
+Streams a JSONL file of tool invocations through the MCP server's handlers with
+bounded concurrency and appends one JSON result per line to an output file.
+Progress is checkpointed next to the output so an interrupted run resumes where
+it stopped; memory use does not grow with the input size.
+
+Input lines:  {"id": "optional", "tool": "keywords", "arguments": {"search_question": "...", ...}}
+Output lines: {"line": 1, "id": "...", "tool": "keywords", "result": {...}}  or  {..., "error": "..."}
+
+Usage: python run_batch.py calls.jsonl results.jsonl [--concurrency 8] [--priority low]
+
+Results are written at least once: calls that finished after the last checkpoint
+are repeated on resume, so consumers should deduplicate on "line". Repeated calls
+are served from the response cache (persistent with KWRDS_CACHE_DIR) without new
+API spend.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from typing import Any, Dict, IO, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stdio_server import KwrdsApiMCPServer
+from utils.rate_limit import current_priority, parse_priority
+from utils.serialization import dumps
+
+
+class Checkpoint:
+    """Lowest line not yet finished plus the finished lines above it, saved atomically"""
+
+    def __init__(self, path: str, input_path: str):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.next_line = 1
+        self.done: Set[int] = set()
+        self._saved_at = 0.0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as checkpoint:
+            state = json.load(checkpoint)
+        if state.get("input") != self.input_path:
+            raise SystemExit(f"Checkpoint {self.path} belongs to {state.get('input')}; remove it to start over")
+        self.next_line = state["next_line"]
+        self.done = set(state["done"])
+
+    def mark_done(self, line_number: int):
+        self.done.add(line_number)
+        while self.next_line in self.done:
+            self.done.remove(self.next_line)
+            self.next_line += 1
+
+    def is_done(self, line_number: int) -> bool:
+        return line_number < self.next_line or line_number in self.done
+
+    def save(self, force: bool = False):
+        if not force and time.monotonic() - self._saved_at < 1.0:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as checkpoint:
+            json.dump({"input": self.input_path, "next_line": self.next_line, "done": sorted(self.done)}, checkpoint)
+        os.replace(temporary, self.path)
+        self._saved_at = time.monotonic()
+
+
+class BatchRunner:
+    def __init__(self, server: KwrdsApiMCPServer, input_path: str, output_path: str,
+                 concurrency: int = 8, checkpoint_path: Optional[str] = None):
+        self.server = server
+        self.input_path = input_path
+        self.output_path = output_path
+        self.concurrency = max(1, concurrency)
+        # Lines read ahead of the oldest unfinished one; bounds memory and the checkpoint size
+        self.window = self.concurrency * 4
+        self.checkpoint = Checkpoint(checkpoint_path or f"{output_path}.checkpoint", input_path)
+        self.counts = {"ok": 0, "failed": 0, "skipped": 0}
+
+    async def _run_one(self, line_number: int, line: str, output: IO[str]):
+        record: Dict[str, Any] = {"line": line_number}
+        try:
+            call = json.loads(line)
+            record["id"] = call.get("id")
+            record["tool"] = call["tool"]
+            arguments = call.get("arguments", {})
+            api_key = arguments.get("api_key", self.server.api_key)
+            if not api_key:
+                raise ValueError("API key not found. Please provide api_key in arguments or set KWRDS_API_KEY environment variable.")
+            record["result"] = await self.server._route_tool_call(call["tool"], arguments, api_key)
+            self.counts["ok"] += 1
+        except Exception as e:
+            record["error"] = str(e)
+            self.counts["failed"] += 1
+        output.write(dumps(record) + "\n")
+        output.flush()
+        self.checkpoint.mark_done(line_number)
+        self.checkpoint.save()
+
+    async def run(self) -> Dict[str, int]:
+        self.checkpoint.load()
+        slots = asyncio.Semaphore(self.concurrency)
+        window_open = asyncio.Condition()
+        tasks: Set[asyncio.Task] = set()
+
+        async def worker(line_number: int, line: str, output: IO[str]):
+            try:
+                await self._run_one(line_number, line, output)
+            finally:
+                slots.release()
+                async with window_open:
+                    window_open.notify_all()
+
+        with open(self.input_path, encoding="utf-8") as calls, open(self.output_path, "a", encoding="utf-8") as output:
+            try:
+                for line_number, line in enumerate(calls, 1):
+                    if self.checkpoint.is_done(line_number):
+                        self.counts["skipped"] += 1
+                        continue
+                    if not line.strip():
+                        # Blank lines count as finished, or the checkpoint and the read window stall on them
+                        self.checkpoint.mark_done(line_number)
+                        self.counts["skipped"] += 1
+                        continue
+                    async with window_open:
+                        await window_open.wait_for(lambda: line_number < self.checkpoint.next_line + self.window)
+                    await slots.acquire()
+                    task = asyncio.create_task(worker(line_number, line, output))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                # On Ctrl-C/SIGTERM, stop unfinished calls before the output closes; they rerun on resume
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.checkpoint.save(force=True)
+        return self.counts
+
+
+async def main_async(args) -> Dict[str, int]:
+    server = KwrdsApiMCPServer()
+    current_priority.set(parse_priority(args.priority))
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    await server.metrics_exporter.start()
+    try:
+        runner = BatchRunner(server, args.input, args.output, args.concurrency, args.checkpoint)
+        return await runner.run()
+    finally:
+        await server.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of tool calls")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=8, help="Tool calls in flight at once (default: 8)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--priority", default="low", choices=["high", "normal", "low"],
+                        help="Priority for rate limiting and quota reserves (default: low)")
+    try:
+        counts = asyncio.run(main_async(parser.parse_args()))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        raise SystemExit("Interrupted; run the same command again to resume")
+    print(f"{counts['ok']} succeeded, {counts['failed']} failed, {counts['skipped']} skipped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,57 @@
 #!/usr/bin/env python3
 """
-MCP Server for kwrds.ai API using stdio transport
+MCP Server for kwrds.ai API using stdio or streamable HTTP transport
 Simple, standard implementation following MCP best practices
 """
 
+import time
+
+# Taken before the imports below, so the startup metric covers loading the MCP SDK
+LOAD_STARTED = time.perf_counter()
+
+import argparse
 import asyncio
-import json
+import contextlib
 import os
+import shutil
 import sys
+import tempfile
 from typing import Any, Dict, List, Optional
 
 from mcp import types
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 
-from tools.definitions import get_tool_definitions
+from tools.definitions import LANE_LIMITS, get_tool_definitions
+from tools.registry import ToolRegistry
 from handlers.keyword_handlers import KeywordHandlers
 from handlers.analysis_handlers import AnalysisHandlers
 from handlers.ai_handlers import AIHandlers
+from handlers.clustering_handlers import ClusteringHandlers
+from handlers.local_handlers import LocalHandlers
+from handlers.pagination_handlers import PaginationHandlers
+from handlers.report_handlers import ReportHandlers
+from utils.cache import ResponseCache
+from utils.disk_cache import DiskCache
+from utils.errors import ApiError
+from utils.http_client import HttpClient
+from utils.keyword_store import KeywordDatabase, KeywordStore
+from utils.metrics import Metrics, MetricsExporter, span
+from utils.output_format import render_result
+from utils.prefetch import Prefetcher
+from utils.resilience import RetryPolicy
+from utils.quota import QuotaGovernor
+from utils.rate_limit import RateLimiter, current_priority, parse_priority
+from utils.result_store import ResultStore
+from utils.scheduler import LaneScheduler
+from utils.serialization import dumps
+from utils.shared_state import SharedResultStore, SharedState
 
 
 class KwrdsApiMCPServer:
     def __init__(self):
-        self.api_base_url = "https://keywordresearch.api.kwrds.ai"
-        self.paa_base_url = "https://paa.api.kwrds.ai"
+        self.api_base_url = os.getenv('KWRDS_API_BASE_URL', "https://keywordresearch.api.kwrds.ai")
+        self.paa_base_url = os.getenv('KWRDS_PAA_BASE_URL', "https://paa.api.kwrds.ai")
         
         # Get API key from environment
         self.api_key = (
@@ -32,14 +60,135 @@ class KwrdsApiMCPServer:
             os.getenv('KWRDS_AI_API_KEY')
         )
         
+        # Response cache in front of the API; KWRDS_CACHE_MAX_MB=0 disables it
+        # and KWRDS_CACHE_DIR persists responses across server restarts
+        cache_max_mb = float(os.getenv('KWRDS_CACHE_MAX_MB', '64'))
+        cache_opt_in = [name.strip() for name in os.getenv('KWRDS_CACHE_OPT_IN', '').split(',') if name.strip()]
+        cache_dir = os.getenv('KWRDS_CACHE_DIR')
+        self.cache = ResponseCache(
+            max_bytes=int(cache_max_mb * 1024 * 1024),
+            opt_in=cache_opt_in,
+            backend=DiskCache(cache_dir) if cache_dir else None,
+        ) if cache_max_mb > 0 else None
+
+        # Keyword metrics from every keyword and volume response, searchable offline with
+        # local_keyword_search; kept in KWRDS_CACHE_DIR when set, KWRDS_KEYWORD_STORE_MAX_ROWS=0 disables it
+        keyword_store_max_rows = int(os.getenv('KWRDS_KEYWORD_STORE_MAX_ROWS', '500000'))
+        self.keyword_store = KeywordStore(
+            max_rows=keyword_store_max_rows,
+            backend=KeywordDatabase(cache_dir) if cache_dir else None,
+        ) if keyword_store_max_rows > 0 else None
+
+        # Rate-limit buckets and paged results shared with other server processes
+        # through KWRDS_STATE_DIR; without it they stay in this process
+        state_dir = os.getenv('KWRDS_STATE_DIR')
+        self.shared_state = SharedState(state_dir) if state_dir else None
+
+        # Client-side request rate per API key; KWRDS_RATE_LIMIT=0 disables it
+        rate_limit = float(os.getenv('KWRDS_RATE_LIMIT', '10'))
+        self.rate_limiter = RateLimiter(
+            rate_limit,
+            float(os.getenv('KWRDS_RATE_BURST', '20')),
+            bucket_factory=self.shared_state.token_bucket if self.shared_state is not None else None,
+        ) if rate_limit > 0 else None
+
+        # Latency histograms and counters; KWRDS_METRICS_PORT serves them as Prometheus text
+        # and KWRDS_METRICS_FILE dumps them as JSON every KWRDS_METRICS_INTERVAL seconds
+        self.metrics = Metrics()
+        metrics_port = os.getenv('KWRDS_METRICS_PORT')
+        self.metrics_exporter = MetricsExporter(
+            self.metrics,
+            port=int(metrics_port) if metrics_port else None,
+            host=os.getenv('KWRDS_METRICS_HOST', '127.0.0.1'),
+            path=os.getenv('KWRDS_METRICS_FILE'),
+            interval=float(os.getenv('KWRDS_METRICS_INTERVAL', '60')),
+        )
+
+        # Shared connection pools, opened per upstream host on its first request
+        self.http_client = HttpClient(
+            max_connections=int(os.getenv('KWRDS_HTTP_MAX_CONNECTIONS', '20')),
+            max_keepalive_connections=int(os.getenv('KWRDS_HTTP_MAX_KEEPALIVE', '10')),
+            cache=self.cache,
+            retry_policy=RetryPolicy(max_attempts=int(os.getenv('KWRDS_RETRY_ATTEMPTS', '3'))),
+            circuit_failure_threshold=int(os.getenv('KWRDS_CIRCUIT_FAILURES', '5')),
+            circuit_reset_timeout=float(os.getenv('KWRDS_CIRCUIT_RESET_SECONDS', '30')),
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+            keyword_store=self.keyword_store,
+        )
+
+        # Default rendering for tool results; callers can override per call
+        self.output_format = os.getenv('KWRDS_OUTPUT_FORMAT', 'json')
+
+        # Full lists behind truncated results, paged out by the next_page tool
+        result_store_max_items = int(os.getenv('KWRDS_RESULT_STORE_MAX_ITEMS', '100000'))
+        if self.shared_state is not None:
+            self.result_store = SharedResultStore(self.shared_state, max_items=result_store_max_items)
+        else:
+            self.result_store = ResultStore(max_items=result_store_max_items)
+
         # Initialize handlers
-        self.keyword_handlers = KeywordHandlers(self.api_base_url)
-        self.analysis_handlers = AnalysisHandlers(self.api_base_url, self.paa_base_url)
-        self.ai_handlers = AIHandlers(self.api_base_url)
-        
-        # Get tool definitions and convert to MCP format
-        self.tool_definitions = get_tool_definitions()
+        self.keyword_handlers = KeywordHandlers(self.api_base_url, self.http_client, self.result_store)
+        self.analysis_handlers = AnalysisHandlers(self.api_base_url, self.paa_base_url, self.http_client, self.result_store)
+        self.ai_handlers = AIHandlers(self.api_base_url, self.http_client, self.result_store)
+        self.pagination_handlers = PaginationHandlers(self.result_store)
+        self.local_handlers = LocalHandlers(self.keyword_store)
+        self.report_handlers = ReportHandlers(self.keyword_handlers, self.analysis_handlers, self.result_store)
+        self.clustering_handlers = ClusteringHandlers(self.analysis_handlers, self.keyword_store, self.result_store)
+
+        # Credit governor fed by usage_count, attached once the handler it polls exists;
+        # KWRDS_QUOTA_RESERVE=0 disables it
+        quota_reserve = float(os.getenv('KWRDS_QUOTA_RESERVE', '50'))
+        self.quota = QuotaGovernor(
+            self.analysis_handlers.handle_usage_count,
+            reserve=quota_reserve,
+            refresh_interval=float(os.getenv('KWRDS_QUOTA_REFRESH_SECONDS', '300')),
+        ) if quota_reserve > 0 else None
+        self.http_client.quota = self.quota
         
+        # Concurrency caps per tool lane, so slow AI calls cannot hold the slots quick lookups
+        # need; KWRDS_LANE_LIMITS overrides them, e.g. "ai=2,lookup=32" (0: unlimited)
+        lane_limits = dict(LANE_LIMITS)
+        for setting in os.getenv('KWRDS_LANE_LIMITS', '').split(','):
+            if setting.strip():
+                lane, _, limit = setting.partition('=')
+                lane_limits[lane.strip()] = int(limit)
+        self.scheduler = LaneScheduler(lane_limits, metrics=self.metrics)
+
+        # Tool name -> handler; validators and MCP descriptors are built once from the definitions
+        self.registry = ToolRegistry(get_tool_definitions(), {
+            # Keyword research tools
+            "keywords": self.keyword_handlers.handle_keywords,
+            "keywords_with_volumes": self.keyword_handlers.handle_keywords_with_volumes,
+            "search_volume": self.keyword_handlers.handle_search_volume,
+            "related_keywords": self.keyword_handlers.handle_related_keywords,
+            "lsi": self.keyword_handlers.handle_lsi,
+            # Analysis tools
+            "serp": self.analysis_handlers.handle_serp,
+            "serp_detailed": self.analysis_handlers.handle_serp_detailed,
+            "url_rankings": self.analysis_handlers.handle_url_rankings,
+            "paa": self.analysis_handlers.handle_paa,
+            "paa_ai": self.analysis_handlers.handle_paa_ai,
+            "usage_count": self.analysis_handlers.handle_usage_count,
+            # AI tools
+            "ai": self.ai_handlers.handle_ai,
+            "ai_content": self.ai_handlers.handle_ai_content,
+            # Composite tools
+            "keyword_report": self.report_handlers.handle_keyword_report,
+            "cluster_keywords": self.clustering_handlers.handle_cluster_keywords,
+            # Pagination
+            "next_page": self.pagination_handlers.handle_next_page,
+            # Offline lookups
+            "local_keyword_search": self.local_handlers.handle_local_keyword_search,
+        }, scheduler=self.scheduler)
+
+        # Opt-in speculative prefetch of likely follow-up calls into the response cache,
+        # capped at KWRDS_PREFETCH_BUDGET credits per API key per hour (0 disables it)
+        prefetch_budget = float(os.getenv('KWRDS_PREFETCH_BUDGET', '0'))
+        self.prefetcher = Prefetcher(
+            self.registry.dispatch, self.cache, prefetch_budget,
+        ) if prefetch_budget > 0 and self.cache is not None else None
+
         # Create the MCP server
         self.server = Server("kwrds-ai")
 
@@ -49,96 +198,238 @@ class KwrdsApiMCPServer:
         @self.server.list_tools()
         async def list_tools() -> List[types.Tool]:
             """List all available tools"""
-            tools = []
-            for tool_def in self.tool_definitions.values():
-                tools.append(types.Tool(
-                    name=tool_def["name"],
-                    description=tool_def["description"],
-                    inputSchema=tool_def["inputSchema"]
-                ))
-            return tools
-
-        @self.server.call_tool()
+            return self.registry.tools
+
+        # Arguments are validated by the registry, which allows api_key to come from the environment
+        @self.server.call_tool(validate_input=False)
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Handle tool calls"""
             try:
-                # Use API key from arguments if provided, otherwise fall back to environment
-                api_key = arguments.get('api_key', self.api_key)
+                # Use API key from arguments if provided, then the HTTP request's headers, then the environment
+                api_key = arguments.get('api_key') or self._request_api_key() or self.api_key
                 
                 if not api_key:
                     raise ValueError("API key not found. Please provide api_key in arguments or set KWRDS_API_KEY environment variable.")
                 
-                # Route to appropriate handler
+                # Route to appropriate handler at the caller's priority
+                current_priority.set(parse_priority(arguments.get('priority')))
                 result = await self._route_tool_call(name, arguments, api_key)
                 
-                # Return result as text content
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2, ensure_ascii=False)
-                )]
+                # Render as compact JSON or a table, within the caller's character budget
+                text = render_result(
+                    result,
+                    output_format=arguments.get('output_format', self.output_format),
+                    max_chars=arguments.get('max_chars'),
+                    result_store=self.result_store,
+                    api_key=api_key,
+                )
+                return [types.TextContent(type="text", text=text)]
                 
             except Exception as e:
                 error_result = {"error": str(e), "tool": name, "arguments": arguments}
+                if isinstance(e, ApiError):
+                    error_result["error_type"] = e.__class__.__name__
+                    error_result["retryable"] = e.retryable
                 return [types.TextContent(
                     type="text", 
-                    text=json.dumps(error_result, indent=2)
+                    text=dumps(error_result)
                 )]
 
+    def _request_api_key(self) -> Optional[str]:
+        """Return the API key sent as an X-API-KEY or bearer header with the current HTTP request"""
+        try:
+            request = self.server.request_context.request
+        except LookupError:
+            return None
+        if request is None:
+            return None
+        api_key = request.headers.get("x-api-key")
+        if api_key:
+            return api_key
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token.strip():
+            return token.strip()
+        return None
+
     async def _route_tool_call(self, tool_name: str, arguments: Dict[str, Any], api_key: str) -> Dict[str, Any]:
-        """Route tool calls to appropriate handlers"""
-        
-        # Keyword research tools
-        if tool_name == "keywords":
-            return self.keyword_handlers.handle_keywords(arguments, api_key)
-        elif tool_name == "keywords_with_volumes":
-            return self.keyword_handlers.handle_keywords_with_volumes(arguments, api_key)
-        elif tool_name == "search_volume":
-            return self.keyword_handlers.handle_search_volume(arguments, api_key)
-        elif tool_name == "related_keywords":
-            return self.keyword_handlers.handle_related_keywords(arguments, api_key)
-        elif tool_name == "lsi":
-            return self.keyword_handlers.handle_lsi(arguments, api_key)
-            
-        # Analysis tools
-        elif tool_name == "serp":
-            return self.analysis_handlers.handle_serp(arguments, api_key)
-        elif tool_name == "serp_detailed":
-            return self.analysis_handlers.handle_serp_detailed(arguments, api_key)
-        elif tool_name == "url_rankings":
-            return self.analysis_handlers.handle_url_rankings(arguments, api_key)
-        elif tool_name == "paa":
-            return self.analysis_handlers.handle_paa(arguments, api_key)
-        elif tool_name == "paa_ai":
-            return self.analysis_handlers.handle_paa_ai(arguments, api_key)
-        elif tool_name == "usage_count":
-            return self.analysis_handlers.handle_usage_count(arguments, api_key)
-            
-        # AI tools
-        elif tool_name == "ai":
-            return self.ai_handlers.handle_ai(arguments, api_key)
-        elif tool_name == "ai_content":
-            return self.ai_handlers.handle_ai_content(arguments, api_key)
-            
-        else:
-            raise ValueError(f"Unknown tool: {tool_name}")
+        """Validate arguments and route tool calls to appropriate handlers"""
+        # Names the registry does not know share one series, so callers cannot mint new ones
+        metric_name = tool_name if tool_name in self.registry else "unknown"
+        with span("kwrds.tool_call", tool=tool_name), self.metrics.time_tool(metric_name):
+            result = await self.registry.dispatch(tool_name, arguments, api_key)
+        if self.prefetcher is not None:
+            self.prefetcher.schedule(tool_name, arguments, api_key, result)
+        return result
+
+    async def aclose(self):
+        """Stop prefetching and metrics export and close upstream connections, persistent stores and shared state"""
+        if self.prefetcher is not None:
+            await self.prefetcher.aclose()
+        await self.metrics_exporter.aclose()
+        await self.http_client.aclose()
+        if self.cache is not None and self.cache.backend is not None:
+            self.cache.backend.close()
+        if self.keyword_store is not None:
+            self.keyword_store.close()
+        if self.shared_state is not None:
+            self.shared_state.close()
 
     async def run(self):
         """Run the MCP server"""
         self.setup_server()
+        await self.metrics_exporter.start()
+        self.metrics.record_startup(time.perf_counter() - LOAD_STARTED)
         
-        async with stdio_server() as streams:
-            await self.server.run(
-                streams[0],
-                streams[1],
-                self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as streams:
+                await self.server.run(
+                    streams[0],
+                    streams[1],
+                    self.server.create_initialization_options()
+                )
+        finally:
+            await self.aclose()
 
+    def http_app(self, stateless: bool = False):
+        """Build the ASGI app serving MCP over streamable HTTP at /mcp and SSE at /sse
 
-async def main():
-    """Main entry point"""
+        One process serves every client; connection pools, caches and rate limits are
+        shared while each client's requests are billed to the API key it sends.
+        Stateless mode keeps no MCP session between requests, so any worker process
+        can answer any request; SSE needs a session and is left out.
+        """
+        from mcp.server.sse import SseServerTransport
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.responses import JSONResponse, PlainTextResponse
+        from starlette.routing import Mount, Route
+
+        self.setup_server()
+        mcp_server = self.server
+        # Plain JSON replies rather than per-call SSE streams: tools send no progress events,
+        # and uvicorn's graceful shutdown drains JSON replies where SSE streams are cut at the signal
+        session_manager = StreamableHTTPSessionManager(app=mcp_server, stateless=stateless, json_response=True)
+        sse = SseServerTransport("/messages/")
+
+        # Plain ASGI endpoints: both transports write their own responses
+        class StreamableHTTPEndpoint:
+            async def __call__(self, scope, receive, send):
+                await session_manager.handle_request(scope, receive, send)
+
+        class SseEndpoint:
+            async def __call__(self, scope, receive, send):
+                async with sse.connect_sse(scope, receive, send) as streams:
+                    await mcp_server.run(streams[0], streams[1], mcp_server.create_initialization_options())
+
+        async def health(request):
+            return JSONResponse({"status": "ok"})
+
+        async def metrics(request):
+            return PlainTextResponse(self.metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            await self.metrics_exporter.start()
+            try:
+                async with session_manager.run():
+                    self.metrics.record_startup(time.perf_counter() - LOAD_STARTED)
+                    yield
+            finally:
+                await self.aclose()
+
+        routes = [
+            Route("/mcp", endpoint=StreamableHTTPEndpoint()),
+            Route("/health", endpoint=health, methods=["GET"]),
+            Route("/metrics", endpoint=metrics, methods=["GET"]),
+        ]
+        if not stateless:
+            routes += [
+                Route("/sse", endpoint=SseEndpoint(), methods=["GET"]),
+                Mount("/messages/", app=sse.handle_post_message),
+            ]
+        return Starlette(routes=routes, lifespan=lifespan)
+
+    async def run_http(self, host: str = "127.0.0.1", port: int = 8000, drain_seconds: float = 30.0):
+        """Run the MCP server over streamable HTTP and SSE
+
+        On SIGINT/SIGTERM new connections are refused and in-flight calls get up to
+        drain_seconds to finish before pools and caches are closed.
+        """
+        import uvicorn
+
+        config = uvicorn.Config(self.http_app(), host=host, port=port, log_level="warning",
+                                timeout_graceful_shutdown=drain_seconds)
+        await uvicorn.Server(config).serve()
+
+
+def create_http_app():
+    """ASGI app factory for worker processes, configured from the environment
+
+    Workers cannot all bind KWRDS_METRICS_PORT or write one KWRDS_METRICS_FILE, so
+    each serves its metrics at /metrics on the HTTP port and dumps snapshots to the
+    file name suffixed with its process id.
+    """
     server = KwrdsApiMCPServer()
-    await server.run()
+    server.metrics_exporter.port = None
+    if server.metrics_exporter.path:
+        server.metrics_exporter.path = f"{server.metrics_exporter.path}.{os.getpid()}"
+    return server.http_app(stateless=os.getenv('KWRDS_HTTP_STATELESS') == '1')
+
+
+def serve_http_workers(host: str, port: int, workers: int, drain_seconds: float = 30.0):
+    """Serve HTTP from several worker processes sharing one listening socket
+
+    Workers share the response cache (KWRDS_CACHE_DIR) and rate-limit and paging
+    state (KWRDS_STATE_DIR); when unset, a temporary directory is used for both and
+    removed on exit. Streamable HTTP runs stateless so any worker can take any request.
+    """
+    import uvicorn
+
+    temporary_dir = None
+    if not os.getenv('KWRDS_STATE_DIR') or not os.getenv('KWRDS_CACHE_DIR'):
+        temporary_dir = tempfile.mkdtemp(prefix="kwrds-ai-")
+        os.environ.setdefault('KWRDS_STATE_DIR', temporary_dir)
+        os.environ.setdefault('KWRDS_CACHE_DIR', temporary_dir)
+    os.environ['KWRDS_HTTP_STATELESS'] = '1'
+    try:
+        uvicorn.run("stdio_server:create_http_app", factory=True, host=host, port=port, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)), log_level="warning",
+                    timeout_graceful_shutdown=drain_seconds)
+    finally:
+        if temporary_dir is not None:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="kwrds.ai MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=os.getenv('KWRDS_TRANSPORT', 'stdio'),
+                        help="stdio for a single desktop client, http to serve many clients (default: stdio)")
+    parser.add_argument("--host", default=os.getenv('KWRDS_HTTP_HOST', '127.0.0.1'), help="HTTP listen address")
+    parser.add_argument("--port", type=int, default=int(os.getenv('KWRDS_HTTP_PORT', '8000')), help="HTTP listen port")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('KWRDS_HTTP_WORKERS', '1')),
+                        help="HTTP worker processes sharing cache and rate limits (default: 1)")
+    parser.add_argument("--drain-seconds", type=float, default=float(os.getenv('KWRDS_DRAIN_SECONDS', '30')),
+                        help="Seconds in-flight calls get to finish on shutdown (default: 30)")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace):
+    """Run a single server process on the selected transport"""
+    server = KwrdsApiMCPServer()
+    if args.transport == "http":
+        await server.run_http(args.host, args.port, args.drain_seconds)
+    else:
+        await server.run()
+
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    if args.transport == "http" and args.workers > 1:
+        serve_http_workers(args.host, args.port, args.workers, args.drain_seconds)
+    else:
+        asyncio.run(serve(args))
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    main() 
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Cancellation tests: cancelled tool calls abort their upstream requests and free capacity
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from stdio_server import KwrdsApiMCPServer
+
+SLOW_SECONDS = 2.0
+
+
+class CancellationTest(unittest.TestCase):
+    def setUp(self):
+        api_thread = MockApiThread(latency=0.001, latency_by_path={"/ai/content": SLOW_SECONDS})
+        self.api = api_thread.__enter__()
+        self.addCleanup(api_thread.__exit__, None, None, None)
+        environment = mock.patch.dict(os.environ, {
+            "KWRDS_API_BASE_URL": self.api.base_url,
+            "KWRDS_PAA_BASE_URL": self.api.base_url,
+            "KWRDS_CACHE_MAX_MB": "0",
+            "KWRDS_RATE_LIMIT": "0",
+            "KWRDS_HTTP_MAX_CONNECTIONS": "2",
+            # Let every slow call reach upstream rather than queue in the ai lane
+            "KWRDS_LANE_LIMITS": "ai=0",
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def test_cancelled_calls_free_connections_and_are_not_charged(self):
+        async def run():
+            server = KwrdsApiMCPServer()
+            try:
+                # Fetch the credit balance first so the quota refresh is not part of the test
+                await server._route_tool_call("serp", {"search_question": "warm up", "search_country": "en-US"}, "test-key")
+                spent_before = self._spent(server)
+
+                slow = [
+                    asyncio.create_task(server._route_tool_call("ai_content", {
+                        "search_question": f"running shoes {index}", "search_country": "en-US", "prompt": "Get_SEO_Outline",
+                    }, "test-key"))
+                    for index in range(4)
+                ]
+                await asyncio.sleep(0.2)
+                for task in slow:
+                    task.cancel()
+                results = await asyncio.gather(*slow, return_exceptions=True)
+                self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+
+                # Both pooled connections were held by slow calls; the next call must not wait for them
+                start = time.perf_counter()
+                await server._route_tool_call("serp", {"search_question": "trail shoes", "search_country": "en-US"}, "test-key")
+                follow_up_seconds = time.perf_counter() - start
+                return server.http_client.stats()["cancelled"], self._spent(server) - spent_before, follow_up_seconds
+            finally:
+                await server.aclose()
+
+        cancelled, credits_charged, follow_up_seconds = asyncio.run(run())
+        self.assertEqual(cancelled, 4)
+        # Only the follow-up call is charged
+        self.assertEqual(credits_charged, 1)
+        self.assertLess(follow_up_seconds, SLOW_SECONDS / 2)
+
+    @staticmethod
+    def _spent(server: KwrdsApiMCPServer) -> float:
+        return sum(usage["spent_since_refresh"] for usage in server.quota.stats()["keys"].values())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Retry, Retry-After and circuit breaker tests against the mock kwrds.ai API
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from utils.errors import (AuthError, CircuitOpenError, ClientError, RateLimitedError, TransientError,
+                          classify_status)
+from utils.http_client import HttpClient
+from utils.resilience import RetryPolicy
+
+
+class ClassifyStatusTest(unittest.TestCase):
+    def test_statuses_map_to_error_types(self):
+        self.assertIsInstance(classify_status(429, "", 3.0), RateLimitedError)
+        self.assertEqual(classify_status(429, "", 3.0).retry_after, 3.0)
+        self.assertIsInstance(classify_status(401, ""), AuthError)
+        self.assertIsInstance(classify_status(403, ""), AuthError)
+        self.assertIsInstance(classify_status(408, ""), TransientError)
+        self.assertIsInstance(classify_status(503, ""), TransientError)
+        self.assertIsInstance(classify_status(404, ""), ClientError)
+        self.assertFalse(classify_status(401, "").retryable)
+        self.assertTrue(classify_status(502, "").retryable)
+
+
+class HttpClientResilienceTest(unittest.TestCase):
+    def setUp(self):
+        api_thread = MockApiThread(latency=0.001, retry_after=0.2)
+        self.api = api_thread.__enter__()
+        self.addCleanup(api_thread.__exit__, None, None, None)
+        self.url = f"{self.api.base_url}/keywords"
+
+    def _client(self, **kwargs) -> HttpClient:
+        kwargs.setdefault("retry_policy", RetryPolicy(max_attempts=3, base_delay=0.001))
+        return HttpClient(**kwargs)
+
+    async def _call(self, client: HttpClient, seed: str):
+        return await client.make_api_request(self.url, {"X-API-KEY": "test-key"},
+                                             {"search_question": seed, "search_country": "en-US"})
+
+    def test_retries_transient_error_then_honors_retry_after(self):
+        async def run():
+            client = self._client()
+            try:
+                self.api.fail_next(503, 429)
+                served = self.api.requests_served
+                start = time.perf_counter()
+                result = await self._call(client, "running shoes")
+                return result, time.perf_counter() - start, self.api.requests_served - served, client
+            finally:
+                await client.aclose()
+
+        result, elapsed, attempts, client = asyncio.run(run())
+        self.assertTrue(result["keywords"])
+        self.assertEqual(attempts, 3)
+        self.assertEqual(client.retries, 2)
+        # The 429 carried Retry-After: 0.2, far longer than the jittered backoff
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertEqual(client.stats()["circuits"], {f"127.0.0.1:{self.api.port}": "closed"})
+        self.assertEqual(client._breaker_for(self.url).failures, 0)
+
+    def test_auth_error_is_not_retried_and_leaves_the_breaker_alone(self):
+        async def run():
+            client = self._client(circuit_failure_threshold=1)
+            try:
+                self.api.fail_next(401)
+                served = self.api.requests_served
+                with self.assertRaises(AuthError):
+                    await self._call(client, "running shoes")
+                return self.api.requests_served - served, client
+            finally:
+                await client.aclose()
+
+        attempts, client = asyncio.run(run())
+        self.assertEqual(attempts, 1)
+        self.assertEqual(client.retries, 0)
+        self.assertEqual(client._breaker_for(self.url).state, "closed")
+        self.assertEqual(client._breaker_for(self.url).failures, 0)
+
+    def test_breaker_counts_requests_not_attempts_then_opens_and_half_opens(self):
+        async def run():
+            client = self._client(retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001),
+                                  circuit_failure_threshold=2, circuit_reset_timeout=0.2)
+            breaker = client._breaker_for(self.url)
+            try:
+                # Both attempts fail, but that is one failed request
+                self.api.fail_next(503, 503)
+                with self.assertRaises(TransientError):
+                    await self._call(client, "first")
+                self.assertEqual((breaker.failures, breaker.state), (1, "closed"))
+
+                self.api.fail_next(502, 502)
+                with self.assertRaises(TransientError):
+                    await self._call(client, "second")
+                self.assertEqual(breaker.state, "open")
+
+                served = self.api.requests_served
+                with self.assertRaises(CircuitOpenError):
+                    await self._call(client, "third")
+                self.assertEqual(self.api.requests_served, served)
+
+                # A failed probe re-opens at once instead of retrying into the open circuit
+                await asyncio.sleep(0.25)
+                self.assertEqual(breaker.state, "half-open")
+                self.api.fail_next(503)
+                with self.assertRaises(TransientError):
+                    await self._call(client, "fourth")
+                self.assertEqual(self.api.requests_served, served + 1)
+                self.assertEqual(breaker.state, "open")
+
+                await asyncio.sleep(0.25)
+                result = await self._call(client, "fifth")
+                self.assertTrue(result["keywords"])
+                self.assertEqual((breaker.failures, breaker.state), (0, "closed"))
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
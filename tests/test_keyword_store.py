@@ -0,0 +1,77 @@
+"""
+Keyword store tests: rows written through to the database are seen by other processes
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_store import KeywordDatabase, KeywordStore
+
+
+def _response(*rows):
+    return [{"keyword": keyword, "volume": volume} for keyword, volume in rows]
+
+
+class SharedKeywordStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _store(self) -> KeywordStore:
+        store = KeywordStore(backend=KeywordDatabase(self.directory))
+        self.addCleanup(store.close)
+        return store
+
+    def _record(self, store, seed, *rows):
+        store.record("key-a", "/keywords-with-volumes", {"search_question": seed, "search_country": "en-US"},
+                     _response(*rows))
+
+    def test_rows_written_by_another_process_are_picked_up(self):
+        writer, reader = self._store(), self._store()
+        self._record(writer, "shoes", ("running shoes", 900))
+        self.assertEqual(reader.search("key-a", "en-US", query="shoes")["rows"][0][:2], ["running shoes", 900])
+
+        # The reader has loaded the table; later writes must still reach it
+        self._record(writer, "boots", ("hiking boots", 500), ("running shoes", 1200))
+        self.assertEqual([row[:2] for row in reader.search("key-a", "en-US", related_to="boots")["rows"]],
+                         [["running shoes", 1200], ["hiking boots", 500]])
+        self.assertEqual(reader.stats()["rows"], 2)
+
+    def test_own_writes_are_not_read_back(self):
+        store, other = self._store(), self._store()
+        self._record(store, "shoes", ("running shoes", 900))
+        store.search("key-a", "en-US", query="shoes")
+        self._record(store, "shoes", ("trail shoes", 400))
+        table = store._tables[(store._partition("key-a"), "en-us")]
+        self.assertEqual(table.synced_version, store.backend.version(store._partition("key-a"), "en-us"))
+        # Once another process writes in between, the next lookup catches up
+        self._record(other, "shoes", ("road shoes", 300))
+        self.assertEqual(store.search("key-a", "en-US", query="shoes")["match_count"], 3)
+
+    def test_database_without_write_versions_is_migrated(self):
+        conn = sqlite3.connect(os.path.join(self.directory, "keywords.sqlite3"))
+        conn.executescript("""
+            CREATE TABLE keywords (partition TEXT NOT NULL, country TEXT NOT NULL, keyword_key TEXT NOT NULL,
+                keyword TEXT NOT NULL, volume INTEGER, cpc REAL, competition REAL, fetched_at REAL NOT NULL,
+                PRIMARY KEY (partition, country, keyword_key));
+            CREATE TABLE keyword_seeds (partition TEXT NOT NULL, country TEXT NOT NULL, seed TEXT NOT NULL,
+                keyword_key TEXT NOT NULL, PRIMARY KEY (partition, country, seed, keyword_key)) WITHOUT ROWID;
+        """)
+        conn.execute("INSERT INTO keywords VALUES (?, 'en-us', 'old shoes', 'old shoes', 10, NULL, NULL, 1e12)",
+                     (KeywordStore._partition("key-a"),))
+        conn.commit()
+        conn.close()
+        store = self._store()
+        self.assertEqual(store.search("key-a", "en-US", query="shoes")["match_count"], 1)
+        self._record(store, "shoes", ("new shoes", 20))
+        self.assertEqual(self._store().search("key-a", "en-US", query="shoes")["match_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
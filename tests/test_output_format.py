@@ -0,0 +1,94 @@
+"""
+Result rendering tests: compact JSON, tables and the max_chars budget fill
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.output_format import render_result, render_table
+from utils.response_utils import limit_response_size
+from utils.result_store import ResultStore
+
+
+def _rows(count):
+    return [{"keyword": f"running shoes {i}", "volume": 1000 - i} for i in range(count)]
+
+
+class RenderTest(unittest.TestCase):
+    def test_json_is_compact(self):
+        self.assertEqual(render_result({"a": [1, 2], "b": "x"}), '{"a":[1,2],"b":"x"}')
+
+    def test_table_sections(self):
+        text = render_table({
+            "search_question": "shoes",
+            "keywords": [{"keyword": "a, b", "volume": 1}, {"keyword": "c", "cpc": 0.5}],
+            "questions": ["why?", "how?"],
+            "columns": ["keyword", "volume"],
+            "rows": [["d", None]],
+        })
+        self.assertEqual(text, "\n\n".join([
+            "search_question: shoes",
+            '## keywords\nkeyword,volume,cpc\n"a, b",1,\nc,,0.5',
+            "## questions\nwhy?\nhow?",
+            "## rows\nkeyword,volume\nd,",
+        ]))
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            render_result({}, output_format="xml")
+
+
+class BudgetFillTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore()
+
+    def test_fills_past_the_first_page_within_the_budget(self):
+        result = limit_response_size({"keywords": _rows(200), "search_question": "shoes"}, max_items=10,
+                                     result_store=self.store, api_key="key-a")
+        for output_format in ("json", "table"):
+            text = render_result(result, output_format, max_chars=2000, result_store=self.store, api_key="key-a")
+            self.assertLessEqual(len(text), 2000)
+        shaped = json.loads(render_result(result, max_chars=2000, result_store=self.store, api_key="key-a"))
+        showing = shaped["keywords_showing"]
+        self.assertGreater(showing, 10)
+        self.assertEqual(shaped["keywords"], _rows(200)[:showing])
+        self.assertEqual(shaped["keywords_total_count"], 200)
+        self.assertTrue(shaped["keywords_truncated"])
+        # The cursor picks up right after the rows that fit
+        page = self.store.page(shaped["keywords_next_cursor"], "key-a", 1)
+        self.assertEqual(page["items"], [_rows(200)[showing]])
+
+    def test_lists_that_fit_are_shown_whole_without_markers(self):
+        result = limit_response_size({"keywords": _rows(30)}, max_items=10, result_store=self.store, api_key="key-a")
+        shaped = json.loads(render_result(result, max_chars=100000, result_store=self.store, api_key="key-a"))
+        self.assertEqual(shaped, {"keywords": _rows(30)})
+
+    def test_untruncated_lists_get_a_cursor_when_cut(self):
+        shaped = json.loads(render_result({"keywords": _rows(100)}, max_chars=500, result_store=self.store,
+                                          api_key="key-a"))
+        self.assertLessEqual(len(json.dumps(shaped, separators=(",", ":"))), 500)
+        page = self.store.page(shaped["keywords_next_cursor"], "key-a", 1)
+        self.assertEqual(page["items"], [_rows(100)[shaped["keywords_showing"]]])
+
+    def test_unresolvable_lists_keep_their_markers(self):
+        store = ResultStore(max_items=50)
+        result = limit_response_size({"keywords": _rows(80)}, max_items=10, result_store=store, api_key="key-a")
+        self.assertNotIn("keywords_next_cursor", result)
+        shaped = json.loads(render_result(result, max_chars=100000, result_store=store, api_key="key-a"))
+        self.assertEqual(len(shaped["keywords"]), 10)
+        self.assertEqual((shaped["keywords_truncated"], shaped["keywords_total_count"], shaped["keywords_showing"]),
+                         (True, 80, 10))
+
+    def test_another_keys_cursor_is_not_followed(self):
+        result = limit_response_size({"keywords": _rows(50)}, max_items=10, result_store=self.store, api_key="key-a")
+        shaped = json.loads(render_result(result, max_chars=100000, result_store=self.store, api_key="key-b"))
+        self.assertEqual(shaped["keywords"], _rows(50)[:10])
+        self.assertEqual(shaped["keywords_total_count"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Cursor paging tests for the result store and the next_page tool
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handlers.pagination_handlers import MAX_PAGE_SIZE, PaginationHandlers
+from utils.response_utils import limit_response_size
+from utils.result_store import ResultStore, decode_cursor, encode_cursor
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("abc_-1", 40)), ("abc_-1", 40))
+
+    def test_garbage_is_rejected(self):
+        for cursor in ("", "not a cursor", encode_cursor("abc", 1)[:-2] + "!!"):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class ResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore()
+        self.items = list(range(25))
+
+    def test_pages_walk_the_whole_list(self):
+        cursor = self.store.put(self.items, "key-a", 10)
+        seen = []
+        while cursor:
+            page = self.store.page(cursor, "key-a", 10)
+            self.assertEqual(page["total_count"], 25)
+            seen += page["items"]
+            cursor = page["next_cursor"]
+        self.assertEqual(seen, self.items[10:])
+
+    def test_other_keys_cannot_read_a_cursor(self):
+        cursor = self.store.put(self.items, "key-a", 10)
+        for api_key in ("key-b", ""):
+            with self.assertRaises(ValueError):
+                self.store.page(cursor, api_key, 10)
+        self.assertEqual(self.store.page(cursor, "key-a", 5)["items"], self.items[10:15])
+
+    def test_expired_results_are_dropped(self):
+        store = ResultStore(ttl=60)
+        cursor = store.put(self.items, "key-a", 10)
+        with mock.patch("utils.result_store.time.time", return_value=store._results[decode_cursor(cursor)[0]][0]):
+            with self.assertRaises(ValueError):
+                store.page(cursor, "key-a", 10)
+        self.assertEqual(store.stats(), {"results": 0, "items": 0})
+
+    def test_least_recently_used_results_are_evicted(self):
+        store = ResultStore(max_results=2, max_items=40)
+        first = store.put(self.items, "key-a", 10)
+        second = store.put(list(range(10)), "key-a", 5)
+        store.page(first, "key-a", 1)
+        # Reading first made second the oldest, so a third result pushes second out
+        third = store.put(list(range(10)), "key-a", 5)
+        with self.assertRaises(ValueError):
+            store.page(second, "key-a", 1)
+        store.page(third, "key-a", 1)
+        self.assertEqual(store.stats()["results"], 2)
+        # Over the item cap the oldest results go until the new one fits
+        fourth = store.put(list(range(30)), "key-a", 5)
+        with self.assertRaises(ValueError):
+            store.page(first, "key-a", 1)
+        self.assertLessEqual(store.stats()["items"], 40)
+        store.page(fourth, "key-a", 1)
+
+    def test_lists_over_the_item_cap_are_not_stored(self):
+        store = ResultStore(max_items=10)
+        self.assertIsNone(store.put(self.items, "key-a", 10))
+        self.assertEqual(store.stats(), {"results": 0, "items": 0})
+
+
+class NextPageTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultStore()
+        self.handlers = PaginationHandlers(self.store)
+
+    def test_next_page_continues_a_truncated_response(self):
+        response = limit_response_size({"keywords": [{"keyword": f"shoe {i}"} for i in range(220)]},
+                                       max_items=10, result_store=self.store, api_key="key-a")
+        self.assertEqual(response["keywords_showing"], 10)
+        page = asyncio.run(self.handlers.handle_next_page({"cursor": response["keywords_next_cursor"]}, "key-a"))
+        self.assertEqual([row["keyword"] for row in page["items"]], [f"shoe {i}" for i in range(10, 20)])
+        self.assertEqual(page["offset"], 10)
+
+        big = asyncio.run(self.handlers.handle_next_page({"cursor": page["next_cursor"], "page_size": 1000}, "key-a"))
+        self.assertEqual(len(big["items"]), MAX_PAGE_SIZE)
+        last = asyncio.run(self.handlers.handle_next_page({"cursor": big["next_cursor"], "page_size": 1000}, "key-a"))
+        self.assertEqual(last["items"][-1]["keyword"], "shoe 219")
+        self.assertIsNone(last["next_cursor"])
+
+    def test_next_page_refuses_another_keys_cursor(self):
+        response = limit_response_size({"keywords": list(range(20))}, max_items=10, result_store=self.store,
+                                       api_key="key-a")
+        with self.assertRaises(ValueError):
+            asyncio.run(self.handlers.handle_next_page({"cursor": response["keywords_next_cursor"]}, "key-b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Batch runner tests against the mock kwrds.ai API
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_api import MockApiThread
+from run_batch import BatchRunner
+from stdio_server import KwrdsApiMCPServer
+
+
+class BatchRunnerTest(unittest.TestCase):
+    def setUp(self):
+        api_thread = MockApiThread(latency=0.001)
+        self.api = api_thread.__enter__()
+        self.addCleanup(api_thread.__exit__, None, None, None)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        environment = mock.patch.dict(os.environ, {
+            "KWRDS_API_BASE_URL": self.api.base_url,
+            "KWRDS_PAA_BASE_URL": self.api.base_url,
+            "KWRDS_RATE_LIMIT": "0",
+            "KWRDS_API_KEY": "test-key",
+        })
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def _run(self, lines, concurrency=2):
+        input_path = os.path.join(self.directory.name, "calls.jsonl")
+        output_path = os.path.join(self.directory.name, "results.jsonl")
+        with open(input_path, "w", encoding="utf-8") as calls:
+            calls.write("\n".join(lines) + "\n")
+
+        async def run():
+            server = KwrdsApiMCPServer()
+            try:
+                runner = BatchRunner(server, input_path, output_path, concurrency)
+                return await asyncio.wait_for(runner.run(), timeout=30), runner.checkpoint
+            finally:
+                await server.aclose()
+
+        counts, checkpoint = asyncio.run(run())
+        with open(output_path, encoding="utf-8") as results:
+            return counts, checkpoint, [json.loads(line) for line in results]
+
+    def test_blank_lines_do_not_stall_the_window(self):
+        call = json.dumps({"tool": "serp", "arguments": {"search_question": "running shoes", "search_country": "en-US"}})
+        lines = [call, ""] + [call] * 60 + ["   ", call]
+        counts, checkpoint, results = self._run(lines, concurrency=2)
+        self.assertEqual(counts["ok"], 62)
+        self.assertEqual(counts["skipped"], 2)
+        self.assertEqual(sorted(result["line"] for result in results), [1] + list(range(3, 63)) + [64])
+        self.assertEqual(checkpoint.next_line, len(lines) + 1)
+        self.assertEqual(checkpoint.done, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
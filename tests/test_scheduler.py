@@ -0,0 +1,131 @@
+"""
+Lane scheduler tests: concurrency caps, fair queuing across keys and cancellation
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limit import PRIORITIES
+from utils.scheduler import LaneScheduler
+
+
+class LaneSchedulerTest(unittest.TestCase):
+    def _run_order(self, scheduler, calls):
+        """Queue calls of (label, api_key, priority) behind a held slot and return the order they run in"""
+        order = []
+
+        async def call(label, api_key, priority):
+            async with scheduler.slot("ai", api_key, priority):
+                order.append(label)
+                await asyncio.sleep(0)
+
+        async def run():
+            holder = scheduler.slot("ai", "holder")
+            await holder.__aenter__()
+            tasks = []
+            for label, api_key, priority in calls:
+                tasks.append(asyncio.create_task(call(label, api_key, priority)))
+                await asyncio.sleep(0)
+            await holder.__aexit__(None, None, None)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        return order
+
+    def test_limit_caps_concurrent_calls_and_unlimited_lanes_admit_all(self):
+        scheduler = LaneScheduler({"ai": 2, "local": None})
+        peak = {"ai": 0, "local": 0}
+        running = {"ai": 0, "local": 0}
+
+        async def call(lane):
+            async with scheduler.slot(lane, "key-a"):
+                running[lane] += 1
+                peak[lane] = max(peak[lane], running[lane])
+                await asyncio.sleep(0.01)
+                running[lane] -= 1
+
+        async def run():
+            await asyncio.gather(*(call(lane) for lane in ("ai", "local") for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, {"ai": 2, "local": 6})
+        self.assertEqual(scheduler.stats()["ai"], {"limit": 2, "active": 0, "queued": 0})
+
+    def test_keys_are_interleaved_instead_of_first_come_first_served(self):
+        calls = [(f"a{i}", "key-a", PRIORITIES["normal"]) for i in range(6)]
+        calls += [(f"b{i}", "key-b", PRIORITIES["normal"]) for i in range(2)]
+        order = self._run_order(LaneScheduler({"ai": 1}), calls)
+        self.assertEqual(order, ["a0", "b0", "a1", "b1", "a2", "a3", "a4", "a5"])
+
+    def test_high_priority_gets_a_larger_share(self):
+        calls = [(f"low{i}", "key-a", PRIORITIES["low"]) for i in range(4)]
+        calls += [(f"high{i}", "key-b", PRIORITIES["high"]) for i in range(4)]
+        order = self._run_order(LaneScheduler({"ai": 1}), calls)
+        # Four high calls fit into the share of one low call
+        self.assertEqual(order[:5], ["low0", "high0", "high1", "high2", "high3"])
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = LaneScheduler({"ai": 1})
+
+        async def run():
+            holder = scheduler.slot("ai", "key-a")
+            await holder.__aenter__()
+
+            async def wait_for_slot():
+                async with scheduler.slot("ai", "key-b"):
+                    pass
+
+            waiter = asyncio.create_task(wait_for_slot())
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()["ai"]["queued"], 1)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            self.assertEqual(scheduler.stats()["ai"], {"limit": 1, "active": 1, "queued": 0})
+            await holder.__aexit__(None, None, None)
+            # The lane is free again at once
+            async with scheduler.slot("ai", "key-c") as waited:
+                self.assertLess(waited, 0.05)
+
+        asyncio.run(run())
+        self.assertEqual(scheduler.stats()["ai"], {"limit": 1, "active": 0, "queued": 0})
+
+    def test_slot_granted_to_a_cancelled_call_is_passed_on(self):
+        scheduler = LaneScheduler({"ai": 1})
+        ran = []
+
+        async def call(label):
+            async with scheduler.slot("ai", label):
+                ran.append(label)
+
+        async def run():
+            holder = scheduler.slot("ai", "holder")
+            await holder.__aenter__()
+            first = asyncio.create_task(call("first"))
+            second = asyncio.create_task(call("second"))
+            await asyncio.sleep(0)
+            # Releasing grants first its slot; cancelling it before it runs must hand the slot to second
+            await holder.__aexit__(None, None, None)
+            first.cancel()
+            await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), timeout=1)
+
+        asyncio.run(run())
+        self.assertEqual(ran, ["second"])
+        self.assertEqual(scheduler.stats()["ai"], {"limit": 1, "active": 0, "queued": 0})
+
+    def test_unknown_lane_is_rejected(self):
+        scheduler = LaneScheduler({"ai": 1})
+
+        async def run():
+            async with scheduler.slot("gpu", "key-a"):
+                pass
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
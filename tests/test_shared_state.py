@@ -0,0 +1,64 @@
+"""
+Cross-process state tests: shared result store and transaction handling
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.shared_state import SharedResultStore, SharedState
+
+
+class _FailingConnection:
+    """Connection proxy that raises on statements containing a marker"""
+
+    def __init__(self, conn: sqlite3.Connection, marker: str):
+        self._conn = conn
+        self._marker = marker
+
+    def execute(self, sql, *args):
+        if self._marker in sql:
+            raise sqlite3.OperationalError("injected failure")
+        return self._conn.execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self._conn.executemany(sql, *args)
+
+
+class SharedResultStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.state = SharedState(self.directory)
+        self.addCleanup(self.state.close)
+        self.store = SharedResultStore(self.state)
+
+    def test_cursor_is_served_by_another_process_store(self):
+        cursor = self.store.put(list(range(30)), "key-a", 10)
+        other_state = SharedState(self.directory)
+        self.addCleanup(other_state.close)
+        other = SharedResultStore(other_state)
+        self.assertEqual(other.page(cursor, "key-a", 5)["items"], [10, 11, 12, 13, 14])
+        with self.assertRaises(ValueError):
+            other.page(cursor, "key-b", 5)
+
+    def test_failed_put_is_rolled_back(self):
+        self.store.put(list(range(5)), "key-a", 1)
+        self.store._conn = _FailingConnection(self.state._conn, "SELECT COUNT(*)")
+        with self.assertRaises(sqlite3.OperationalError):
+            self.store.put(list(range(5)), "key-a", 1)
+        # The insert before the failing statement is undone and no transaction is left open
+        self.store._conn = self.state._conn
+        self.assertEqual(self.store.stats()["results"], 1)
+        self.assertFalse(self.state._conn.in_transaction)
+        self.store.put(list(range(5)), "key-a", 1)
+        self.assertEqual(self.store.stats()["results"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
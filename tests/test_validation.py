@@ -0,0 +1,125 @@
+"""
+Tool argument validation and registry dispatch tests
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stdio_server import KwrdsApiMCPServer
+from tools.definitions import get_tool_definitions
+from tools.registry import ToolRegistry
+from utils.validation import ArgumentError, compile_validator
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "search_question": {"type": "string", "description": "Seed keyword"},
+        "keywords": {"type": "array", "items": {"type": "string"}},
+        "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+        "output_format": {"type": "string", "enum": ["json", "table"]},
+        "api_key": {"type": "string"},
+    },
+    "required": ["search_question", "api_key"],
+}
+
+
+class CompileValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.validate = compile_validator(SCHEMA)
+
+    def assertInvalid(self, arguments, *messages):
+        with self.assertRaises(ArgumentError) as raised:
+            self.validate(arguments)
+        for message in messages:
+            self.assertIn(message, str(raised.exception))
+
+    def test_valid_arguments_pass(self):
+        self.validate({"search_question": "shoes", "api_key": "key", "keywords": ["a", "b"], "limit": 100,
+                       "output_format": "table"})
+
+    def test_missing_and_null_required_fields(self):
+        self.assertInvalid({}, "search_question is required", "api_key is required")
+        self.assertInvalid(None, "search_question is required")
+        self.assertInvalid({"search_question": None, "api_key": "key"}, "search_question is required")
+
+    def test_type_errors(self):
+        self.assertInvalid({"search_question": 3, "api_key": "key"}, "search_question must be a string")
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "limit": True}, "limit must be an integer")
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "keywords": "a,b"}, "keywords must be an array")
+
+    def test_enum_range_and_array_item_errors(self):
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "output_format": "xml"},
+                           "output_format must be one of: json, table")
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "limit": 0}, "limit must be at least 1")
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "limit": 101}, "limit must be at most 100")
+        self.assertInvalid({"search_question": "shoes", "api_key": "key", "keywords": ["a", 2]},
+                           "keywords[1] must be a string")
+
+    def test_every_problem_is_reported_at_once(self):
+        self.assertInvalid({"limit": 0, "output_format": "xml"},
+                           "search_question is required", "limit must be at least 1", "output_format must be one of")
+
+    def test_optional_names_are_not_enforced(self):
+        compile_validator(SCHEMA, optional=("api_key",))({"search_question": "shoes"})
+
+    def test_unsupported_keywords_are_rejected_when_compiling(self):
+        with self.assertRaises(ValueError):
+            compile_validator({"type": "string", "pattern": "^a"})
+
+
+class ToolRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def handler(arguments, api_key):
+            self.calls.append((arguments, api_key))
+            return {"ok": True}
+
+        self.definitions = get_tool_definitions()
+        self.handlers = {name: handler for name in self.definitions}
+
+    def test_api_key_may_come_from_elsewhere(self):
+        registry = ToolRegistry(self.definitions, self.handlers)
+        arguments = {"search_question": "shoes", "search_country": "en-US"}
+        self.assertEqual(asyncio.run(registry.dispatch("serp", arguments, "env-key")), {"ok": True})
+        self.assertEqual(self.calls, [(arguments, "env-key")])
+
+    def test_invalid_arguments_never_reach_the_handler(self):
+        registry = ToolRegistry(self.definitions, self.handlers)
+        with self.assertRaises(ArgumentError) as raised:
+            asyncio.run(registry.dispatch("search_volume", {"keywords": "shoes", "max_concurrency": 11}, "key"))
+        self.assertIn("search_country is required", str(raised.exception))
+        self.assertIn("keywords must be an array", str(raised.exception))
+        self.assertIn("max_concurrency must be at most 10", str(raised.exception))
+        self.assertEqual(self.calls, [])
+
+    def test_api_key_is_required_unless_optional(self):
+        registry = ToolRegistry(self.definitions, self.handlers, optional=())
+        with self.assertRaises(ArgumentError) as raised:
+            asyncio.run(registry.dispatch("serp", {"search_question": "shoes", "search_country": "en-US"}, "key"))
+        self.assertIn("api_key is required", str(raised.exception))
+
+    def test_unknown_tool_and_mismatched_handlers(self):
+        registry = ToolRegistry(self.definitions, self.handlers)
+        with self.assertRaises(ValueError):
+            asyncio.run(registry.dispatch("no_such_tool", {}, "key"))
+        with self.assertRaises(ValueError):
+            ToolRegistry(self.definitions, dict(self.handlers, extra=self.handlers["serp"]))
+
+    def test_server_validates_without_api_key_when_the_environment_has_one(self):
+        with mock.patch.dict(os.environ, {"KWRDS_API_KEY": "env-key"}):
+            server = KwrdsApiMCPServer()
+        try:
+            self.assertEqual(server.api_key, "env-key")
+            server.registry.get("serp").validate({"search_question": "shoes", "search_country": "en-US"})
+        finally:
+            asyncio.run(server.aclose())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,57 @@ Defines all available tools and their input schemas for the kwrds.ai API
 Read more about kwrds.ai at https://www.kwrds.ai
 """
 
+# Call controls accepted by every tool
+COMMON_PROPERTIES = {
+    "output_format": {
+        "type": "string",
+        "description": "Result rendering: 'json' (compact, default) or 'table' (CSV-like rows, fewer characters for keyword lists)",
+        "enum": ["json", "table"]
+    },
+    "max_chars": {
+        "type": "integer",
+        "description": "Character budget for the result; list fields are filled row by row up to it, with a next_page cursor for the rest",
+        "minimum": 200
+    },
+    "priority": {
+        "type": "string",
+        "description": "Scheduling priority (default: 'normal'). When credits run low, 'low' calls are refused first and 'high' calls last",
+        "enum": ["high", "normal", "low"]
+    }
+}
+
+# Concurrent tool calls allowed per scheduling lane (0 or None: unlimited). Each definition
+# names its lane: quick lookups, slow AI generation, multi-request reports, or local-only tools
+LANE_LIMITS = {
+    "lookup": 16,
+    "ai": 4,
+    "report": 4,
+    "local": None,
+}
+
+
 def get_tool_definitions():
     """Return all available MCP tool definitions"""
-    return {
+    definitions = {
+        "keywords": {
+            "name": "keywords",
+            "lane": "lookup",
+            "description": "Generate keyword ideas for a seed keyword or question. Returns keyword suggestions without volume data; use keywords_with_volumes when search volumes are needed.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "search_question": {"type": "string", "description": "The main keyword/query to generate ideas for"},
+                    "search_country": {"type": "string", "description": "Country and language code (e.g., 'en-US', 'es-ES', 'fr-FR')"},
+                    "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
+                    "version": {"type": "string", "description": "API version (default: '1')", "default": "1"}
+                },
+                "required": ["search_question", "search_country", "api_key"]
+            }
+        },
+
         "keywords_with_volumes": {
             "name": "keywords_with_volumes",
+            "lane": "lookup",
             "description": "Research keywords with search volumes, competition data, and search intent analysis. Returns comprehensive keyword data including volume, CPC, competition, and search intent.",
             "inputSchema": {
                 "type": "object",
@@ -26,14 +72,16 @@ def get_tool_definitions():
         
         "search_volume": {
             "name": "search_volume", 
-            "description": "Get search volumes for a list of seed keywords. Returns volume, CPC, competition, and search intent data.",
+            "lane": "lookup",
+            "description": "Get search volumes for a list of seed keywords. Returns volume, CPC, competition, and search intent data. Lists of more than 10 keywords are fetched in parallel chunks and returned as a compact table of keyword, volume, CPC and competition.",
             "inputSchema": {
                 "type": "object",
                 "properties": {
-                    "keywords": {"type": "array", "items": {"type": "string"}, "description": "List of keywords to get volumes for"},
+                    "keywords": {"type": "array", "items": {"type": "string"}, "description": "List of keywords to get volumes for (any length)"},
                     "search_country": {"type": "string", "description": "Country and language code (e.g., 'en-US')"},
                     "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
-                    "version": {"type": "string", "description": "API version (default: '1')", "default": "1"}
+                    "version": {"type": "string", "description": "API version (default: '1')", "default": "1"},
+                    "max_concurrency": {"type": "integer", "description": "Parallel chunk requests for large keyword lists (default: 5, max: 10)", "minimum": 1, "maximum": 10}
                 },
                 "required": ["keywords", "search_country", "api_key"]
             }
@@ -41,6 +89,7 @@ def get_tool_definitions():
         
         "serp": {
             "name": "serp",
+            "lane": "lookup",
             "description": "Analyze SERP (Search Engine Results Page) for a keyword. Returns top ranking pages, People Also Search For, and trending queries.",
             "inputSchema": {
                 "type": "object",
@@ -56,6 +105,7 @@ def get_tool_definitions():
         
         "serp_detailed": {
             "name": "serp_detailed",
+            "lane": "lookup",
             "description": "Get detailed meta tags and SEO information from a specific URL found in SERP results.",
             "inputSchema": {
                 "type": "object",
@@ -69,6 +119,7 @@ def get_tool_definitions():
         
         "ai": {
             "name": "ai",
+            "lane": "ai",
             "description": "AI-powered keyword research using various prompts like longtail keywords, seed keywords, ecommerce keywords, funnel-based keywords, etc.",
             "inputSchema": {
                 "type": "object",
@@ -95,6 +146,7 @@ def get_tool_definitions():
         
         "ai_content": {
             "name": "ai_content",
+            "lane": "ai",
             "description": "AI-powered content generation including SEO outlines, 7W1H questions, and meta titles/descriptions.",
             "inputSchema": {
                 "type": "object",
@@ -116,6 +168,7 @@ def get_tool_definitions():
         
         "lsi": {
             "name": "lsi",
+            "lane": "lookup",
             "description": "Generate LSI (Latent Semantic Indexing) keywords using AI analysis, SERP analysis, and Google autosuggest data.",
             "inputSchema": {
                 "type": "object",
@@ -130,6 +183,7 @@ def get_tool_definitions():
         
         "url_rankings": {
             "name": "url_rankings",
+            "lane": "lookup",
             "description": "Analyze what keywords a specific URL/domain is ranking for, including ranking positions and estimated traffic.",
             "inputSchema": {
                 "type": "object",
@@ -144,6 +198,7 @@ def get_tool_definitions():
         
         "related_keywords": {
             "name": "related_keywords",
+            "lane": "lookup",
             "description": "Find semantically related keywords that don't necessarily contain the main keyword but are topically relevant.",
             "inputSchema": {
                 "type": "object",
@@ -159,6 +214,7 @@ def get_tool_definitions():
         
         "paa": {
             "name": "paa",
+            "lane": "lookup",
             "description": "Get People Also Ask (PAA) questions for a keyword from Google search results.",
             "inputSchema": {
                 "type": "object",
@@ -174,6 +230,7 @@ def get_tool_definitions():
         
         "paa_ai": {
             "name": "paa_ai",
+            "lane": "ai",
             "description": "AI-powered analysis of People Also Ask (PAA) questions with detailed answers.",
             "inputSchema": {
                 "type": "object",
@@ -188,8 +245,80 @@ def get_tool_definitions():
             }
         },
         
+        "keyword_report": {
+            "name": "keyword_report",
+            "lane": "report",
+            "description": "One-call keyword report: fetches keywords with volumes, related keywords, LSI keywords, SERP and People Also Ask for a seed term in parallel and merges them into a deduplicated report. Sections that fail are reported under 'errors' while the rest are still returned.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "search_question": {"type": "string", "description": "Seed keyword to research"},
+                    "search_country": {"type": "string", "description": "Country and language code (e.g., 'en-US')"},
+                    "search_language": {"type": "string", "description": "Language code for PAA questions (default: taken from search_country)"},
+                    "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
+                },
+                "required": ["search_question", "search_country", "api_key"]
+            }
+        },
+
+        "cluster_keywords": {
+            "name": "cluster_keywords",
+            "lane": "report",
+            "description": "Group a keyword list (e.g. from keywords, related_keywords or lsi) into clusters of near-duplicates by word overlap, ignoring case, spacing, punctuation and plurals. Returns one representative per cluster with its aggregate search volume, so follow-up search_volume and serp calls need only the representatives. Volumes come from data fetched earlier and cost no credits; serp_overlap additionally merges top clusters whose SERPs overlap, using one SERP lookup per cluster checked.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "keywords": {"type": "array", "items": {"type": "string"}, "description": "Keywords to cluster"},
+                    "search_country": {"type": "string", "description": "Country and language code (e.g., 'en-US') for stored volumes and SERP lookups"},
+                    "threshold": {"type": "number", "description": "Minimum word overlap (Jaccard, 0.1-1) between a keyword and its cluster's representative (default: 0.6)", "minimum": 0.1, "maximum": 1},
+                    "serp_overlap": {"type": "boolean", "description": "Also merge the highest volume clusters whose top results overlap (default: false; uses credits)"},
+                    "serp_threshold": {"type": "number", "description": "Share of ranking URLs two clusters must have in common to merge (default: 0.4)", "minimum": 0.1, "maximum": 1},
+                    "max_serp_lookups": {"type": "integer", "description": "Clusters checked by SERP overlap (default: 10, max: 50)", "minimum": 1, "maximum": 50},
+                    "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
+                },
+                "required": ["keywords", "api_key"]
+            }
+        },
+
+        "next_page": {
+            "name": "next_page",
+            "lane": "local",
+            "description": "Get the next page of a truncated result. Pass a '<field>_next_cursor' value from an earlier tool result; no API credits are used.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "cursor": {"type": "string", "description": "Cursor from a '<field>_next_cursor' or 'next_cursor' value"},
+                    "page_size": {"type": "integer", "description": "Items per page (default: 10, max: 100)", "minimum": 1, "maximum": 100},
+                    "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
+                },
+                "required": ["cursor", "api_key"]
+            }
+        },
+
+        "local_keyword_search": {
+            "name": "local_keyword_search",
+            "lane": "local",
+            "description": "Search keyword metrics already fetched by keyword, related, LSI and search volume tools, without API calls or credits. Look up exact keywords for their volumes, or find stored terms by words/word prefixes and by the seed term they were returned for. Every row shows when its metrics were fetched.",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "search_country": {"type": "string", "description": "Country and language code the data was fetched for (e.g., 'en-US')"},
+                    "keywords": {"type": "array", "items": {"type": "string"}, "description": "Exact keywords to look up; those not stored are listed under missing_keywords"},
+                    "query": {"type": "string", "description": "Words every returned keyword must contain"},
+                    "match": {"type": "string", "description": "How query words match keyword words: 'prefix' (default) or 'exact'", "enum": ["prefix", "exact"]},
+                    "related_to": {"type": "string", "description": "Only keywords an earlier lookup returned for this seed term"},
+                    "max_age_hours": {"type": "number", "description": "Skip rows fetched longer ago than this", "minimum": 0},
+                    "min_volume": {"type": "integer", "description": "Skip rows with a lower or unknown search volume", "minimum": 0},
+                    "limit": {"type": "integer", "description": "Rows to return, highest volume first for searches (default: 10, max: 1000)", "minimum": 1, "maximum": 1000},
+                    "api_key": {"type": "string", "description": "Your kwrds.ai API key"},
+                },
+                "required": ["search_country", "api_key"]
+            }
+        },
+
         "usage_count": {
             "name": "usage_count",
+            "lane": "lookup",
             "description": "Get current API usage statistics and remaining quotas for the API key.",
             "inputSchema": {
                 "type": "object",
@@ -199,4 +328,7 @@ def get_tool_definitions():
                 "required": ["api_key"]
             }
         }
-    } 
\ No newline at end of file
+    }
+    for definition in definitions.values():
+        definition["inputSchema"]["properties"].update(COMMON_PROPERTIES)
+    return definitions
@@ -0,0 +1,70 @@
+"""
+MCP Tool Registry
+Maps each tool name to its handler, a compiled argument validator, its scheduling lane and a prebuilt MCP descriptor
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from mcp import types
+
+from utils.rate_limit import current_priority
+from utils.scheduler import LaneScheduler
+from utils.validation import compile_validator
+
+ToolHandler = Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+
+class RegisteredTool:
+    def __init__(self, definition: Dict[str, Any], handler: ToolHandler, optional: Iterable[str]):
+        self.name = definition["name"]
+        self.handler = handler
+        self.lane = definition.get("lane")
+        self.validate = compile_validator(definition["inputSchema"], optional)
+        self.descriptor = types.Tool(
+            name=definition["name"],
+            description=definition["description"],
+            inputSchema=definition["inputSchema"],
+        )
+
+
+class ToolRegistry:
+    """Tool lookup built once at startup
+
+    Every definition needs a handler and vice versa, so a tool cannot be listed
+    without being callable. Arguments are validated before the handler runs, so
+    malformed calls fail without any network I/O. With a scheduler, handlers run
+    in a slot of their definition's lane; tools without a lane are not scheduled.
+    """
+
+    def __init__(self, definitions: Dict[str, Dict[str, Any]], handlers: Dict[str, ToolHandler],
+                 optional: Iterable[str] = ("api_key",), scheduler: Optional[LaneScheduler] = None):
+        unhandled = sorted(set(definitions) - set(handlers))
+        undefined = sorted(set(handlers) - set(definitions))
+        if unhandled or undefined:
+            raise ValueError(f"Tool definitions without handlers: {unhandled}; handlers without definitions: {undefined}")
+        optional = tuple(optional)
+        self._tools = {name: RegisteredTool(definition, handlers[name], optional) for name, definition in definitions.items()}
+        if scheduler is not None:
+            unknown = sorted({tool.lane for tool in self._tools.values() if tool.lane is not None and tool.lane not in scheduler})
+            if unknown:
+                raise ValueError(f"Tool lanes without a scheduler limit: {unknown}")
+        self.tools: List[types.Tool] = [tool.descriptor for tool in self._tools.values()]
+        self.scheduler = scheduler
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> RegisteredTool:
+        tool = self._tools.get(name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return tool
+
+    async def dispatch(self, name: str, arguments: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+        """Validate the arguments and run the tool's handler"""
+        tool = self.get(name)
+        tool.validate(arguments)
+        if self.scheduler is None or tool.lane is None:
+            return await tool.handler(arguments, api_key)
+        async with self.scheduler.slot(tool.lane, api_key, current_priority.get()):
+            return await tool.handler(arguments, api_key)
@@ -0,0 +1,175 @@
+"""
+Response cache for upstream API calls
+In-memory TTL cache with LRU eviction, partitioned per API key, optionally backed by a DiskCache
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from utils.disk_cache import DiskCache
+
+# Seconds to keep responses per endpoint path. Volumes move monthly, SERPs daily.
+DEFAULT_TTLS = {
+    "/search-volume": 7 * 24 * 3600,
+    "/keywords": 24 * 3600,
+    "/keywords-with-volumes": 24 * 3600,
+    "/related-keywords": 24 * 3600,
+    "/lsi": 24 * 3600,
+    "/url-rankings": 24 * 3600,
+    "/serp-detailed": 24 * 3600,
+    "/serp": 6 * 3600,
+    "/people-also-ask": 6 * 3600,
+}
+
+# Metered or generative endpoints, only cached when enabled by tool name
+OPT_IN_TTLS = {
+    "usage_count": ("/usage_count", 60),
+    "ai": ("/ai", 24 * 3600),
+    "ai_content": ("/ai/content", 24 * 3600),
+    "paa_ai": ("/paa-ai", 24 * 3600),
+}
+
+# Payload fields that carry credentials rather than query parameters
+CREDENTIAL_FIELDS = frozenset({"api_key", "email", "X-API-KEY"})
+
+# Query fields where case and surrounding whitespace do not change the answer
+CASE_INSENSITIVE_FIELDS = frozenset({"search_question", "keyword", "keywords"})
+
+
+def key_partition(api_key: str) -> str:
+    """Short, stable hash of an API key, used to keep per-key state apart without holding the key"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(api_key: str, method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> str:
+    """Build a cache key from endpoint and normalized payload, partitioned per API key"""
+    partition = key_partition(api_key)
+    normalized = {}
+    for key, value in (payload or {}).items():
+        if key in CREDENTIAL_FIELDS:
+            continue
+        if key in CASE_INSENSITIVE_FIELDS and isinstance(value, str):
+            value = value.strip().casefold()
+        normalized[key] = value
+    parts = urlsplit(url)
+    body = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{partition}:{method.upper()}:{parts.netloc}{parts.path}:{body}"
+
+
+class ResponseCache:
+    """Bounded in-memory cache of parsed upstream responses
+
+    Cached values are shared between callers and must be treated as read-only.
+    When a backend is given, memory misses fall through to it and writes go to both.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttls: Optional[Dict[str, float]] = None,
+                 opt_in: Iterable[str] = (), backend: Optional[DiskCache] = None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        for tool_name in opt_in:
+            if tool_name not in OPT_IN_TTLS:
+                raise ValueError(f"Unknown opt-in cache tool: {tool_name}")
+            endpoint, ttl = OPT_IN_TTLS[tool_name]
+            self.ttls.setdefault(endpoint, ttl)
+        # key -> (expires_at, size, value), oldest use first
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        # Entries stored by the prefetcher that no client call has used yet
+        self._prefetched: Set[str] = set()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    def ttl_for(self, url: str) -> float:
+        """Return the TTL for an endpoint URL, 0 when it must not be cached"""
+        return self.ttls.get(urlsplit(url).path, 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh cached value or None, counting the hit or miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+        if self.backend is not None:
+            stored = self.backend.get(key)
+            if stored is not None:
+                value, expires_at, size = stored
+                self._store(key, expires_at, size, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: float, size: int, endpoint: str = "", raw: Optional[bytes] = None,
+            prefetched: bool = False):
+        """Store a value for ttl seconds, evicting least recently used entries past max_bytes"""
+        if ttl <= 0:
+            return
+        self._store(key, time.time() + ttl, size, value)
+        if prefetched and key in self._entries:
+            self._prefetched.add(key)
+            self.prefetched += 1
+        if self.backend is not None:
+            self.backend.set(key, endpoint, value, ttl, raw)
+
+    def claim_prefetched(self, key: str) -> bool:
+        """True the first time a client call uses an entry the prefetcher stored"""
+        if key not in self._prefetched:
+            return False
+        self._prefetched.discard(key)
+        self.prefetch_hits += 1
+        return True
+
+    def _store(self, key: str, expires_at: float, size: int, value: Any):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, size, value)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+        self._prefetched.discard(key)
+
+    def clear(self):
+        """Drop every in-memory entry"""
+        self._entries.clear()
+        self._prefetched.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_hit_ratio": self.prefetch_hits / self.prefetched if self.prefetched else 0.0,
+        }
@@ -0,0 +1,128 @@
+"""
+Keyword clustering
+Groups near-duplicate keywords by token overlap in a single pass. A prefix- and
+position-filtered inverted index means a keyword is only compared with cluster
+leaders that could still reach the threshold, so tens of thousands of keywords
+cluster in about a second.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# Words dropped before comparing keywords, unless nothing else is left
+STOPWORDS = frozenset({"a", "an", "the", "for", "of", "in", "on", "to", "and", "with"})
+
+# Keeps ceil() from rounding 0.6 * 5 up to 4 on float error, which would make prefixes too short
+_EPSILON = 1e-9
+
+
+def _singular(token: str) -> str:
+    """Crude plural folding, so 'shoes' and 'shoe' compare equal"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def normalize(keyword: str) -> List[str]:
+    """Lower-cased, plural-folded word tokens of a keyword in their original order"""
+    return [_singular(token) for token in _TOKEN.findall(keyword.casefold())]
+
+
+def token_set(tokens: List[str]) -> FrozenSet[str]:
+    """Tokens a keyword is compared on: its words without stopwords"""
+    content = frozenset(token for token in tokens if token not in STOPWORDS)
+    return content or frozenset(tokens)
+
+
+def _prefix_length(size: int, threshold: float) -> int:
+    return size - math.ceil(threshold * size - _EPSILON) + 1
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared) if shared else 0.0
+
+
+def cluster_keywords(keywords: Sequence[str], volumes: Optional[Sequence[Optional[int]]] = None,
+                     threshold: float = 0.6) -> List[List[int]]:
+    """
+    Group keywords whose token sets have a Jaccard similarity of at least threshold
+
+    Keywords are taken in order of volume (unknown last), then fewest tokens, and
+    each joins the most similar existing cluster leader or leads a new cluster, so
+    the leader is the highest volume, shortest form and clusters cannot chain.
+    Keywords differing only in case, spacing, punctuation or plurals ("running
+    shoes", "runningshoe") always share a cluster.
+
+    Candidate leaders come from an inverted index over the rarest tokens of each
+    leader (prefix filtering: sets with Jaccard similarity t share a token among
+    the first |x| - ceil(t|x|) + 1 of each) keyed by the token's position and the
+    leader's size, so buckets whose remaining tokens cannot make up the overlap
+    t / (1 + t) * (|x| + |y|) are never read (positional filtering, as in PPJoin).
+
+    Args:
+        keywords: Keywords to cluster, expected to be distinct
+        volumes: Search volume per keyword, None where unknown
+        threshold: Minimum Jaccard similarity between a keyword and its cluster leader
+
+    Returns:
+        Clusters as lists of indexes into keywords, leader first
+    """
+    tokens = [normalize(keyword) for keyword in keywords]
+    sets = [token_set(keyword_tokens) for keyword_tokens in tokens]
+    frequency = Counter(token for keyword_set in sets for token in keyword_set)
+
+    def rarity(token: str):
+        return frequency[token], token
+
+    def volume(index: int) -> int:
+        value = volumes[index] if volumes is not None else None
+        return value if value is not None else -1
+
+    order = sorted(range(len(keywords)), key=lambda index: (-volume(index), len(sets[index]), len(keywords[index]), index))
+    clusters: List[List[int]] = []
+    leaders: List[FrozenSet[str]] = []
+    # (token, its position in the leader's rarest-first order, leader size) -> clusters
+    index: Dict[Tuple[str, int, int], List[int]] = {}
+    # spacing-free form -> cluster, so "running shoes" and "runningshoes" always meet
+    by_compact: Dict[str, int] = {}
+
+    for position in order:
+        keyword_set = sets[position]
+        compact = "".join(tokens[position])
+        cluster = by_compact.get(compact)
+        if cluster is None:
+            ranked = sorted(keyword_set, key=rarity)
+            size = len(ranked)
+            best_similarity = threshold - _EPSILON
+            seen: Set[int] = set()
+            for position_here, token in enumerate(ranked[:_prefix_length(size, threshold)]):
+                for other_size in range(math.ceil(threshold * size - _EPSILON), int(size / threshold + _EPSILON) + 1):
+                    required = math.ceil(threshold / (1 + threshold) * (size + other_size) - _EPSILON)
+                    for position_there in range(_prefix_length(other_size, threshold)):
+                        # Tokens after this one in either set are all that is left to overlap
+                        if 1 + min(size - position_here - 1, other_size - position_there - 1) < required:
+                            break
+                        for candidate in index.get((token, position_there, other_size), ()):
+                            if candidate in seen:
+                                continue
+                            seen.add(candidate)
+                            similarity = jaccard(keyword_set, leaders[candidate])
+                            # Ties go to the older cluster, whatever order the buckets are read in
+                            if similarity > best_similarity or (similarity == best_similarity and candidate < cluster):
+                                cluster, best_similarity = candidate, similarity
+            if cluster is None:
+                cluster = len(clusters)
+                clusters.append([])
+                leaders.append(keyword_set)
+                for position_here, token in enumerate(ranked[:_prefix_length(size, threshold)]):
+                    index.setdefault((token, position_here, size), []).append(cluster)
+            by_compact.setdefault(compact, cluster)
+        clusters[cluster].append(position)
+    return clusters
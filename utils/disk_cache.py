@@ -0,0 +1,110 @@
+"""
+Persistent response cache
+SQLite-backed store of compressed upstream responses shared across server processes
+"""
+
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from utils.serialization import dumps_bytes, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+"""
+
+
+class DiskCache:
+    """Compressed response store in a SQLite database
+
+    WAL journaling lets several server processes read while one writes; writers
+    wait up to busy_timeout seconds for the lock instead of failing.
+    """
+
+    def __init__(self, directory: str, filename: str = "responses.sqlite3", busy_timeout: float = 5.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        """Return (value, expires_at, size) for a fresh entry, or None"""
+        row = self._conn.execute(
+            "SELECT body, expires_at, size FROM responses WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        body, expires_at, size = row
+        return loads(zlib.decompress(body)), expires_at, size
+
+    def set(self, key: str, endpoint: str, value: Any, ttl: float, raw: Optional[bytes] = None):
+        """Store a response for ttl seconds; raw is the upstream body when already encoded"""
+        if raw is None:
+            raw = dumps_bytes(value)
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, endpoint, created_at, expires_at, size, body) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, endpoint, now, now + ttl, len(raw), zlib.compress(raw)),
+        )
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Delete expired entries, then the oldest ones until under max_bytes; returns rows removed"""
+        removed = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+        if max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+            if total > max_bytes:
+                doomed = []
+                for key, stored in self._conn.execute("SELECT key, LENGTH(body) FROM responses ORDER BY created_at"):
+                    if total <= max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= stored
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+                removed += len(doomed)
+        return removed
+
+    def entries(self, endpoint: Optional[str] = None, limit: int = 50) -> Iterator[Dict[str, Any]]:
+        """Yield entry metadata, newest first"""
+        query = "SELECT key, endpoint, created_at, expires_at, size, LENGTH(body) FROM responses"
+        params: Tuple[Any, ...] = ()
+        if endpoint:
+            query += " WHERE endpoint = ?"
+            params = (endpoint,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        for key, entry_endpoint, created_at, expires_at, size, stored in self._conn.execute(query, params + (limit,)):
+            yield {
+                "key": key,
+                "endpoint": entry_endpoint,
+                "created_at": created_at,
+                "expires_at": expires_at,
+                "size": size,
+                "stored_size": stored,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry counts and sizes per endpoint"""
+        now = time.time()
+        endpoints = {}
+        for endpoint, count, expired, size, stored in self._conn.execute(
+            "SELECT endpoint, COUNT(*), SUM(expires_at <= ?), SUM(size), SUM(LENGTH(body)) FROM responses GROUP BY endpoint",
+            (now,),
+        ):
+            endpoints[endpoint] = {"entries": count, "expired": expired, "bytes": size, "stored_bytes": stored}
+        return {"path": self.path, "endpoints": endpoints}
+
+    def close(self):
+        """Close the database connection"""
+        self._conn.close()
@@ -0,0 +1,56 @@
+"""
+Upstream API error types
+Classifies failures so callers can tell retryable errors from permanent ones
+"""
+
+from typing import Optional
+
+
+class ApiError(Exception):
+    """Base class for failed kwrds.ai API requests"""
+
+    retryable = False
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitedError(ApiError):
+    """The API rejected the request with 429 Too Many Requests"""
+
+    retryable = True
+
+
+class TransientError(ApiError):
+    """Server error, timeout or connection failure that may succeed on retry"""
+
+    retryable = True
+
+
+class AuthError(ApiError):
+    """The API key was missing, invalid or not allowed to use the endpoint"""
+
+
+class ClientError(ApiError):
+    """The request itself was rejected, e.g. bad parameters"""
+
+
+class QuotaExceededError(ApiError):
+    """The local quota governor refused the call to protect the remaining credit balance"""
+
+
+class CircuitOpenError(ApiError):
+    """The upstream host is failing and requests are short-circuited until it recovers"""
+
+
+def classify_status(status_code: int, message: str, retry_after: Optional[float] = None) -> ApiError:
+    """Build the ApiError subclass matching an HTTP status code"""
+    if status_code == 429:
+        return RateLimitedError(message, status_code, retry_after)
+    if status_code in (401, 403):
+        return AuthError(message, status_code)
+    if status_code in (408, 425) or status_code >= 500:
+        return TransientError(message, status_code, retry_after)
+    return ClientError(message, status_code)
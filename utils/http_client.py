@@ -2,34 +2,276 @@
 HTTP client utility for making API requests
 """
 
-import requests
+import asyncio
+import ssl
+import time
+import httpx
 from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from utils.cache import ResponseCache, make_cache_key
+from utils.errors import ApiError, TransientError, classify_status
+from utils.keyword_store import KeywordStore
+from utils.metrics import Metrics, span
+from utils.prefetch import prefetching
+from utils.quota import QuotaGovernor
+from utils.rate_limit import RateLimiter, current_priority
+from utils.resilience import CircuitBreaker, RetryPolicy, parse_retry_after, timeout_for
+from utils.serialization import loads
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _Flight:
+    """An upstream request shared by every caller waiting for the same response"""
+
+    def __init__(self, task: "asyncio.Task[Dict[str, Any]]", prefetch: bool):
+        self.task = task
+        self.prefetch = prefetch
+        self.waiters = 0
+
+
+class HttpClient:
+    """Shared async HTTP client keeping a bounded keep-alive connection pool per upstream host
+
+    Pools are opened on the first request to each host rather than at construction:
+    creating one imports httpcore and loads the CA bundle, which would otherwise sit
+    on the server's startup path. Every pool shares one SSL context.
+    """
+
+    def __init__(self, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, timeout: float = 30.0, http2: Optional[bool] = None,
+                 cache: Optional[ResponseCache] = None, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_failure_threshold: int = 5, circuit_reset_timeout: float = 30.0,
+                 rate_limiter: Optional[RateLimiter] = None, quota: Optional[QuotaGovernor] = None,
+                 metrics: Optional[Metrics] = None, keyword_store: Optional[KeywordStore] = None):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2 and HTTP2_AVAILABLE
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_timeout = circuit_reset_timeout
+        self.rate_limiter = rate_limiter
+        self.quota = quota
+        self.metrics = metrics
+        self.keyword_store = keyword_store
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        # request key -> shared upstream call for identical concurrent requests
+        self._in_flight: Dict[str, _Flight] = {}
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the URL's origin, creating it on first use"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None:
+            if self._ssl_context is None:
+                self._ssl_context = httpx.create_ssl_context()
+            client = httpx.AsyncClient(
+                base_url=origin,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                verify=self._ssl_context,
+            )
+            self._clients[origin] = client
+        return client
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker for the URL's host"""
+        host = urlsplit(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, self.circuit_failure_threshold, self.circuit_reset_timeout)
+            self._breakers[host] = breaker
+        return breaker
+
+    async def make_api_request(self, url: str, headers: Dict[str, str], data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, method: str = "POST") -> Dict[str, Any]:
+        """Make HTTP API requests with proper error handling over a pooled connection
+
+        Identical requests already in flight share one upstream call instead of sending another.
+        When every caller waiting on it is cancelled, the upstream request is aborted.
+        Failures raise an ApiError subclass; rate limits and transient errors are retried first.
+        """
+        endpoint = urlsplit(url).path
+        try:
+            with span("kwrds.api_request", endpoint=endpoint, method=method.upper()) as current_span:
+                # Convert any non-string values in data to strings to avoid header issues
+                if data:
+                    data = convert_params_to_strings(data)
+                if params:
+                    params = convert_params_to_strings(params)
+
+                key = make_cache_key(headers.get("X-API-KEY", ""), method, url, params if method.upper() == 'GET' else data)
+                ttl = self.cache.ttl_for(url) if self.cache is not None else 0
+                prefetch = prefetching.get() is not None
+                if ttl > 0:
+                    cached = self.cache.get(key)
+                    if self.metrics is not None:
+                        self.metrics.record_cache(endpoint, cached is not None)
+                    if cached is not None:
+                        current_span.set_attribute("cache_hit", True)
+                        if not prefetch:
+                            self._claim_prefetched(key, endpoint)
+                        return cached
+
+                flight = self._in_flight.get(key)
+                if flight is not None:
+                    self.coalesced += 1
+                    if self.metrics is not None:
+                        self.metrics.record_coalesced(endpoint)
+                    current_span.set_attribute("coalesced", True)
+                    result = await self._join(key, flight)
+                    if flight.prefetch and not prefetch:
+                        # A client call caught up with its prefetch before it finished
+                        self._claim_prefetched(key, endpoint)
+                    return result
+
+                flight = _Flight(asyncio.ensure_future(self._send(url, headers, data, params, method, key, ttl)), prefetch)
+                self._in_flight[key] = flight
+                flight.task.add_done_callback(lambda _: self._forget(key, flight))
+                return await self._join(key, flight)
+
+        except ApiError:
+            raise
+        except httpx.HTTPError as e:
+            raise Exception(f"Request failed: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error making API request: {str(e)}")
+
+    async def _join(self, key: str, flight: _Flight) -> Dict[str, Any]:
+        """Wait for a shared request; the last waiter to be cancelled aborts it"""
+        flight.waiters += 1
+        try:
+            # Shielded so one caller's cancellation does not fail the others
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Nobody is left to read the response: free the connection and rate slot now.
+                # Later identical requests start afresh rather than joining the aborted one.
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _claim_prefetched(self, key: str, endpoint: str):
+        if self.cache is not None and self.cache.claim_prefetched(key) and self.metrics is not None:
+            self.metrics.record_prefetch_hit(endpoint)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    async def _send(self, url: str, headers: Dict[str, str], data: Optional[Dict[str, Any]], params: Optional[Dict[str, Any]],
+                    method: str, key: str, ttl: float) -> Dict[str, Any]:
+        """Send a request upstream with retries and cache a successful response"""
+        client = self._client_for(url)
+        breaker = self._breaker_for(url)
+        timeout = timeout_for(url)
+        endpoint = urlsplit(url).path
+        api_key = headers.get("X-API-KEY", "")
+        priority = current_priority.get()
+        if self.quota is not None:
+            await self.quota.admit(api_key, url, priority)
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                waited = await self.rate_limiter.acquire(api_key, priority)
+                if self.metrics is not None:
+                    self.metrics.record_queue_wait(waited)
+            breaker.before_request()
+            start = time.perf_counter()
+            try:
+                if method.upper() == 'GET':
+                    response = await client.get(url, headers=headers, params=params, timeout=timeout)
+                else:
+                    response = await client.post(url, headers=headers, json=data, timeout=timeout)
+            except asyncio.CancelledError:
+                # httpx drops the half-used connection, returning its slot to the pool
+                breaker.abandon()
+                self.cancelled += 1
+                if self.metrics is not None:
+                    self.metrics.record_request(endpoint, "cancelled", time.perf_counter() - start)
+                raise
+            except httpx.TransportError as e:
+                error: ApiError = TransientError(f"Request failed: {e.__class__.__name__}: {str(e)}")
+                if self.metrics is not None:
+                    status = "timeout" if isinstance(e, httpx.TimeoutException) else "transport_error"
+                    self.metrics.record_request(endpoint, status, time.perf_counter() - start)
+            else:
+                if self.metrics is not None:
+                    self.metrics.record_request(endpoint, str(response.status_code), time.perf_counter() - start,
+                                                len(response.request.content), len(response.content))
+                if response.status_code == 200:
+                    breaker.record_success()
+                    if self.quota is not None:
+                        self.quota.record(api_key, url)
+                    result = loads(response.content)
+                    if self.keyword_store is not None:
+                        # Recorded here rather than in the handlers so cache hits do not pass as fresh rows
+                        self.keyword_store.record(api_key, endpoint, params if method.upper() == 'GET' else data, result)
+                    spend = prefetching.get()
+                    if spend is not None:
+                        spend.requests += 1
+                        if self.metrics is not None:
+                            self.metrics.record_prefetch(endpoint)
+                    if ttl > 0:
+                        self.cache.set(key, result, ttl, len(response.content), endpoint, response.content,
+                                       prefetched=spend is not None)
+                    return result
+                error = classify_status(
+                    response.status_code,
+                    f"API request failed with status {response.status_code}: {response.text}",
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+            # Only server-side trouble counts against the host; 4xx answers prove it is up.
+            # A request counts once, when its retries are spent, so one bad call cannot trip
+            # the host for every tool; a failed half-open probe re-opens it straight away.
+            giving_up = not error.retryable or attempt >= self.retry_policy.max_attempts
+            if not isinstance(error, TransientError):
+                breaker.record_success()
+            elif giving_up or breaker.probing:
+                breaker.record_failure()
+                raise error
+            if giving_up:
+                raise error
+            self.retries += 1
+            if self.metrics is not None:
+                self.metrics.record_retry(endpoint)
+            await asyncio.sleep(self.retry_policy.delay(attempt, error.retry_after))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request coalescing, cancellation, retry and circuit breaker counters"""
+        return {
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "retries": self.retries,
+            "circuits": {host: breaker.state for host, breaker in self._breakers.items()},
+        }
+
+    async def aclose(self):
+        """Close every pooled connection"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
 
-def make_api_request(url: str, headers: Dict[str, str], data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, method: str = "POST") -> Dict[str, Any]:
-    """Make HTTP API requests with proper error handling"""
-    try:
-        # Convert any non-string values in data to strings to avoid header issues
-        if data:
-            data = convert_params_to_strings(data)
-        if params:
-            params = convert_params_to_strings(params)
-            
-        if method.upper() == 'GET':
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-        else:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result
-        else:
-            error_text = response.text
-            raise Exception(f"API request failed with status {response.status_code}: {error_text}")
-            
-    except requests.RequestException as e:
-        raise Exception(f"Request failed: {str(e)}")
-    except Exception as e:
-        raise Exception(f"Error making API request: {str(e)}")
 
 def convert_params_to_strings(params: Dict[str, Any]) -> Dict[str, Any]:
     """Convert all parameter values to strings to avoid header type issues"""
@@ -0,0 +1,444 @@
+"""
+Local keyword store
+Columnar table of the keyword metrics seen in upstream responses, indexed by token
+and token prefix, so volumes and related terms can be looked up without API calls
+"""
+
+import bisect
+import contextlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from utils.cache import key_partition
+from utils.response_utils import extract_records, pick_field
+
+# Endpoints whose responses are keyword rows; all but /search-volume answer a seed term
+KEYWORD_ENDPOINTS = frozenset({"/keywords", "/keywords-with-volumes", "/related-keywords", "/lsi", "/search-volume"})
+
+# Rows not refreshed for this long are dropped from the persistent store when it is opened
+MAX_ROW_AGE = 90 * 24 * 3600
+
+COLUMNS = ["keyword", "volume", "cpc", "competition", "fetched_at"]
+
+_TOKEN = re.compile(r"\w+")
+
+# (keyword, volume, cpc, competition) with -1 / nan for unknown values
+Row = Tuple[str, int, float, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of a keyword or query"""
+    return _TOKEN.findall(text.casefold())
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _volume(value: Any) -> int:
+    number = _number(value)
+    return int(number) if number >= 0 else -1
+
+
+class _Table:
+    """Rows of one API key and country held in parallel arrays indexed by row id"""
+
+    def __init__(self):
+        self.keywords: List[str] = []
+        self.volume = array("q")
+        self.cpc = array("d")
+        self.competition = array("d")
+        self.fetched_at = array("d")
+        self._rows: Dict[str, int] = {}
+        # token -> ids of the rows containing it, ascending
+        self._postings: Dict[str, "array[int]"] = {}
+        # Sorted tokens for prefix lookups, rebuilt after new tokens arrive
+        self._sorted_tokens: Optional[List[str]] = None
+        # casefolded seed term -> ids of the rows upstream returned for it
+        self._seeds: Dict[str, Set[int]] = {}
+        # Backend write version this table has caught up with
+        self.synced_version = 0
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find(self, keyword: str) -> Optional[int]:
+        return self._rows.get(keyword.strip().casefold())
+
+    def upsert(self, row: Row, fetched_at: float, allow_new: bool = True) -> Optional[int]:
+        """Insert or refresh a row and return its id; None when it is new and allow_new is False"""
+        keyword, volume, cpc, competition = row
+        row_id = self.find(keyword)
+        if row_id is None:
+            if not allow_new:
+                return None
+            row_id = len(self.keywords)
+            self._rows[keyword.casefold()] = row_id
+            self.keywords.append(keyword)
+            self.volume.append(volume)
+            self.cpc.append(cpc)
+            self.competition.append(competition)
+            self.fetched_at.append(fetched_at)
+            for token in set(tokenize(keyword)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    self._postings[token] = array("I", (row_id,))
+                    self._sorted_tokens = None
+                else:
+                    postings.append(row_id)
+        # Rows without a volume (related terms, LSI) never overwrite measured ones
+        elif fetched_at >= self.fetched_at[row_id] and (volume >= 0 or self.volume[row_id] < 0):
+            self.keywords[row_id] = keyword
+            self.volume[row_id] = volume
+            self.cpc[row_id] = cpc
+            self.competition[row_id] = competition
+            self.fetched_at[row_id] = fetched_at
+        return row_id
+
+    def relate(self, seed: str, row_ids: Iterable[int]):
+        self._seeds.setdefault(seed.strip().casefold(), set()).update(row_ids)
+
+    def related(self, seed: str) -> Set[int]:
+        return set(self._seeds.get(seed.strip().casefold(), ()))
+
+    def _prefixed(self, prefix: str) -> Iterator[str]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        tokens = self._sorted_tokens
+        index = bisect.bisect_left(tokens, prefix)
+        while index < len(tokens) and tokens[index].startswith(prefix):
+            yield tokens[index]
+            index += 1
+
+    def matching(self, tokens: List[str], prefix: bool) -> Set[int]:
+        """Ids of rows containing every token, or a token starting with each one when prefix is set"""
+        matched: Optional[Set[int]] = None
+        for token in tokens:
+            rows: Set[int] = set()
+            for indexed in (self._prefixed(token) if prefix else (token,)):
+                rows.update(self._postings.get(indexed, ()))
+            matched = rows if matched is None else matched & rows
+            if not matched:
+                return set()
+        return matched or set()
+
+    def render(self, row_id: int) -> List[Any]:
+        volume, cpc, competition = self.volume[row_id], self.cpc[row_id], self.competition[row_id]
+        return [
+            self.keywords[row_id],
+            volume if volume >= 0 else None,
+            None if math.isnan(cpc) else cpc,
+            None if math.isnan(competition) else competition,
+            time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.fetched_at[row_id])),
+        ]
+
+
+class KeywordStore:
+    """Keyword metrics kept from upstream responses, one columnar table per API key and country
+
+    Numeric columns live in typed arrays, so a row costs its keyword string plus a
+    few dozen bytes. Every row records when its metrics were fetched; rows seen
+    without a volume keep an earlier measured one. Past max_rows new keywords are
+    not stored while known ones are still refreshed. With a backend, tables are
+    loaded on first use, every recorded row is written through, and rows other
+    processes wrote since are read in before a table is used again.
+    """
+
+    def __init__(self, max_rows: int = 500_000, backend: Optional["KeywordDatabase"] = None):
+        self.max_rows = max_rows
+        self.backend = backend
+        self._tables: Dict[Tuple[str, str], _Table] = {}
+        self.total_rows = 0
+        self.recorded = 0
+        self.dropped = 0
+        self.searches = 0
+
+    @staticmethod
+    def _partition(api_key: str) -> str:
+        return key_partition(api_key)
+
+    def _table(self, partition: str, country: str) -> _Table:
+        table = self._tables.get((partition, country))
+        if table is None:
+            table = _Table()
+            self._tables[(partition, country)] = table
+            if self.backend is not None:
+                self._sync(table, partition, country, None)
+        elif self.backend is not None and self.backend.version(partition, country) != table.synced_version:
+            self._sync(table, partition, country, table.synced_version)
+        return table
+
+    def _sync(self, table: _Table, partition: str, country: str, since: Optional[int]):
+        """Read in the backend rows written after version since, or every row when since is None"""
+        rows, seeds, version = self.backend.load(partition, country, since)
+        for row, fetched_at in rows:
+            self._upsert(table, row, fetched_at)
+        for seed, keywords in seeds.items():
+            table.relate(seed, (row_id for row_id in map(table.find, keywords) if row_id is not None))
+        table.synced_version = version
+
+    def _upsert(self, table: _Table, row: Row, fetched_at: float) -> Optional[int]:
+        size = len(table)
+        row_id = table.upsert(row, fetched_at, allow_new=self.total_rows < self.max_rows)
+        if row_id is None:
+            self.dropped += 1
+        self.total_rows += len(table) - size
+        return row_id
+
+    def record(self, api_key: str, endpoint: str, payload: Optional[Dict[str, Any]], response: Any,
+               fetched_at: Optional[float] = None) -> int:
+        """Store the keyword rows of an upstream response and return how many were kept"""
+        if endpoint not in KEYWORD_ENDPOINTS or not payload:
+            return 0
+        country = str(payload.get("search_country") or "").strip().casefold()
+        if not country:
+            return 0
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        partition = self._partition(api_key)
+        table = self._table(partition, country)
+        rows: List[Row] = []
+        row_ids: List[int] = []
+        for record in extract_records(response):
+            keyword = pick_field(record, "keyword")
+            if not isinstance(keyword, str) or not keyword.strip():
+                continue
+            row = (keyword.strip(), _volume(pick_field(record, "volume")),
+                   _number(pick_field(record, "cpc")), _number(pick_field(record, "competition")))
+            row_id = self._upsert(table, row, fetched_at)
+            if row_id is not None:
+                rows.append(row)
+                row_ids.append(row_id)
+        seed = payload.get("search_question") if endpoint != "/search-volume" else None
+        if seed and row_ids:
+            table.relate(str(seed), row_ids)
+        if self.backend is not None and rows:
+            version = self.backend.write(partition, country, rows, fetched_at, str(seed) if seed else None)
+            # Nobody else wrote in between, so there is nothing new to read back
+            if version == table.synced_version + 1:
+                table.synced_version = version
+        self.recorded += len(rows)
+        return len(rows)
+
+    def search(self, api_key: str, country: str, query: Optional[str] = None, keywords: Optional[List[str]] = None,
+               related_to: Optional[str] = None, prefix: bool = True, max_age: Optional[float] = None,
+               min_volume: Optional[int] = None, limit: int = 10) -> Dict[str, Any]:
+        """Look up stored rows by exact keywords, or by query tokens and/or the seed they were returned for
+
+        Exact lookups keep the requested order and list keywords with no fresh row
+        under missing_keywords; other searches return the highest volumes first.
+        """
+        if not keywords and not query and not related_to:
+            raise ValueError("Provide keywords, query or related_to")
+        self.searches += 1
+        table = self._table(self._partition(api_key), country.strip().casefold())
+        oldest = time.time() - max_age if max_age is not None else None
+
+        def wanted(row_id: int) -> bool:
+            return ((oldest is None or table.fetched_at[row_id] >= oldest)
+                    and (min_volume is None or table.volume[row_id] >= min_volume))
+
+        missing: List[Any] = []
+        if keywords:
+            found = []
+            for keyword in keywords:
+                row_id = table.find(str(keyword))
+                if row_id is not None and wanted(row_id):
+                    found.append(row_id)
+                else:
+                    missing.append(keyword)
+            matched = found
+            selected = found[:limit]
+        else:
+            candidates: Optional[Set[int]] = None
+            if query:
+                candidates = table.matching(tokenize(query), prefix)
+            if related_to:
+                related = table.related(related_to)
+                candidates = related if candidates is None else candidates & related
+            matched = [row_id for row_id in candidates or () if wanted(row_id)]
+            selected = heapq.nlargest(limit, matched, key=table.volume.__getitem__)
+        result: Dict[str, Any] = {
+            "columns": COLUMNS,
+            "rows": [table.render(row_id) for row_id in selected],
+            "match_count": len(matched),
+            "returned_count": len(selected),
+            "stored_count": len(table),
+        }
+        if missing:
+            result["missing_keywords"] = missing
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return row counts and how many rows were recorded, refused and searched"""
+        return {
+            "tables": len(self._tables),
+            "rows": self.total_rows,
+            "max_rows": self.max_rows,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "searches": self.searches,
+        }
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keywords (
+    partition TEXT NOT NULL,
+    country TEXT NOT NULL,
+    keyword_key TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    volume INTEGER,
+    cpc REAL,
+    competition REAL,
+    fetched_at REAL NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (partition, country, keyword_key)
+);
+CREATE INDEX IF NOT EXISTS keywords_fetched_at ON keywords (fetched_at);
+CREATE TABLE IF NOT EXISTS keyword_seeds (
+    partition TEXT NOT NULL,
+    country TEXT NOT NULL,
+    seed TEXT NOT NULL,
+    keyword_key TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (partition, country, seed, keyword_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS keyword_tables (
+    partition TEXT NOT NULL,
+    country TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (partition, country)
+) WITHOUT ROWID;
+"""
+
+# Created after databases from before seq existed have gained the column
+SEQ_INDEXES = """
+CREATE INDEX IF NOT EXISTS keywords_seq ON keywords (partition, country, seq);
+CREATE INDEX IF NOT EXISTS keyword_seeds_seq ON keyword_seeds (partition, country, seq);
+"""
+
+# Same refresh rule as _Table.upsert: newer rows win unless they would drop a measured volume
+UPSERT = """
+INSERT INTO keywords (partition, country, keyword_key, keyword, volume, cpc, competition, fetched_at, seq)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (partition, country, keyword_key) DO UPDATE SET
+    keyword = excluded.keyword, volume = excluded.volume, cpc = excluded.cpc,
+    competition = excluded.competition, fetched_at = excluded.fetched_at, seq = excluded.seq
+WHERE excluded.fetched_at >= keywords.fetched_at AND (excluded.volume IS NOT NULL OR keywords.volume IS NULL)
+"""
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+@contextlib.contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run the block as one transaction: committed if it completes, rolled back if it raises"""
+    conn.execute("BEGIN")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class KeywordDatabase:
+    """SQLite copy of the keyword store, so rows survive restarts and are shared by server processes
+
+    Each write bumps a version per API key and country and stamps the rows it
+    touches with it, so a process can read in just what others wrote since it
+    last looked. Rows pruned at open stay in processes that loaded them earlier.
+    """
+
+    def __init__(self, directory: str, filename: str = "keywords.sqlite3", busy_timeout: float = 5.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        for table in ("keywords", "keyword_seeds"):
+            if "seq" not in {column[1] for column in self._conn.execute(f"PRAGMA table_info({table})")}:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self._conn.executescript(SEQ_INDEXES)
+        with _transaction(self._conn):
+            self._conn.execute("DELETE FROM keywords WHERE fetched_at < ?", (time.time() - MAX_ROW_AGE,))
+            # Seed links to pruned rows would otherwise pile up forever
+            self._conn.execute(
+                "DELETE FROM keyword_seeds WHERE NOT EXISTS (SELECT 1 FROM keywords WHERE keywords.partition = "
+                "keyword_seeds.partition AND keywords.country = keyword_seeds.country "
+                "AND keywords.keyword_key = keyword_seeds.keyword_key)"
+            )
+
+    def version(self, partition: str, country: str) -> int:
+        """Return how many writes one table has had"""
+        row = self._conn.execute(
+            "SELECT version FROM keyword_tables WHERE partition = ? AND country = ?", (partition, country)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def load(self, partition: str, country: str, since: Optional[int] = None
+             ) -> Tuple[List[Tuple[Row, float]], Dict[str, List[str]], int]:
+        """Return ((row, fetched_at) pairs, seed -> keywords, version) of one table
+
+        With since, only rows and seed links written after that version are returned.
+        """
+        after = -1 if since is None else since
+        # One read transaction, so the version matches the rows returned with it
+        with _transaction(self._conn):
+            version = self.version(partition, country)
+            rows = [
+                ((keyword, -1 if volume is None else volume, math.nan if cpc is None else cpc,
+                  math.nan if competition is None else competition), fetched_at)
+                for keyword, volume, cpc, competition, fetched_at in self._conn.execute(
+                    "SELECT keyword, volume, cpc, competition, fetched_at FROM keywords "
+                    "WHERE partition = ? AND country = ? AND seq > ?",
+                    (partition, country, after),
+                )
+            ]
+            seeds: Dict[str, List[str]] = {}
+            for seed, keyword_key in self._conn.execute(
+                "SELECT seed, keyword_key FROM keyword_seeds WHERE partition = ? AND country = ? AND seq > ?",
+                (partition, country, after),
+            ):
+                seeds.setdefault(seed, []).append(keyword_key)
+        return rows, seeds, version
+
+    def write(self, partition: str, country: str, rows: List[Row], fetched_at: float, seed: Optional[str] = None) -> int:
+        """Upsert the rows of one response, relate them to the seed term they were returned for and return the new version"""
+        with _transaction(self._conn):
+            # Writing first takes the write lock, so versions are handed out one writer at a time
+            self._conn.execute(
+                "INSERT INTO keyword_tables (partition, country, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (partition, country) DO UPDATE SET version = version + 1",
+                (partition, country),
+            )
+            version = self.version(partition, country)
+            self._conn.executemany(UPSERT, [
+                (partition, country, keyword.casefold(), keyword, volume if volume >= 0 else None,
+                 _nullable(cpc), _nullable(competition), fetched_at, version)
+                for keyword, volume, cpc, competition in rows
+            ])
+            if seed:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO keyword_seeds (partition, country, seed, keyword_key, seq) VALUES (?, ?, ?, ?, ?)",
+                    [(partition, country, seed.strip().casefold(), row[0].casefold(), version) for row in rows],
+                )
+        return version
+
+    def close(self):
+        self._conn.close()
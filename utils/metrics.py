@@ -0,0 +1,376 @@
+"""
+Metrics and tracing
+Latency histograms and counters for tool calls and upstream requests, exported as Prometheus text or JSON
+"""
+
+import asyncio
+import bisect
+import contextlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Resolved on the first span so importing opentelemetry stays off the startup path
+_tracer: Any = None
+_tracer_resolved = False
+
+# Upper bounds in seconds; fine enough below 100ms to read p50 off a warm cache or a nearby API
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+                   1.0, 2.5, 5.0, 7.5, 10.0, 30.0, 60.0)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _label(value: Any) -> str:
+    """Escape a Prometheus label value: backslash, double quote and line feed"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Fixed-bucket histogram with bucket-interpolated quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile, assuming values are spread evenly within a bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"count": self.count, "mean": round(self.sum / self.count, 6) if self.count else None}
+        for q in QUANTILES:
+            value = self.quantile(q)
+            result[f"p{int(q * 100)}"] = None if value is None else round(value, 6)
+        return result
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+
+class _ToolMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.outcomes: Dict[str, int] = {}
+
+
+class _LaneMetrics:
+    def __init__(self):
+        self.wait = Histogram()
+        self.queued = 0
+        self.active = 0
+
+
+class Metrics:
+    """In-process metrics for tool calls and upstream requests
+
+    Upstream latency is measured per attempt, so retries show up as separate
+    observations; tool latency covers the whole call including cache hits.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._tools: Dict[str, _ToolMetrics] = {}
+        self._endpoints: Dict[str, _EndpointMetrics] = {}
+        self.queue_wait = Histogram()
+        self._lanes: Dict[str, _LaneMetrics] = {}
+        self.startup_seconds: Optional[float] = None
+
+    def _tool(self, name: str) -> _ToolMetrics:
+        tool = self._tools.get(name)
+        if tool is None:
+            tool = self._tools[name] = _ToolMetrics()
+        return tool
+
+    def _endpoint(self, endpoint: str) -> _EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics()
+        return metrics
+
+    @contextlib.contextmanager
+    def time_tool(self, name: str) -> Iterator[None]:
+        """Record a tool call's latency and outcome ("ok" or the exception class name)"""
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = e.__class__.__name__
+            raise
+        finally:
+            tool = self._tool(name)
+            tool.latency.observe(time.perf_counter() - start)
+            tool.outcomes[outcome] = tool.outcomes.get(outcome, 0) + 1
+
+    def record_request(self, endpoint: str, status: str, seconds: float, bytes_sent: int = 0, bytes_received: int = 0):
+        """Record one upstream attempt; status is the HTTP code or the failure kind"""
+        metrics = self._endpoint(endpoint)
+        metrics.latency.observe(seconds)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+
+    def record_retry(self, endpoint: str):
+        self._endpoint(endpoint).retries += 1
+
+    def record_cache(self, endpoint: str, hit: bool):
+        metrics = self._endpoint(endpoint)
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+    def record_coalesced(self, endpoint: str):
+        self._endpoint(endpoint).coalesced += 1
+
+    def record_prefetch(self, endpoint: str):
+        self._endpoint(endpoint).prefetched += 1
+
+    def record_prefetch_hit(self, endpoint: str):
+        """Record a client call answered by a response the prefetcher fetched"""
+        self._endpoint(endpoint).prefetch_hits += 1
+
+    def record_queue_wait(self, seconds: float):
+        self.queue_wait.observe(seconds)
+
+    def _lane(self, name: str) -> _LaneMetrics:
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = _LaneMetrics()
+        return lane
+
+    def record_lane_wait(self, lane: str, seconds: float):
+        self._lane(lane).wait.observe(seconds)
+
+    def record_lane_depth(self, lane: str, queued: int, active: int):
+        """Record a scheduling lane's current queue depth and running calls"""
+        metrics = self._lane(lane)
+        metrics.queued = queued
+        metrics.active = active
+
+    def record_startup(self, seconds: float):
+        """Record how long the server took from loading to accepting requests"""
+        self.startup_seconds = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as plain JSON-ready data with p50/p90/p99 estimates"""
+        endpoints = {}
+        for endpoint, metrics in sorted(self._endpoints.items()):
+            lookups = metrics.cache_hits + metrics.cache_misses
+            endpoints[endpoint] = {
+                "latency": metrics.latency.summary(),
+                "statuses": dict(metrics.statuses),
+                "bytes_sent": metrics.bytes_sent,
+                "bytes_received": metrics.bytes_received,
+                "retries": metrics.retries,
+                "cache_hits": metrics.cache_hits,
+                "cache_misses": metrics.cache_misses,
+                "cache_hit_ratio": round(metrics.cache_hits / lookups, 4) if lookups else None,
+                "coalesced": metrics.coalesced,
+                "prefetched": metrics.prefetched,
+                "prefetch_hits": metrics.prefetch_hits,
+                "prefetch_hit_ratio": round(metrics.prefetch_hits / metrics.prefetched, 4) if metrics.prefetched else None,
+            }
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "startup_seconds": None if self.startup_seconds is None else round(self.startup_seconds, 6),
+            "tools": {
+                name: {"latency": tool.latency.summary(), "outcomes": dict(tool.outcomes)}
+                for name, tool in sorted(self._tools.items())
+            },
+            "endpoints": endpoints,
+            "queue_wait": self.queue_wait.summary(),
+            "lanes": {
+                name: {"queued": lane.queued, "active": lane.active, "wait": lane.wait.summary()}
+                for name, lane in sorted(self._lanes.items())
+            },
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, values: Histogram):
+            cumulative = 0
+            for bound, bucket_count in zip(values.buckets, values.counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {values.count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {values.sum}")
+            lines.append(f"{name}_count{suffix} {values.count}")
+
+        if self.startup_seconds is not None:
+            header("kwrds_startup_seconds", "gauge", "Time from loading the server to accepting requests")
+            lines.append(f"kwrds_startup_seconds {self.startup_seconds}")
+
+        header("kwrds_tool_call_duration_seconds", "histogram", "Tool call latency")
+        for name, tool in sorted(self._tools.items()):
+            histogram("kwrds_tool_call_duration_seconds", f'tool="{_label(name)}"', tool.latency)
+        header("kwrds_tool_calls_total", "counter", "Tool calls by outcome")
+        for name, tool in sorted(self._tools.items()):
+            for outcome, count in sorted(tool.outcomes.items()):
+                lines.append(f'kwrds_tool_calls_total{{tool="{_label(name)}",outcome="{_label(outcome)}"}} {count}')
+
+        endpoints = sorted(self._endpoints.items())
+        header("kwrds_upstream_request_duration_seconds", "histogram", "Upstream request latency per attempt")
+        for endpoint, metrics in endpoints:
+            histogram("kwrds_upstream_request_duration_seconds", f'endpoint="{_label(endpoint)}"', metrics.latency)
+        header("kwrds_upstream_responses_total", "counter", "Upstream attempts by HTTP status or failure kind")
+        for endpoint, metrics in endpoints:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'kwrds_upstream_responses_total{{endpoint="{_label(endpoint)}",status="{_label(status)}"}} {count}')
+        for name, attribute, help_text in (
+            ("kwrds_upstream_bytes_sent_total", "bytes_sent", "Request body bytes sent upstream"),
+            ("kwrds_upstream_bytes_received_total", "bytes_received", "Response body bytes received from upstream"),
+            ("kwrds_upstream_retries_total", "retries", "Upstream attempts that were retried"),
+            ("kwrds_cache_hits_total", "cache_hits", "Requests answered from the response cache"),
+            ("kwrds_cache_misses_total", "cache_misses", "Cacheable requests that missed the response cache"),
+            ("kwrds_requests_coalesced_total", "coalesced", "Requests that joined an identical in-flight request"),
+            ("kwrds_prefetched_total", "prefetched", "Upstream responses fetched speculatively by the prefetcher"),
+            ("kwrds_prefetch_hits_total", "prefetch_hits", "Client calls answered by a prefetched response"),
+        ):
+            header(name, "counter", help_text)
+            for endpoint, metrics in endpoints:
+                lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {getattr(metrics, attribute)}')
+
+        header("kwrds_rate_limit_wait_seconds", "histogram", "Time upstream requests waited for a rate limit token")
+        histogram("kwrds_rate_limit_wait_seconds", "", self.queue_wait)
+
+        lanes = sorted(self._lanes.items())
+        header("kwrds_lane_queue_depth", "gauge", "Tool calls waiting for a slot in each scheduling lane")
+        for name, lane in lanes:
+            lines.append(f'kwrds_lane_queue_depth{{lane="{_label(name)}"}} {lane.queued}')
+        header("kwrds_lane_active", "gauge", "Tool calls running in each scheduling lane")
+        for name, lane in lanes:
+            lines.append(f'kwrds_lane_active{{lane="{_label(name)}"}} {lane.active}')
+        header("kwrds_lane_wait_seconds", "histogram", "Time tool calls waited for a scheduling lane slot")
+        for name, lane in lanes:
+            histogram("kwrds_lane_wait_seconds", f'lane="{_label(name)}"', lane.wait)
+        return "\n".join(lines) + "\n"
+
+
+class _NoSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+def span(name: str, **attributes: Any):
+    """Context manager for an OpenTelemetry span; a no-op when opentelemetry is not installed
+
+    Spans are only exported when the application configures an OpenTelemetry SDK.
+    """
+    global _tracer, _tracer_resolved
+    if not _tracer_resolved:
+        _tracer_resolved = True
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer("kwrds-ai")
+        except ImportError:
+            _tracer = None
+    if _tracer is None:
+        return contextlib.nullcontext(_NoSpan())
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+class MetricsExporter:
+    """Serves Prometheus text over HTTP and/or dumps JSON snapshots to a file periodically"""
+
+    def __init__(self, metrics: Metrics, port: Optional[int] = None, host: str = "127.0.0.1",
+                 path: Optional[str] = None, interval: float = 60.0):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.path = path
+        self.interval = interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dumper: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        if self.path:
+            self._dumper = asyncio.create_task(self._dump_periodically())
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) > 1 else "/"
+            if path == "/metrics":
+                status, content_type, body = "200 OK", "text/plain; version=0.0.4", self.metrics.render_prometheus()
+            elif path == "/metrics.json":
+                status, content_type, body = "200 OK", "application/json", json.dumps(self.metrics.snapshot())
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def dump(self):
+        """Write the current snapshot atomically to the dump file"""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as output:
+            json.dump(self.metrics.snapshot(), output, indent=2)
+        os.replace(temporary, self.path)
+
+    async def _dump_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.dump()
+
+    async def aclose(self):
+        """Stop serving and write a final dump"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._dumper is not None:
+            self._dumper.cancel()
+            self._dumper = None
+            self.dump()
@@ -0,0 +1,182 @@
+"""
+Output rendering for tool results
+Compact JSON or CSV-like tables, optionally filled greedily up to a character budget
+"""
+
+import csv
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.result_store import ResultStore, decode_cursor, encode_cursor
+from utils.serialization import dumps
+
+OUTPUT_FORMATS = ("json", "table")
+
+# Marker fields limit_response_size adds next to a truncated list
+MARKER_SUFFIXES = ("_truncated", "_total_count", "_showing", "_next_cursor")
+
+
+def dumps_compact(value: Any) -> str:
+    """Serialize to JSON without insignificant whitespace"""
+    return dumps(value)
+
+
+def render_result(result: Any, output_format: str = "json", max_chars: Optional[int] = None,
+                  result_store: Optional[ResultStore] = None, api_key: str = "") -> str:
+    """
+    Render a tool result as text
+
+    Args:
+        result: The shaped tool result
+        output_format: "json" for compact JSON, "table" for CSV-like rows of list-of-record fields
+        max_chars: Character budget; list fields are filled row by row until it is reached
+        result_store: Store holding full lists behind next_page cursors, used to fill past the first page
+        api_key: API key the stored lists are scoped to
+
+    Returns:
+        Rendered text
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{output_format}', expected one of: {', '.join(OUTPUT_FORMATS)}")
+    render = render_table if output_format == "table" else dumps_compact
+    if max_chars is not None and isinstance(result, dict):
+        return _fit_to_budget(result, render, int(max_chars), result_store, api_key)
+    return render(result)
+
+
+def render_table(result: Any) -> str:
+    """Render scalar fields as 'key: value' lines and list fields as CSV sections"""
+    if not isinstance(result, dict):
+        return dumps_compact(result)
+    lines: List[str] = []
+    sections: List[str] = []
+    for key, value in result.items():
+        if key == "rows" and isinstance(result.get("columns"), list):
+            sections.append(_csv_section(key, result["columns"], value))
+        elif key == "columns" and isinstance(result.get("rows"), list):
+            continue
+        elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            columns: Dict[str, None] = {}
+            for item in value:
+                columns.update(dict.fromkeys(item))
+            sections.append(_csv_section(key, list(columns), [[item.get(column) for column in columns] for item in value]))
+        elif isinstance(value, list):
+            sections.append("\n".join([f"## {key}"] + [_cell(item) for item in value]))
+        else:
+            lines.append(f"{key}: {_cell(value)}")
+    return "\n\n".join(part for part in ["\n".join(lines)] + sections if part)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps_compact(value)
+    return str(value)
+
+
+def _csv_lines(rows: List[List[Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_cell(cell) for cell in row] for row in rows)
+    return buffer.getvalue().rstrip("\n")
+
+
+def _csv_section(key: str, columns: List[Any], rows: List[Any]) -> str:
+    body = [row if isinstance(row, list) else [row] for row in rows]
+    return f"## {key}\n" + _csv_lines([columns] + body)
+
+
+def _row_cost(render: Callable[[Any], str], item: Any) -> int:
+    if render is dumps_compact:
+        return len(dumps_compact(item)) + 1
+    if isinstance(item, dict):
+        return len(_csv_lines([list(item.values())])) + 1
+    return len(_csv_lines([item if isinstance(item, list) else [item]])) + 1
+
+
+def _fit_to_budget(result: Dict[str, Any], render: Callable[[Any], str], max_chars: int,
+                   result_store: Optional[ResultStore], api_key: str) -> str:
+    # Full contents of every top-level list, pulling rows past the first page from the store
+    full_lists: Dict[str, List[Any]] = {}
+    result_ids: Dict[str, str] = {}
+    # Truncated lists whose rest could not be fetched: key -> (original total, result id of its cursor)
+    unresolved: Dict[str, Tuple[Any, Optional[str]]] = {}
+    for key, value in result.items():
+        if not isinstance(value, list) or (key == "columns" and "rows" in result):
+            continue
+        full_lists[key] = value
+        cursor = result.get(f"{key}_next_cursor")
+        if cursor and result_store is not None:
+            try:
+                result_ids[key], _, full_lists[key] = result_store.resolve(cursor, api_key)
+                continue
+            except ValueError:
+                pass
+        if result.get(f"{key}_truncated"):
+            try:
+                result_id = decode_cursor(cursor)[0] if cursor else None
+            except ValueError:
+                result_id = None
+            unresolved[key] = (result.get(f"{key}_total_count"), result_id)
+    if not full_lists:
+        return render(result)
+
+    def build(counts: Dict[str, int]) -> Dict[str, Any]:
+        shaped = {}
+        for key, value in result.items():
+            if any(key == f"{name}{suffix}" for name in full_lists for suffix in MARKER_SUFFIXES):
+                continue
+            if key not in full_lists:
+                shaped[key] = value
+                continue
+            items = full_lists[key]
+            shown = counts[key]
+            shaped[key] = items[:shown]
+            if key in unresolved:
+                # Only the first page is known, so keep the original totals rather than storing it as the whole list
+                total, result_id = unresolved[key]
+                shaped[f"{key}_truncated"] = True
+                shaped[f"{key}_total_count"] = total
+                shaped[f"{key}_showing"] = shown
+                if result_id is not None:
+                    shaped[f"{key}_next_cursor"] = encode_cursor(result_id, shown)
+            elif shown < len(items):
+                shaped[f"{key}_truncated"] = True
+                shaped[f"{key}_total_count"] = len(items)
+                shaped[f"{key}_showing"] = shown
+                cursor = None
+                if key in result_ids:
+                    cursor = encode_cursor(result_ids[key], shown)
+                elif result_store is not None:
+                    cursor = result_store.put(items, api_key, shown)
+                    if cursor:
+                        result_ids[key], _ = decode_cursor(cursor)
+                if cursor:
+                    shaped[f"{key}_next_cursor"] = cursor
+        return shaped
+
+    # Greedily add rows round-robin across lists while they fit in the budget
+    counts = {key: 0 for key in full_lists}
+    remaining = max_chars - len(render(build(counts)))
+    open_lists = [key for key in full_lists if full_lists[key]]
+    while open_lists and remaining > 0:
+        for key in list(open_lists):
+            items = full_lists[key]
+            cost = _row_cost(render, items[counts[key]])
+            if cost > remaining:
+                open_lists.remove(key)
+                continue
+            remaining -= cost
+            counts[key] += 1
+            if counts[key] == len(items):
+                open_lists.remove(key)
+
+    # Row costs are estimates, so back off until the rendered text really fits
+    text = render(build(counts))
+    while len(text) > max_chars and any(counts.values()):
+        largest = max(counts, key=counts.get)
+        counts[largest] -= 1
+        text = render(build(counts))
+    return text
+
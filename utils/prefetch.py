@@ -0,0 +1,178 @@
+"""
+Speculative prefetch of likely follow-up tool calls
+After keyword and PAA lookups, issues the calls an agent usually makes next at low
+priority so they land in the response cache before they are asked for
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.cache import ResponseCache, key_partition
+from utils.rate_limit import PRIORITIES, current_priority
+from utils.response_utils import extract_records, pick_field
+
+# Keywords whose SERP is prefetched after a keyword lookup, and PAA questions analysed after paa
+SERP_FOLLOW_UPS = 3
+PAA_FOLLOW_UPS = 2
+# Keywords the search_volume follow-up asks for: the first page the agent was shown
+VOLUME_FOLLOW_UP_SIZE = 10
+
+# Endpoint each follow-up tool calls, so follow-ups the cache would not keep are skipped
+FOLLOW_UP_ENDPOINTS = {
+    "search_volume": "/search-volume",
+    "serp": "/serp",
+    "paa_ai": "/paa-ai",
+}
+
+BUDGET_WINDOW = 3600.0
+
+Dispatch = Callable[[str, Dict[str, Any], str], Awaitable[Any]]
+
+
+class PrefetchSpend:
+    """Upstream requests made on behalf of one prefetched call"""
+
+    def __init__(self):
+        self.requests = 0
+
+
+# Set while a prefetched call runs; the HTTP layer marks the responses it caches as prefetched
+prefetching: ContextVar[Optional[PrefetchSpend]] = ContextVar("prefetching", default=None)
+
+
+def _top_values(result: Any, field: str, limit: int) -> List[str]:
+    """The first distinct string values of a field in a result's records, or of its first list of strings"""
+    values: List[str] = []
+    records = extract_records(result)
+    if records:
+        candidates = [pick_field(record, field) for record in records]
+    else:
+        candidates = next((value for value in result.values() if isinstance(value, list)), []) if isinstance(result, dict) else []
+    for value in candidates:
+        if isinstance(value, str) and value.strip() and value not in values:
+            values.append(value)
+            if len(values) == limit:
+                break
+    return values
+
+
+def _keyword_follow_ups(arguments: Dict[str, Any], result: Any, volumes: bool) -> List[Tuple[str, Dict[str, Any]]]:
+    country = arguments["search_country"]
+    keywords = _top_values(result, "keyword", VOLUME_FOLLOW_UP_SIZE)
+    calls = [("serp", {"search_question": keyword, "search_country": country}) for keyword in keywords[:SERP_FOLLOW_UPS]]
+    if volumes and keywords:
+        calls.insert(0, ("search_volume", {"keywords": keywords, "search_country": country}))
+    return calls
+
+
+def _paa_follow_ups(arguments: Dict[str, Any], result: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    locale = f"{arguments['search_language'].lower()}-{arguments['search_country'].upper()}"
+    return [
+        # "detailed" is the prompt the paa_ai handler defaults to
+        ("paa_ai", {"search_question": arguments["keyword"], "search_country": locale,
+                    "question": question, "prompt": "detailed"})
+        for question in _top_values(result, "question", PAA_FOLLOW_UPS)
+    ]
+
+
+# Tool -> the calls an agent usually makes next, built from its arguments and result
+FOLLOW_UPS: Dict[str, Callable[[Dict[str, Any], Any], List[Tuple[str, Dict[str, Any]]]]] = {
+    "keywords": lambda arguments, result: _keyword_follow_ups(arguments, result, volumes=True),
+    "related_keywords": lambda arguments, result: _keyword_follow_ups(arguments, result, volumes=True),
+    "keywords_with_volumes": lambda arguments, result: _keyword_follow_ups(arguments, result, volumes=False),
+    "paa": _paa_follow_ups,
+}
+
+
+class Prefetcher:
+    """Runs follow-up calls in the background at low priority within a credit budget per API key
+
+    Each API key may spend `budget` credits on prefetching per hour. Follow-ups go
+    through the same dispatch as client calls, so they are validated, scheduled in
+    their lane, rate limited and refused first by the quota governor. Follow-ups
+    the response cache would not keep (e.g. paa_ai unless opted in) are skipped.
+    """
+
+    def __init__(self, dispatch: Dispatch, cache: ResponseCache, budget: float):
+        self.dispatch = dispatch
+        self.cache = cache
+        self.budget = budget
+        self._windows: Dict[str, Tuple[float, float]] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.issued = 0
+        self.failed = 0
+        self.over_budget = 0
+        self.spent = 0
+
+    def _remaining(self, api_key: str) -> float:
+        partition = key_partition(api_key)
+        started, spent = self._windows.get(partition, (0.0, 0.0))
+        if time.monotonic() - started >= BUDGET_WINDOW:
+            self._windows[partition] = (time.monotonic(), 0.0)
+            return self.budget
+        return self.budget - spent
+
+    def _charge(self, api_key: str, credits: float):
+        partition = key_partition(api_key)
+        started, spent = self._windows.get(partition, (time.monotonic(), 0.0))
+        self._windows[partition] = (started, spent + credits)
+        self.spent += credits
+
+    def schedule(self, tool_name: str, arguments: Dict[str, Any], api_key: str, result: Any):
+        """Start prefetching the follow-ups of a finished tool call, if it has any"""
+        follow_ups = FOLLOW_UPS.get(tool_name)
+        if follow_ups is None:
+            return
+        try:
+            calls = [
+                (name, call_arguments) for name, call_arguments in follow_ups(arguments, result)
+                if self.cache.ttls.get(FOLLOW_UP_ENDPOINTS[name], 0) > 0
+            ]
+        except (KeyError, TypeError, AttributeError):
+            # An unexpected result shape only means nothing to prefetch, never a failed call
+            return
+        if calls:
+            task = asyncio.ensure_future(self._run(calls, api_key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, calls: List[Tuple[str, Dict[str, Any]]], api_key: str):
+        current_priority.set(PRIORITIES["low"])
+        await asyncio.gather(*(self._prefetch(name, arguments, api_key) for name, arguments in calls))
+
+    async def _prefetch(self, name: str, arguments: Dict[str, Any], api_key: str):
+        # Every follow-up is a single upstream request: reserve its credit up front so
+        # concurrent follow-ups cannot overshoot the budget, then settle what was really spent
+        if self._remaining(api_key) < 1:
+            self.over_budget += 1
+            return
+        self._charge(api_key, 1)
+        spend = PrefetchSpend()
+        prefetching.set(spend)
+        self.issued += 1
+        try:
+            await self.dispatch(name, arguments, api_key)
+        except Exception:
+            self.failed += 1
+        finally:
+            self._charge(api_key, spend.requests - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return prefetch counters; hits are counted by the response cache"""
+        return {
+            "budget_per_hour": self.budget,
+            "issued": self.issued,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "credits_spent": self.spent,
+            "in_progress": len(self._tasks),
+        }
+
+    async def aclose(self):
+        """Cancel prefetches still running"""
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
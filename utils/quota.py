@@ -0,0 +1,149 @@
+"""
+Quota governor for the kwrds.ai credit balance
+Tracks spend locally between usage_count refreshes and rejects low-priority calls when credits run low
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.cache import key_partition
+from utils.errors import QuotaExceededError
+from utils.rate_limit import PRIORITIES
+
+# Credits charged per upstream request by endpoint path; /usage_count itself is free
+DEFAULT_COST = 1.0
+ENDPOINT_COSTS = {
+    "/usage_count": 0.0,
+}
+
+# Multiples of the reserve each priority must leave untouched
+PRIORITY_RESERVE_FACTORS = {PRIORITIES["high"]: 0, PRIORITIES["normal"]: 1, PRIORITIES["low"]: 2}
+
+REMAINING_FIELDS = ("remaining", "remaining_credits", "credits_remaining", "credits_left", "balance")
+LIMIT_FIELDS = ("limit", "quota", "total", "credits", "max_credits", "plan_limit")
+USED_FIELDS = ("usage", "used", "usage_count", "count", "credits_used")
+
+
+def cost_for(url: str) -> float:
+    """Return the credits one request to an endpoint URL costs"""
+    return ENDPOINT_COSTS.get(urlsplit(url).path, DEFAULT_COST)
+
+
+def remaining_credits(usage: Any) -> Optional[float]:
+    """Find the remaining credit balance in a usage_count response, None when it is not reported"""
+    if not isinstance(usage, dict):
+        return None
+    for field in REMAINING_FIELDS:
+        if isinstance(usage.get(field), (int, float)):
+            return float(usage[field])
+    limit = next((usage[field] for field in LIMIT_FIELDS if isinstance(usage.get(field), (int, float))), None)
+    used = next((usage[field] for field in USED_FIELDS if isinstance(usage.get(field), (int, float))), None)
+    if limit is not None and used is not None:
+        return float(limit - used)
+    for value in usage.values():
+        found = remaining_credits(value)
+        if found is not None:
+            return found
+    return None
+
+
+class _KeyQuota:
+    def __init__(self):
+        self.remaining: Optional[float] = None
+        self.refreshed_at = 0.0
+        self.spent_since_refresh = 0.0
+        self.spent_by_endpoint: Dict[str, float] = {}
+        self.lock = asyncio.Lock()
+
+
+class QuotaGovernor:
+    """Estimates each API key's remaining credits and admits calls by priority
+
+    The balance is refreshed through the usage_count handler every refresh_interval
+    seconds; in between, local spend is subtracted. High priority calls may use the
+    whole balance, normal ones must leave `reserve` credits and low ones twice that.
+    """
+
+    def __init__(self, fetch_usage: Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]],
+                 reserve: float = 50.0, refresh_interval: float = 300.0):
+        self.fetch_usage = fetch_usage
+        self.reserve = reserve
+        self.refresh_interval = refresh_interval
+        self._keys: Dict[str, _KeyQuota] = {}
+        self.rejected = 0
+
+    def _quota_for(self, api_key: str) -> _KeyQuota:
+        partition = key_partition(api_key)
+        quota = self._keys.get(partition)
+        if quota is None:
+            quota = _KeyQuota()
+            self._keys[partition] = quota
+        return quota
+
+    async def _refresh(self, api_key: str, quota: _KeyQuota):
+        async with quota.lock:
+            if time.monotonic() - quota.refreshed_at < self.refresh_interval:
+                return
+            try:
+                usage = await self.fetch_usage({}, api_key)
+            except Exception:
+                # Keep the local estimate; try again next interval
+                quota.refreshed_at = time.monotonic()
+                return
+            remaining = remaining_credits(usage)
+            if remaining is not None:
+                quota.remaining = remaining
+                quota.spent_since_refresh = 0.0
+            quota.refreshed_at = time.monotonic()
+
+    def estimated_remaining(self, api_key: str) -> Optional[float]:
+        """Return the last reported balance minus local spend since, None when unknown"""
+        quota = self._quota_for(api_key)
+        if quota.remaining is None:
+            return None
+        return quota.remaining - quota.spent_since_refresh
+
+    async def admit(self, api_key: str, url: str, priority: int = PRIORITIES["normal"]):
+        """Raise QuotaExceededError if the request would dig into the reserve for its priority"""
+        cost = cost_for(url)
+        if cost <= 0:
+            return
+        quota = self._quota_for(api_key)
+        if time.monotonic() - quota.refreshed_at >= self.refresh_interval:
+            await self._refresh(api_key, quota)
+        remaining = self.estimated_remaining(api_key)
+        if remaining is None:
+            return
+        floor = self.reserve * PRIORITY_RESERVE_FACTORS.get(priority, 1)
+        if remaining - cost < floor:
+            self.rejected += 1
+            raise QuotaExceededError(
+                f"About {remaining:.0f} credits left; keeping {floor:.0f} in reserve for higher priority calls",
+                retry_after=self.refresh_interval,
+            )
+
+    def record(self, api_key: str, url: str):
+        """Charge a completed upstream request against the key's local estimate"""
+        cost = cost_for(url)
+        if cost <= 0:
+            return
+        quota = self._quota_for(api_key)
+        path = urlsplit(url).path
+        quota.spent_since_refresh += cost
+        quota.spent_by_endpoint[path] = quota.spent_by_endpoint.get(path, 0.0) + cost
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-key estimates and local spend, keyed by a hash of the API key"""
+        return {
+            "rejected": self.rejected,
+            "keys": {
+                partition: {
+                    "estimated_remaining": None if quota.remaining is None else quota.remaining - quota.spent_since_refresh,
+                    "spent_since_refresh": quota.spent_since_refresh,
+                    "spent_by_endpoint": dict(quota.spent_by_endpoint),
+                }
+                for partition, quota in self._keys.items()
+            },
+        }
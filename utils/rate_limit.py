@@ -0,0 +1,120 @@
+"""
+Client-side rate limiting
+Token buckets per API key that queue upstream requests by priority instead of tripping API limits
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.cache import key_partition
+
+# Lower numbers are served first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+# Priority of the tool call being handled, read by the HTTP layer
+current_priority: ContextVar[int] = ContextVar("current_priority", default=PRIORITIES["normal"])
+
+
+def parse_priority(value: Any) -> int:
+    """Map a priority name to its number, raising ValueError for unknown names"""
+    if value is None:
+        return PRIORITIES["normal"]
+    if value not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{value}', expected one of: {', '.join(PRIORITIES)}")
+    return PRIORITIES[value]
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; waiters are served by priority, then arrival"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _available(self) -> float:
+        """Return the tokens available right now"""
+        self._refill()
+        return self.tokens
+
+    def _consume(self) -> bool:
+        """Take one token; False if another consumer got there first"""
+        self.tokens -= 1
+        return True
+
+    async def acquire(self, priority: int = PRIORITIES["normal"]) -> float:
+        """Wait for a token and return the seconds spent waiting"""
+        ticket = (priority, next(self._sequence))
+        heapq.heappush(self._waiters, ticket)
+        start = time.monotonic()
+        try:
+            while True:
+                tokens = self._available()
+                if self._waiters[0] == ticket and tokens >= 1 and self._consume():
+                    heapq.heappop(self._waiters)
+                    return time.monotonic() - start
+                await asyncio.sleep(max((1 - tokens) / self.rate, 0.005))
+        except BaseException:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+            raise
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+
+class RateLimiter:
+    """One token bucket per API key
+
+    bucket_factory(partition, rate, capacity) builds each key's bucket; pass one to keep
+    bucket state outside the process, e.g. shared between worker processes.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: float = 20.0,
+                 bucket_factory: Optional[Callable[[str, float, float], TokenBucket]] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.bucket_factory = bucket_factory or (lambda partition, rate, capacity: TokenBucket(rate, capacity))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _bucket_for(self, api_key: str) -> TokenBucket:
+        partition = key_partition(api_key)
+        bucket = self._buckets.get(partition)
+        if bucket is None:
+            bucket = self.bucket_factory(partition, self.rate, self.burst)
+            self._buckets[partition] = bucket
+        return bucket
+
+    async def acquire(self, api_key: str, priority: int = PRIORITIES["normal"]) -> float:
+        """Wait until the key may send another request; returns seconds waited"""
+        waited = await self._bucket_for(api_key).acquire(priority)
+        if waited > 0.001:
+            self.waits += 1
+            self.wait_seconds += waited
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Return wait counters and queue depth"""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "queued": sum(bucket.queued for bucket in self._buckets.values()),
+        }
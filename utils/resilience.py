@@ -0,0 +1,117 @@
+"""
+Resilience policies for upstream API calls
+Retry with jittered exponential backoff, per-endpoint timeouts and per-host circuit breakers
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+from utils.errors import CircuitOpenError
+
+# Seconds to wait for each endpoint; metadata lookups are quick, generation is slow
+DEFAULT_TIMEOUT = 30.0
+ENDPOINT_TIMEOUTS = {
+    "/usage_count": 5.0,
+    "/search-volume": 15.0,
+    "/people-also-ask": 30.0,
+    "/serp": 30.0,
+    "/ai": 90.0,
+    "/ai/content": 90.0,
+    "/paa-ai": 90.0,
+}
+
+
+def timeout_for(url: str) -> float:
+    """Return the request timeout for an endpoint URL"""
+    return ENDPOINT_TIMEOUTS.get(urlsplit(url).path, DEFAULT_TIMEOUT)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After up to max_delay"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures to one host, probing again after reset_timeout
+
+    closed: requests flow; consecutive failures are counted
+    open: requests fail immediately with CircuitOpenError
+    half-open: one probe request is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    @property
+    def probing(self) -> bool:
+        """Whether the half-open probe request is in progress"""
+        return self._probing
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(
+            f"Circuit open for {self.host} after {self.failures} consecutive failures; retry in {retry_in:.0f}s",
+            retry_after=retry_in,
+        )
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def abandon(self):
+        """Forget an in-progress probe that ended without an answer, e.g. when cancelled"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
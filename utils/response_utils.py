@@ -2,40 +2,110 @@
 Response utilities for limiting payload sizes
 """
 
-from typing import Dict, Any
+from itertools import islice
+from typing import Dict, Any, List, Optional
 
+from utils.result_store import ResultStore
 
-def limit_response_size(response: Dict[str, Any], max_items: int = 10) -> Dict[str, Any]:
+
+# Appended to strings cut by a max_length cap
+TRUNCATION_SUFFIX = "... [truncated]"
+
+
+def shape_response(response: Dict[str, Any], max_items: Optional[int] = 10, max_length: Optional[int] = None,
+                   result_store: Optional[ResultStore] = None, api_key: str = "") -> Dict[str, Any]:
     """
-    Limit the size of API responses to prevent hitting Claude conversation limits
-    
+    Apply list and string caps to an API response in a single pass
+
+    Lists held in dictionaries are cut to max_items (with the same truncation
+    markers and next_page cursor as before) and strings anywhere in the tree are
+    cut to max_length. Subtrees that need no change are returned as-is rather
+    than copied, so the input must be treated as read-only afterwards.
+
     Args:
         response: The API response dictionary
-        max_items: Maximum number of items to return for arrays/lists
-    
+        max_items: Maximum number of items for lists held in dictionaries, None for no cap
+        max_length: Maximum length for string fields, None for no cap
+        result_store: Store that keeps truncated lists so the rest can be paged with next_page
+        api_key: API key the stored lists are scoped to
+
     Returns:
-        Limited response dictionary
+        Shaped response dictionary
     """
     if not isinstance(response, dict):
         return response
-    
-    limited_response = {}
-    
-    for key, value in response.items():
-        if isinstance(value, list) and len(value) > max_items:
-            # Limit arrays to max_items and add a note about truncation
-            limited_response[key] = value[:max_items]
-            limited_response[f"{key}_truncated"] = True
-            limited_response[f"{key}_total_count"] = len(value)
-            limited_response[f"{key}_showing"] = max_items
+    return _shape_dict(response, max_items, max_length, result_store, api_key)
+
+
+def _shape_dict(node: Dict[str, Any], max_items: Optional[int], max_length: Optional[int],
+                result_store: Optional[ResultStore], api_key: str) -> Dict[str, Any]:
+    shaped = None
+    for index, (key, value) in enumerate(node.items()):
+        markers = None
+        if isinstance(value, list):
+            new_value = value
+            if max_items is not None and len(value) > max_items:
+                new_value = value[:max_items]
+                markers = {
+                    f"{key}_truncated": True,
+                    f"{key}_total_count": len(value),
+                    f"{key}_showing": max_items,
+                }
+                if result_store is not None:
+                    cursor = result_store.put(value, api_key, max_items)
+                    if cursor:
+                        markers[f"{key}_next_cursor"] = cursor
+            if max_length is not None:
+                new_value = _shape_list(new_value, max_length)
         elif isinstance(value, dict):
-            # Recursively limit nested dictionaries
-            limited_response[key] = limit_response_size(value, max_items)
+            new_value = _shape_dict(value, max_items, max_length, result_store, api_key)
+        elif max_length is not None and isinstance(value, str) and len(value) > max_length:
+            new_value = value[:max_length] + TRUNCATION_SUFFIX
         else:
-            # Keep other values as-is
-            limited_response[key] = value
+            new_value = value
+
+        if shaped is None and (new_value is not value or markers):
+            # First change: copy the untouched keys seen so far
+            shaped = dict(islice(node.items(), index))
+        if shaped is not None:
+            shaped[key] = new_value
+            if markers:
+                shaped.update(markers)
+    return node if shaped is None else shaped
+
+
+def _shape_list(items: List[Any], max_length: int) -> List[Any]:
+    # Items inside lists only get string caps, never list caps
+    shaped = None
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            new_item = _shape_dict(item, None, max_length, None, "")
+        elif isinstance(item, str) and len(item) > max_length:
+            new_item = item[:max_length] + TRUNCATION_SUFFIX
+        else:
+            new_item = item
+        if shaped is None and new_item is not item:
+            shaped = items[:index]
+        if shaped is not None:
+            shaped.append(new_item)
+    return items if shaped is None else shaped
+
+
+def limit_response_size(response: Dict[str, Any], max_items: int = 10,
+                        result_store: Optional[ResultStore] = None, api_key: str = "") -> Dict[str, Any]:
+    """
+    Limit the size of API responses to prevent hitting Claude conversation limits
+    
+    Args:
+        response: The API response dictionary
+        max_items: Maximum number of items to return for arrays/lists
+        result_store: Store that keeps truncated lists so the rest can be paged with next_page
+        api_key: API key the stored lists are scoped to
     
-    return limited_response
+    Returns:
+        Limited response dictionary
+    """
+    return shape_response(response, max_items, None, result_store, api_key)
 
 
 def truncate_string_fields(response: Dict[str, Any], max_length: int = 500) -> Dict[str, Any]:
@@ -49,23 +119,65 @@ def truncate_string_fields(response: Dict[str, Any], max_length: int = 500) -> D
     Returns:
         Response with truncated strings
     """
-    if not isinstance(response, dict):
-        return response
-    
-    truncated_response = {}
-    
-    for key, value in response.items():
-        if isinstance(value, str) and len(value) > max_length:
-            truncated_response[key] = value[:max_length] + "... [truncated]"
-        elif isinstance(value, dict):
-            truncated_response[key] = truncate_string_fields(value, max_length)
-        elif isinstance(value, list):
-            truncated_response[key] = [
-                truncate_string_fields(item, max_length) if isinstance(item, dict) 
-                else (item[:max_length] + "... [truncated]" if isinstance(item, str) and len(item) > max_length else item)
-                for item in value
-            ]
-        else:
-            truncated_response[key] = value
-    
-    return truncated_response 
\ No newline at end of file
+    return shape_response(response, None, max_length)
+
+
+# Field names the API uses for the same column across endpoints
+FIELD_ALIASES = {
+    "keyword": ("keyword", "keywords", "query", "search_question"),
+    "volume": ("volume", "search_volume", "avg_monthly_searches"),
+    "cpc": ("cpc", "cpc_usd"),
+    "competition": ("competition", "competition_value", "competition_index"),
+}
+
+
+def extract_records(response: Any) -> List[Dict[str, Any]]:
+    """
+    Find the row records in an API response
+
+    Handles a list of records, a list of records under any key, and
+    column-oriented tables ({"keyword": [...], "volume": [...]} or pandas-style
+    {"keyword": {"0": ...}, "volume": {"0": ...}}), searching nested dicts.
+
+    Args:
+        response: The parsed API response
+
+    Returns:
+        List of row dictionaries, empty when none are found
+    """
+    if isinstance(response, list):
+        return [item for item in response if isinstance(item, dict)]
+    if not isinstance(response, dict) or not response:
+        return []
+
+    for value in response.values():
+        if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            return value
+
+    columns = list(response.values())
+    if all(isinstance(column, list) for column in columns) and len({len(column) for column in columns}) == 1:
+        names = list(response.keys())
+        return [dict(zip(names, row)) for row in zip(*columns)]
+    if all(isinstance(column, dict) for column in columns):
+        row_ids = list(columns[0].keys())
+        if row_ids and all(list(column.keys()) == row_ids for column in columns):
+            return [{name: column[row_id] for name, column in response.items()} for row_id in row_ids]
+
+    for value in response.values():
+        if isinstance(value, dict):
+            records = extract_records(value)
+            if records:
+                return records
+    return []
+
+
+def pick_field(record: Dict[str, Any], field: str) -> Any:
+    """Return a record's value for a canonical field name, trying known aliases"""
+    for alias in FIELD_ALIASES.get(field, (field,)):
+        if alias in record:
+            return record[alias]
+    lowered = {key.lower(): value for key, value in record.items() if isinstance(key, str)}
+    for alias in FIELD_ALIASES.get(field, (field,)):
+        if alias in lowered:
+            return lowered[alias]
+    return None
@@ -0,0 +1,85 @@
+"""
+Result store for cursor-based pagination
+Keeps the full lists behind truncated tool results so later pages need no upstream call
+"""
+
+import base64
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.cache import key_partition
+
+
+def encode_cursor(result_id: str, offset: int) -> str:
+    """Build an opaque cursor pointing at an offset of a stored result"""
+    return base64.urlsafe_b64encode(f"{result_id}:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into result id and offset"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        result_id, offset = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return result_id, int(offset)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+class ResultStore:
+    """Bounded LRU store of full result lists, scoped to the API key that produced them"""
+
+    def __init__(self, max_results: int = 256, max_items: int = 100_000, ttl: float = 3600):
+        self.max_results = max_results
+        self.max_items = max_items
+        self.ttl = ttl
+        # result id -> (expires_at, owner hash, items), oldest use first
+        self._results: "OrderedDict[str, Tuple[float, str, List[Any]]]" = OrderedDict()
+        self.total_items = 0
+
+    @staticmethod
+    def _owner(api_key: str) -> str:
+        return key_partition(api_key)
+
+    def put(self, items: List[Any], api_key: str, offset: int) -> Optional[str]:
+        """Store a full list and return a cursor for the page starting at offset"""
+        if len(items) > self.max_items:
+            return None
+        result_id = secrets.token_urlsafe(9)
+        self._results[result_id] = (time.time() + self.ttl, self._owner(api_key), items)
+        self.total_items += len(items)
+        while len(self._results) > self.max_results or self.total_items > self.max_items:
+            self._remove(next(iter(self._results)))
+        return encode_cursor(result_id, offset)
+
+    def resolve(self, cursor: str, api_key: str) -> Tuple[str, int, List[Any]]:
+        """Return (result id, offset, full list) for a cursor owned by api_key"""
+        result_id, offset = decode_cursor(cursor)
+        entry = self._results.get(result_id)
+        if entry is not None and entry[0] <= time.time():
+            self._remove(result_id)
+            entry = None
+        if entry is None or entry[1] != self._owner(api_key):
+            raise ValueError("Cursor expired or unknown; call the original tool again")
+        self._results.move_to_end(result_id)
+        return result_id, offset, entry[2]
+
+    def page(self, cursor: str, api_key: str, page_size: int) -> Dict[str, Any]:
+        """Return the page at a cursor together with the cursor for the following page"""
+        result_id, offset, items = self.resolve(cursor, api_key)
+        end = offset + page_size
+        return {
+            "items": items[offset:end],
+            "offset": offset,
+            "total_count": len(items),
+            "next_cursor": encode_cursor(result_id, end) if end < len(items) else None,
+        }
+
+    def _remove(self, result_id: str):
+        _, _, items = self._results.pop(result_id)
+        self.total_items -= len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many results and items are held"""
+        return {"results": len(self._results), "items": self.total_items}
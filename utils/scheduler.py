@@ -0,0 +1,125 @@
+"""
+Lane scheduler for tool calls
+Separate concurrency caps per class of tool, with weighted fair queuing across API keys within each lane
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from utils.cache import key_partition
+from utils.metrics import Metrics
+from utils.rate_limit import PRIORITIES
+
+# Share of a lane each queued call is entitled to relative to others, by priority
+PRIORITY_WEIGHTS = {PRIORITIES["high"]: 4.0, PRIORITIES["normal"]: 2.0, PRIORITIES["low"]: 1.0}
+
+
+class _Lane:
+    def __init__(self, name: str, limit: Optional[int]):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+        # (start tag, arrival, future) of waiting calls; cancelled ones are skipped when popped
+        self._queue: List[Tuple[float, int, "asyncio.Future[None]"]] = []
+        self._virtual_time = 0.0
+        self._last_start: Dict[str, float] = {}
+
+    def push(self, partition: str, weight: float, arrival: int) -> "asyncio.Future[None]":
+        # Start-time fair queuing: a key's next call starts where its previous one left off,
+        # or at the lane's current virtual time if the key has been idle
+        start = max(self._virtual_time, self._last_start.get(partition, 0.0))
+        self._last_start[partition] = start + 1.0 / weight
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (start, arrival, waiter))
+        self.queued += 1
+        return waiter
+
+    def grant_next(self) -> bool:
+        """Hand a free slot to the waiter with the lowest start tag; False if none is waiting"""
+        while self._queue:
+            start, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                continue
+            self._virtual_time = start
+            self.queued -= 1
+            self.active += 1
+            waiter.set_result(None)
+            return True
+        # Idle: forget per-key tags so they cannot grow without bound
+        self._last_start.clear()
+        return False
+
+
+class LaneScheduler:
+    """Caps concurrent tool calls per lane and shares each lane fairly between API keys
+
+    A key with many queued calls is interleaved with other keys instead of being
+    served first-come, first-served; within that, high priority calls get four times
+    the share of low ones. Lanes with no limit admit every call immediately.
+    """
+
+    def __init__(self, limits: Dict[str, Optional[int]], metrics: Optional[Metrics] = None):
+        self._lanes = {name: _Lane(name, limit if limit else None) for name, limit in limits.items()}
+        self.metrics = metrics
+        self._arrivals = itertools.count()
+
+    def __contains__(self, lane_name: str) -> bool:
+        return lane_name in self._lanes
+
+    def _lane(self, name: str) -> _Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            raise ValueError(f"Unknown scheduling lane '{name}', expected one of: {', '.join(self._lanes)}")
+        return lane
+
+    def _report(self, lane: _Lane):
+        if self.metrics is not None:
+            self.metrics.record_lane_depth(lane.name, lane.queued, lane.active)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, lane_name: str, api_key: str, priority: int = PRIORITIES["normal"]) -> AsyncIterator[float]:
+        """Hold one of the lane's slots for the duration of a tool call; yields the seconds waited"""
+        lane = self._lane(lane_name)
+        start = time.monotonic()
+        if lane.limit is None or (lane.active < lane.limit and not lane.queued):
+            lane.active += 1
+        else:
+            partition = key_partition(api_key)
+            waiter = lane.push(partition, PRIORITY_WEIGHTS.get(priority, 1.0), next(self._arrivals))
+            self._report(lane)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted a slot just as the call was cancelled: pass it on
+                    self._release(lane)
+                else:
+                    waiter.cancel()
+                    lane.queued -= 1
+                    self._report(lane)
+                raise
+        waited = time.monotonic() - start
+        if self.metrics is not None:
+            self.metrics.record_lane_wait(lane.name, waited)
+        self._report(lane)
+        try:
+            yield waited
+        finally:
+            self._release(lane)
+
+    def _release(self, lane: _Lane):
+        lane.active -= 1
+        lane.grant_next()
+        self._report(lane)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limit, running and queued calls per lane"""
+        return {
+            name: {"limit": lane.limit, "active": lane.active, "queued": lane.queued}
+            for name, lane in self._lanes.items()
+        }
@@ -0,0 +1,109 @@
+"""
+JSON serialization
+Compact JSON encode/decode through the fastest installed backend: orjson, then msgspec, then the stdlib
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, NamedTuple, Union
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+class JsonCodec(NamedTuple):
+    """A JSON backend: loads accepts bytes or str, dumps/dumps_bytes write compact UTF-8 JSON"""
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], str]
+    dumps_bytes: Callable[[Any], bytes]
+
+
+def _stdlib_dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _stdlib_codec() -> JsonCodec:
+    return JsonCodec("json", json.loads, _stdlib_dumps, lambda value: _stdlib_dumps(value).encode("utf-8"))
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, option=options)
+        except TypeError:
+            # Integers beyond 64 bits and other values orjson refuses; the stdlib handles them
+            return _stdlib_dumps(value).encode("utf-8")
+
+    return JsonCodec("orjson", orjson.loads, lambda value: dumps_bytes(value).decode("utf-8"), dumps_bytes)
+
+
+def _msgspec_codec() -> JsonCodec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            # Callers expect the stdlib's ValueError for malformed JSON
+            raise ValueError(str(e)) from e
+
+    def dumps_bytes(value: Any) -> bytes:
+        try:
+            return encoder.encode(value)
+        except (TypeError, msgspec.EncodeError):
+            return _stdlib_dumps(value).encode("utf-8")
+
+    return JsonCodec("msgspec", loads, lambda value: dumps_bytes(value).decode("utf-8"), dumps_bytes)
+
+
+_FACTORIES: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """
+    Return a JSON codec by backend name
+
+    Args:
+        name: "orjson", "msgspec", "json", or "auto" for the first one installed
+
+    Returns:
+        The codec; an explicitly named backend that is not installed raises ImportError
+    """
+    if name == "auto":
+        for backend in BACKENDS:
+            try:
+                return _FACTORIES[backend]()
+            except ImportError:
+                continue
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON backend '{name}', expected 'auto' or one of: {', '.join(BACKENDS)}")
+    return _FACTORIES[name]()
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    """Every installed backend by name"""
+    codecs = {}
+    for backend in BACKENDS:
+        try:
+            codecs[backend] = _FACTORIES[backend]()
+        except ImportError:
+            continue
+    return codecs
+
+
+# KWRDS_JSON_BACKEND pins a backend; by default the fastest installed one is used
+codec = get_codec(os.getenv('KWRDS_JSON_BACKEND', 'auto'))
+loads = codec.loads
+dumps = codec.dumps
+dumps_bytes = codec.dumps_bytes
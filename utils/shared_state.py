@@ -0,0 +1,155 @@
+"""
+State shared between server processes
+SQLite-backed rate-limit buckets and pagination results, so HTTP worker processes
+enforce one request rate per API key and serve each other's next_page cursors
+"""
+
+import contextlib
+import os
+import secrets
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.rate_limit import TokenBucket
+from utils.result_store import ResultStore, decode_cursor, encode_cursor
+from utils.serialization import dumps_bytes, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    partition TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    item_count INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at);
+"""
+
+
+@contextlib.contextmanager
+def _write_transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """Hold the database write lock for the block; commit if it completes, roll back if it raises"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+class SharedState:
+    """One SQLite database in WAL mode holding the cross-process state
+
+    Every transaction is a handful of rows, so waiting on the write lock costs
+    microseconds; busy_timeout only matters if a process stalls mid-transaction.
+    """
+
+    def __init__(self, directory: str, filename: str = "state.sqlite3", busy_timeout: float = 5.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def token_bucket(self, partition: str, rate: float, capacity: float) -> "SharedTokenBucket":
+        """Bucket factory for RateLimiter"""
+        return SharedTokenBucket(self._conn, partition, rate, capacity)
+
+    def close(self):
+        self._conn.close()
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose tokens live in SQLite, drawn on by every process
+
+    Waiters within a process are still served by priority; across processes a
+    token goes to whichever process asks first.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, partition: str, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self._conn = conn
+        self.partition = partition
+        self._conn.execute(
+            "INSERT OR IGNORE INTO rate_buckets (partition, tokens, updated) VALUES (?, ?, ?)",
+            (partition, capacity, time.time()),
+        )
+
+    def _refilled(self) -> float:
+        tokens, updated = self._conn.execute(
+            "SELECT tokens, updated FROM rate_buckets WHERE partition = ?", (self.partition,)
+        ).fetchone()
+        return min(self.capacity, tokens + max(0.0, time.time() - updated) * self.rate)
+
+    def _available(self) -> float:
+        self.tokens = self._refilled()
+        return self.tokens
+
+    def _consume(self) -> bool:
+        # Re-read under the write lock: another process may have drawn since _available
+        with _write_transaction(self._conn):
+            tokens = self._refilled()
+            if tokens < 1:
+                return False
+            self._conn.execute(
+                "UPDATE rate_buckets SET tokens = ?, updated = ? WHERE partition = ?",
+                (tokens - 1, time.time(), self.partition),
+            )
+            return True
+
+
+class SharedResultStore(ResultStore):
+    """ResultStore kept in SQLite so a cursor works on whichever process serves next_page"""
+
+    def __init__(self, state: SharedState, max_results: int = 256, max_items: int = 100_000, ttl: float = 3600):
+        super().__init__(max_results, max_items, ttl)
+        self._conn = state._conn
+
+    def put(self, items: List[Any], api_key: str, offset: int) -> Optional[str]:
+        if len(items) > self.max_items:
+            return None
+        result_id = secrets.token_urlsafe(9)
+        now = time.time()
+        body = zlib.compress(dumps_bytes(items))
+        with _write_transaction(self._conn):
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT INTO results (id, owner, expires_at, used_at, item_count, body) VALUES (?, ?, ?, ?, ?, ?)",
+                (result_id, self._owner(api_key), now + self.ttl, now, len(items), body),
+            )
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(item_count), 0) FROM results").fetchone()
+            if count > self.max_results or total > self.max_items:
+                doomed = []
+                for stored_id, item_count in self._conn.execute("SELECT id, item_count FROM results ORDER BY used_at"):
+                    if count <= self.max_results and total <= self.max_items:
+                        break
+                    doomed.append((stored_id,))
+                    count -= 1
+                    total -= item_count
+                self._conn.executemany("DELETE FROM results WHERE id = ?", doomed)
+        return encode_cursor(result_id, offset)
+
+    def resolve(self, cursor: str, api_key: str) -> Tuple[str, int, List[Any]]:
+        result_id, offset = decode_cursor(cursor)
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT owner, body FROM results WHERE id = ? AND expires_at > ?", (result_id, now)
+        ).fetchone()
+        if row is None or row[0] != self._owner(api_key):
+            raise ValueError("Cursor expired or unknown; call the original tool again")
+        self._conn.execute("UPDATE results SET used_at = ? WHERE id = ?", (now, result_id))
+        return result_id, offset, loads(zlib.decompress(row[1]))
+
+    def stats(self) -> Dict[str, Any]:
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(item_count), 0) FROM results").fetchone()
+        return {"results": count, "items": total, "shared": True}
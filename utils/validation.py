@@ -0,0 +1,107 @@
+"""
+Tool argument validation
+Compiles the JSON Schema subset used by the tool definitions into plain checks once at startup
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Keys that describe a property without constraining it
+ANNOTATION_KEYS = {"description", "default", "title", "examples"}
+
+TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+# A check appends messages for whatever is wrong with the value at `path`
+Check = Callable[[Any, str, List[str]], None]
+
+
+class ArgumentError(ValueError):
+    """Tool arguments do not match the tool's input schema"""
+
+
+def _compile(schema: Dict[str, Any], optional: Iterable[str] = ()) -> Check:
+    unsupported = set(schema) - ANNOTATION_KEYS - {"type", "enum", "minimum", "maximum", "items", "properties", "required"}
+    if unsupported:
+        raise ValueError(f"Unsupported schema keywords: {', '.join(sorted(unsupported))}")
+
+    checks: List[Check] = []
+    expected = schema.get("type")
+    if expected is not None:
+        is_type = TYPE_CHECKS[expected]
+        article = "an" if expected[0] in "aeiou" else "a"
+
+        def check_type(value, path, errors):
+            if not is_type(value):
+                errors.append(f"{path} must be {article} {expected}")
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path} must be one of: {', '.join(map(str, allowed))}")
+        checks.append(check_enum)
+
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_range(value, path, errors):
+            if not TYPE_CHECKS["number"](value):
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{path} must be at least {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path} must be at most {maximum}")
+        checks.append(check_range)
+
+    if "items" in schema:
+        check_item = _compile(schema["items"])
+
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    check_item(item, f"{path}[{index}]", errors)
+        checks.append(check_items)
+
+    properties = {name: _compile(subschema) for name, subschema in schema.get("properties", {}).items()}
+    required = [name for name in schema.get("required", []) if name not in set(optional)]
+    if properties or required:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            prefix = f"{path}." if path else ""
+            for name in required:
+                if value.get(name) is None:
+                    errors.append(f"{prefix}{name} is required")
+            for name, check in properties.items():
+                # Explicit nulls are treated like missing optional arguments
+                if value.get(name) is not None:
+                    check(value[name], f"{prefix}{name}", errors)
+        checks.append(check_object)
+
+    def check(value, path, errors):
+        for single in checks:
+            single(value, path, errors)
+    return check
+
+
+def compile_validator(schema: Dict[str, Any], optional: Iterable[str] = ()) -> Callable[[Dict[str, Any]], None]:
+    """Build a validator for a tool's inputSchema that raises ArgumentError listing every problem
+
+    Names in `optional` are not enforced even when the schema marks them required,
+    e.g. api_key, which falls back to the environment.
+    """
+    check = _compile(schema, optional)
+
+    def validate(arguments: Optional[Dict[str, Any]]):
+        errors: List[str] = []
+        check(arguments if arguments is not None else {}, "", errors)
+        if errors:
+            raise ArgumentError("Invalid arguments: " + "; ".join(errors))
+    return validate